@@ -0,0 +1,17 @@
+from sql_code_analyzer.adapter.freature_class.base_cast import BaseCast
+
+
+class DetachedNode(BaseCast):
+    """
+    Stand-in for a node of abstract syntax tree which keeps only the node's code location.
+    Reports which have to leave the process where the abstract syntax tree was created
+    (or outlive the statement) use it instead of the original node,
+    because adapted node classes are created dynamically and can not be pickled.
+    """
+
+    def __init__(self, code_location=None):
+        """
+        :param code_location: Code location of the original node
+        """
+
+        self.code_location = code_location
@@ -6,6 +6,7 @@ from sql_code_analyzer.in_memory_representation.struct.database import Database
 from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
 from sql_code_analyzer.output.reporter.rule_reporter import RuleReport
 from sql_code_analyzer.tools.path import get_path_object
+from sql_code_analyzer.visitor.scope import ScopeResolver
 
 
 def calls_create_report(func):
@@ -42,10 +43,14 @@ class BaseRuleMetaclass(type):
 
 class BaseRule(metaclass=BaseRuleMetaclass):
 
+    # Attributes set by the linter for each statement, they are not part of the state of rule
+    _runtime_attributes = ("_node", "_mem_rep", "_statement", "_scope_resolver", "_raw_reports", "_reports")
+
     def __init__(self):
         self.node = None
         self.mem_rep: Database | None = None
         self.statement: list | None = None
+        self.scope_resolver: ScopeResolver | None = None
         self.raw_reports = []
         self.reports = []
 
@@ -73,6 +78,14 @@ class BaseRule(metaclass=BaseRuleMetaclass):
     def statement(self, value):
         self._statement = value
 
+    @property
+    def scope_resolver(self):
+        return self._scope_resolver
+
+    @scope_resolver.setter
+    def scope_resolver(self, value):
+        self._scope_resolver = value
+
     @property
     def messages(self):
         return self._messages
@@ -97,6 +110,24 @@ class BaseRule(metaclass=BaseRuleMetaclass):
     def reports(self, value):
         self._reports = value
 
+    def get_state(self) -> dict:
+        """
+        Return the state which the rule keeps between statements, e.g. to save it to a checkpoint of the run
+        Rules can override it, the state must be picklable
+        :return: Dictionary of attributes
+        """
+
+        return {name: value for name, value in vars(self).items() if name not in self._runtime_attributes}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores the state returned by get_state, e.g. when the run is resumed from a checkpoint
+        :param state: Dictionary of attributes
+        :return: None
+        """
+
+        vars(self).update(state)
+
     def get_reports(self):
         self.raw_reports.clear()
         treports = []
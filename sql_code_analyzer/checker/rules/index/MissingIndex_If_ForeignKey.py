@@ -1,6 +1,7 @@
+from sql_code_analyzer.adapter.freature_class.detached_node import DetachedNode
 from sql_code_analyzer.checker.rules.base import BaseRule
-from sql_code_analyzer.checker.tools.rule_decorators import include_class_reports, include_reports
-from sqlglot import expressions as exp
+from sql_code_analyzer.checker.tools.rule_decorators import include_class_reports
+from sql_code_analyzer.in_memory_representation.exceptions import MissingTableException, MissingSchemaException
 
 messages = {
     "fk-index-not-exists": {
@@ -10,87 +11,79 @@ messages = {
 
 
 class MissingFKIndex(BaseRule):
+    """
+    Reports foreign keys which are not covered by a prefix of any index of their table.
+    The coverage is looked up in the index prefixes of the table in memory representation at the end,
+    so an index which was dropped later does not cover the foreign key.
+    """
 
     persistent = True
-    restrict = {"create_table", "create_index"}
+    restrict = {"create_table"}
     messages = messages
 
     def __init__(self):
         super().__init__()
-        self.depth = 1
-        self.table: str = ""
-        self.table_with_fk = []
-        self.fk_index = []
+        self.table_key: tuple = ()
 
-    def create_visit(self):
-        # Store index
-        if self.node.args['kind'].lower() == "index":
-            self.fk_index.append(
-                (self.node.args['this'].args['table'].name,
-                 self.node.args['this'].args['columns'],
-                 self.statement)
-            )
-        # Get table name
-        elif self.node.args['kind'].lower() == "table":
-            self.table = self.node.this.this.name
-
-    def foreignkey_visit(self):
-        # Store table if has foreign key
-        self.table_with_fk.append(
-            (self.table, self.node.args['expressions'], self.statement)
-        )
-
-    @include_class_reports()
-    def end_lint(self):
-        for table, columns_fk, statement in self.table_with_fk:
-            index_list = [x for x in self.fk_index if x[0] == table]
-
-            if len(index_list) == 0:
-                ...
+        # (schema name, table name) -> list of (foreign key column names, detached node, statement)
+        self.pending_fks = {}
 
-            found = False
-            for index in index_list:
-                indexed_col = index[1]
+    def _get_table_key(self, table_node) -> tuple:
+        return table_node.db or self.mem_rep.default_schema, table_node.name
 
-                if isinstance(indexed_col, exp.Paren):
-                    # Only one column
+    def _get_table(self, table_key: tuple):
+        try:
+            return self.mem_rep.get_table_by_name_or_error(schema_name=table_key[0], table_name=table_key[1])
+        except (MissingTableException, MissingSchemaException):
+            return None
 
-                    # If foreign key has multiple columns,
-                    # then it is nonsense to search for its index in index with only one column
-                    if len(columns_fk) != 1:
-                        continue
+    def _resolve_tables(self) -> None:
+        """
+        Drops foreign keys which are already covered by an index of the table in memory representation
+        """
 
-                    col_name = indexed_col.this.name
-                    table_col = columns_fk[0]
-                    if table_col.name == col_name:
-                        found = True
-                        break  # Break from iterating over indexes
+        for table_key in list(self.pending_fks):
+            table = self._get_table(table_key=table_key)
+            if table is None:
+                continue
 
-                elif isinstance(indexed_col, exp.Tuple):
-                    # Multiple columns
+            pending = [fk for fk in self.pending_fks[table_key] if not table.verify_columns_indexed(fk[0])]
+            if pending:
+                self.pending_fks[table_key] = pending
+            else:
+                del self.pending_fks[table_key]
 
-                    cols = indexed_col.expressions
-                    cols_names = [x.this.name for x in cols]
-
-                    if len(cols_names) != len(columns_fk):
-                        continue
+    def create_visit(self):
+        # Get table name
+        if self.node.args['kind'].lower() == "table":
+            self.table_key = self._get_table_key(table_node=self.node.this.this)
 
-                    c = 1
-                    for table_col in columns_fk:
-                        if table_col.name not in cols_names:
-                            c = 0
-                            break
+    def foreignkey_visit(self):
+        # Store foreign key, its coverage is checked at the end
+        columns_fk = self.node.args['expressions']
+        reference = columns_fk[0].parent.args['reference']
+
+        self.pending_fks.setdefault(self.table_key, []).append(
+            ([column.name for column in columns_fk],
+             DetachedNode(code_location=getattr(reference, "code_location", None)),
+             self.statement)
+        )
 
-                    found = bool(c)
+    @include_class_reports()
+    def end_lint(self):
+        self._resolve_tables()
 
-            if not found:
+        for (_, table), fks in self.pending_fks.items():
+            for _, node, statement in fks:
                 self.create_report(report="fk-index-not-exists",
-                                   node=columns_fk[0].parent.args['reference'],
+                                   node=node,
                                    statement=statement,
                                    underline_entire_line=True,
                                    table=table
                                    )
 
+        self.pending_fks.clear()
+
 
 def register(checker) -> None:
     checker.register_rule(MissingFKIndex)
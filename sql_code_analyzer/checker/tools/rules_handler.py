@@ -1,17 +1,41 @@
 import glob
+import importlib
 import os
+import pkgutil
 import re
+from importlib.metadata import entry_points
 
 from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
 
 
 class CRules:
+    """
+    Encapsulates data about where the rules are located.
+
+    Rules are searched in two places:
+        Files in the rules folder (--rules-path), these are loaded directly from their paths.
+        Installed rule packages registered under the "sql_code_analyzer.rules" entry point group,
+        these are imported as regular Python modules.
+
+    A rule package registers itself in its project metadata, for example in pyproject.toml:
+        [project.entry-points."sql_code_analyzer.rules"]
+        my_rules = "my_rules_package"
+
+    Include/exclude folders are applied to both sources. In the case of rule packages,
+    folders are the subpackages of the registered package.
+    """
+
+    # entry point group where installable rule packages are registered
+    entry_point_group: str = "sql_code_analyzer.rules"
 
     path_to_rules_folder: str = ""
 
     # paths with rules
     paths: list = []
 
+    # module names with rules coming from installed rule packages
+    modules: list = []
+
     # if both empty, take all rules
     include_folders: [str] = []
     exclude_folders: [str] = []
@@ -19,11 +43,14 @@ class CRules:
     def __init__(self,
                  include_folders: list,
                  exclude_folders: list,
-                 path_to_rules_folder: str = None):
+                 path_to_rules_folder: str = None,
+                 use_rule_packages: bool = True):
 
         self.include_folders = include_folders
         self.exclude_folders = exclude_folders
         self.path_to_rules_folder = path_to_rules_folder
+        self.paths = []
+        self.modules = []
 
         if len(self.include_folders) > 0 and len(self.exclude_folders) > 0:
             ProgramReporter.show_error_message(
@@ -38,18 +65,75 @@ class CRules:
         # get all paths
         t_paths = list(glob.glob(self.path_to_rules_folder + os.sep*2 + "**" + os.sep*2 + "*.py", recursive=True))
 
+        # Path separator in regular expression, the backslash on Windows has to be escaped
+        separator = re.escape(os.sep)
+
         if len(self.exclude_folders) > 0:
             self.paths = t_paths
             for exclude_folder in self.exclude_folders:
 
-                regex = re.compile(r".*" + os.sep*2 + exclude_folder + os.sep*2 + r".*")
+                regex = re.compile(r".*" + separator + re.escape(exclude_folder) + separator + r".*")
                 self.paths = [i for i in self.paths if not regex.match(i)]
 
         elif len(self.include_folders) > 0:
             for include_folder in self.include_folders:
 
-                regex = re.compile(r".*" + os.sep * 2 + include_folder + os.sep * 2 + r".*")
+                regex = re.compile(r".*" + separator + re.escape(include_folder) + separator + r".*")
                 self.paths += [i for i in t_paths if regex.match(i)]
 
         else:
             self.paths = t_paths
+
+        if use_rule_packages:
+            self.modules = self._get_rule_package_modules()
+
+    def _get_rule_package_modules(self) -> list:
+        """
+        Collects names of modules provided by installed rule packages.
+        Packages are found through the entry point group, so no filesystem walk
+        over the rules folder is needed and modules are imported by the standard import system.
+        :return: List of module names
+        """
+
+        modules = []
+        for entry_point in entry_points(group=self.entry_point_group):
+            try:
+                package = importlib.import_module(entry_point.module)
+
+            except (Exception, ) as e:
+                ProgramReporter.show_warning_message(
+                    message=f"Unable to load a rule package {entry_point.name} ({entry_point.module}).\n"
+                            f"Python interpreter report: {e}"
+                )
+                continue
+
+            # Single module registered as a rule package
+            if not hasattr(package, "__path__"):
+                modules.append(package.__name__)
+                continue
+
+            for module_info in pkgutil.walk_packages(package.__path__, prefix=package.__name__ + "."):
+                if module_info.ispkg:
+                    continue
+
+                # Subpackages between the registered package and the module are its folders
+                folders = module_info.name[len(package.__name__) + 1:].split(".")[:-1]
+                if self._is_folder_allowed(folders=folders):
+                    modules.append(module_info.name)
+
+        return modules
+
+    def _is_folder_allowed(self, folders: list) -> bool:
+        """
+        Applies include/exclude folders to the folders of a module from a rule package
+        :param folders: Folder (subpackage) names of the module
+        :return: True/False
+        """
+
+        if len(self.exclude_folders) > 0:
+            return not any(folder in self.exclude_folders for folder in folders)
+
+        elif len(self.include_folders) > 0:
+            return any(folder in self.include_folders for folder in folders)
+
+        return True
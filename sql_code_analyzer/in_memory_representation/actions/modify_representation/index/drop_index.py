@@ -8,17 +8,28 @@ from sqlglot import Expression
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
+    from typing import List
     from sql_code_analyzer.in_memory_representation.struct.database import Database
     from sql_code_analyzer.in_memory_representation.struct.table import Table
     from sqlglot import Expression
 
 
 def drop_index(ast: Expression, mem_rep: Database):
+    """
+    Provides parsing of abstract syntax tree of DROP INDEX statement
+    It deletes the index from the tables of the schema which have the index
+
+    :param ast: Abstract syntax tree of DROP INDEX statement
+    :param mem_rep: Reference to memory representation
+    :return: None
+    """
+
     ast_generator = ast.walk(bfs=False)
     visited_nodes = Queue()
 
     index_name = None
-
+    schema_name = None
+    exists = ast.args.get("exists")
 
     stop_parse = False
     while 1 and stop_parse is not True:
@@ -32,16 +43,26 @@ def drop_index(ast: Expression, mem_rep: Database):
 
             # SQLGlot inconsistency, index name is under Table node
             index_name = node.name
+            schema_name = node.db
 
             stop_parse = True
 
-    # Delete all indexes with name "index_name"
-    for key in mem_rep.object_index:
-        # If two, its table, because (schema_name, table_name)
-        if len(key) == 2:
-            table: Table = mem_rep.object_index[key]
-            if index_name in table.indexes:
-                del table.indexes[index_name]
+    # If schema name is not set, then the program will work with the default schema of a database
+    if not schema_name:
+        schema_name = mem_rep.default_schema
+
+    tables: List[Table] = mem_rep.get_index_owners(schema_name=schema_name,
+                                                    index_name=index_name)
+
+    if not tables and not exists:
+        mem_rep._rule_reporter.add_memory_representation_report(
+            message=f"An error occurred when trying to delete the index {index_name} \n"
+                    f"The index does not exists in the schema {schema_name}."
+        )
+
+    # Delete all indexes with name "index_name" in the schema
+    for table in tables:
+        table.delete_index(index_name=index_name)
 
 
 def register(linter) -> None:
@@ -4,8 +4,7 @@ from sql_code_analyzer.in_memory_representation.exceptions import MissingSchemaE
 from sql_code_analyzer.in_memory_representation.struct.column import Column, column_constrains_list
 from sql_code_analyzer.in_memory_representation.struct.constrain import CheckExpression, \
     PreventNotNull, UniqueValue, DefaultValue, ForeignKey, PrimaryKey
-from sql_code_analyzer.in_memory_representation.struct.datatype import Datatype
-from sql_code_analyzer.in_memory_representation.struct.literal import Literal
+from sql_code_analyzer.in_memory_representation.tools.interning import get_datatype, get_literal
 
 from sql_code_analyzer.in_memory_representation.tools.ast_manipulation import get_next_node, skip_lower_nodes
 from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
@@ -87,8 +86,7 @@ def parse_foreign_key(visited_nodes,
                            table_fk=table,
                            table_ref=ref_table)
 
-    table.constrains.setdefault((table, table), []).append(constr_fk)
-    ref_table.constrains.setdefault((ref_table, table), []).append(constr_fk)
+    table.add_constrain(constrain=constr_fk)
 
 
 def create_table(ast: Expression, mem_rep: Database) -> None:
@@ -222,14 +220,15 @@ def create_table(ast: Expression, mem_rep: Database) -> None:
                             # Datatype with two literals(10,20): NUMBER(10,20)
 
                             literals.append(
-                                Literal(node=node)
+                                get_literal(node=node)
                             )
 
                         else:
                             # Here we expect a node that is not part of datatype information anymore,
-                            # So we create a datatype object which will be stored in a column object later
-                            datatype = Datatype(node=datatype_node,
-                                                literals=literals)
+                            # So we get a datatype object which will be stored in a column object later
+                            # Datatype objects are shared by all columns with the same datatype
+                            datatype = get_datatype(node=datatype_node,
+                                                    literals=literals)
                             visited_nodes.put(nodes)
                             break
 
@@ -341,7 +340,7 @@ def create_table(ast: Expression, mem_rep: Database) -> None:
                 # Node layer: SCHEMA -> TABLE CONSTRAIN CheckColumnConstraint (CheckExpression)
                 ################################################################################
 
-                table.constrains.setdefault((table, table), []).append(CheckExpression(expression=str(node.this)))
+                table.add_constrain(constrain=CheckExpression(expression=str(node.this)))
 
                 context_layer_node_depth = node.depth
                 skip_lower_nodes(visited_nodes,
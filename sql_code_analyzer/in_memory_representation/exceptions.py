@@ -12,3 +12,11 @@ class MissingColumnException(Exception):
 
 class TableAlreadyExists(Exception):
     pass
+
+
+class CatalogFormatError(Exception):
+    pass
+
+
+class SchemaDescriptionError(Exception):
+    pass
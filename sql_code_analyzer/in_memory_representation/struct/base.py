@@ -3,6 +3,8 @@
 # Purpose: Base class contains common functionality for every class which represent some database object
 #
 #######################################
+from sqlglot import Expression
+
 from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
 
 
@@ -11,6 +13,9 @@ class Base:
     Base class contains common functionality for every class which represent some database object
     """
 
+    # Subclasses define their attributes in __slots__, instances have no __dict__
+    __slots__ = ()
+
     _rule_reporter = None
 
     # @property
@@ -21,6 +26,33 @@ class Base:
     # def rule_reporter(self, value):
     #     self.rule_reporter = value
 
+    @staticmethod
+    def get_plain_value(value):
+        """
+        Converts a value from abstract syntax tree to a plain value,
+        so the memory representation does not keep references to the tree
+        :param value: The value, nodes are converted to SQL code
+        :return: Plain value
+        """
+        if isinstance(value, Expression):
+            return value.sql()
+
+        if isinstance(value, (list, tuple)):
+            return tuple(Base.get_plain_value(item) for item in value)
+
+        return value
+
+    @staticmethod
+    def get_plain_args(node, exclude=()) -> dict:
+        """
+        Return arguments of the node converted to plain values, arguments without value (None or False) are skipped
+        :param node: The node of abstract syntax tree
+        :param exclude: Names of arguments which are not returned
+        :return: Dictionary of arguments
+        """
+        return {arg: Base.get_plain_value(value) for arg, value in node.args.items()
+                if arg not in exclude and value is not None and value is not False}
+
     @staticmethod
     def check_if_exists(find_attr_val, struct, search_by_attr: str = None) -> bool:
         """
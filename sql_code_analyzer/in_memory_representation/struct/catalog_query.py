@@ -0,0 +1,322 @@
+#######################################
+# File name: catalog_query.py
+# Purpose: CatalogQuery class answers queries about database objects without walking the whole catalog
+#
+# Key features:
+#     CatalogQuery:
+#        Stores: columns by datatype
+#                columns by name
+#                constraints by kind
+#                tables without primary key
+#        Foreign key queries are answered by the dependency graph of database (see DependencyGraph)
+#        Indexes are updated when objects are added to or deleted from memory representation,
+#        so the cost of a query is proportional to its result
+#        Updates can be suspended while the database is bulk loaded, indexes are rebuilt afterwards
+#        Schemas not materialized from a catalog file yet and tables released to catalog storage
+#        are loaded before a query over the whole catalog, referencing tables before a foreign key query
+#
+#######################################
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Dict, List, Tuple, Type
+    from sqlglot.expressions import DataType
+    from sql_code_analyzer.in_memory_representation.struct.column import Column
+    from sql_code_analyzer.in_memory_representation.struct.constrain import Constrain, ForeignKey
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+    from sql_code_analyzer.in_memory_representation.struct.dependency_graph import DependencyGraph
+    from sql_code_analyzer.in_memory_representation.struct.schema import Schema
+    from sql_code_analyzer.in_memory_representation.struct.table import Table
+
+
+class CatalogQuery:
+    """
+    Secondary indexes of memory representation.
+    Buckets are dictionaries used as ordered sets, so results keep the order in which objects were added.
+    """
+
+    __slots__ = ("columns_by_datatype", "columns_by_name", "constrains_by_kind",
+                 "tables_without_primary_key", "database", "dependencies", "suspended")
+
+    def __init__(self, database: Database, dependencies: DependencyGraph):
+        """
+        :param database: Indexed database
+        :param dependencies: Dependency graph of the database
+        """
+
+        # DataType.Type -> columns
+        self.columns_by_datatype: Dict[DataType.Type, Dict[Column, None]] = {}
+
+        # Column name -> columns
+        self.columns_by_name: Dict[str, Dict[Column, None]] = {}
+
+        # Constraint class -> constraint: owner (column or table)
+        self.constrains_by_kind: Dict[Type[Constrain], Dict[Constrain, object]] = {}
+
+        self.tables_without_primary_key: Dict[Table, None] = {}
+
+        self.database: Database = database
+
+        self.dependencies: DependencyGraph = dependencies
+
+        # Updates are ignored while suspended
+        self.suspended: bool = False
+
+    ##################################################
+    #                  PRIVATE METHODS
+    ##################################################
+
+    @staticmethod
+    def _add(index: dict, key, item, value=None) -> None:
+        index.setdefault(key, {})[item] = value
+
+    @staticmethod
+    def _discard(index: dict, key, item) -> None:
+        bucket = index.get(key)
+        if bucket is None:
+            return
+
+        bucket.pop(item, None)
+        if not bucket:
+            del index[key]
+
+    def _load_all(self) -> None:
+        """
+        Materializes schemas which were not loaded from a catalog file yet
+        and loads tables released to catalog storage, only registered tables are in indexes
+        """
+
+        self.database.load_all_schemas()
+
+    ##################################################
+    #                  PUBLIC METHODS
+    ##################################################
+
+    #########################
+    #      REGISTRATION
+    #########################
+
+    def register_constrain(self, owner, constrain: Constrain) -> None:
+        """
+        Adds the constraint to indexes
+        :param owner: Column or table which has the constraint
+        :param constrain: The constraint
+        :return: None
+        """
+
+        if self.suspended:
+            return
+
+        self._add(self.constrains_by_kind, type(constrain), constrain, owner)
+
+    def cancel_constrain(self, constrain: Constrain) -> None:
+        """
+        Deletes the constraint from indexes
+        :param constrain: The constraint
+        :return: None
+        """
+
+        if self.suspended:
+            return
+
+        self._discard(self.constrains_by_kind, type(constrain), constrain)
+
+    def register_column(self, column: Column) -> None:
+        """
+        Adds the column and its constraints to indexes
+        :param column: The column
+        :return: None
+        """
+
+        if self.suspended:
+            return
+
+        if column.datatype is not None:
+            self._add(self.columns_by_datatype, column.datatype.column_datatype, column)
+        self._add(self.columns_by_name, column.name, column)
+
+        for constrain in column.constrains:
+            self.register_constrain(owner=column, constrain=constrain)
+
+    def cancel_column(self, column: Column) -> None:
+        """
+        Deletes the column and its constraints from indexes
+        :param column: The column
+        :return: None
+        """
+
+        if self.suspended:
+            return
+
+        if column.datatype is not None:
+            self._discard(self.columns_by_datatype, column.datatype.column_datatype, column)
+        self._discard(self.columns_by_name, column.name, column)
+
+        for constrain in column.constrains:
+            self.cancel_constrain(constrain=constrain)
+
+    def update_primary_key(self, table: Table) -> None:
+        """
+        Updates indexes after the primary key of table was set or deleted
+        :param table: The table
+        :return: None
+        """
+
+        if self.suspended:
+            return
+
+        if table.primary_key is None:
+            self.tables_without_primary_key[table] = None
+        else:
+            self.tables_without_primary_key.pop(table, None)
+
+    def _get_table_constrains(self, table: Table) -> list:
+        """
+        Return constraints which belong to the table itself, not to its columns
+        """
+
+        constrains = list(table.constrains.get((table, table), []))
+        constrains.extend(table.indexes.values())
+        if table.primary_key is not None:
+            constrains.append(table.primary_key)
+
+        return constrains
+
+    def register_table(self, table: Table) -> None:
+        """
+        Adds the table with all its columns and constraints to indexes
+        :param table: The table
+        :return: None
+        """
+
+        if self.suspended:
+            return
+
+        self.update_primary_key(table=table)
+
+        for column in table.columns.values():
+            self.register_column(column=column)
+
+        for constrain in self._get_table_constrains(table=table):
+            self.register_constrain(owner=table, constrain=constrain)
+
+    def cancel_table(self, table: Table) -> None:
+        """
+        Deletes the table with all its columns and constraints from indexes
+        :param table: The table
+        :return: None
+        """
+
+        if self.suspended:
+            return
+
+        self.tables_without_primary_key.pop(table, None)
+
+        for column in table.columns.values():
+            self.cancel_column(column=column)
+
+        for constrain in self._get_table_constrains(table=table):
+            self.cancel_constrain(constrain=constrain)
+
+    def register_schema(self, schema: Schema) -> None:
+        """
+        Adds all tables of the schema to indexes
+        :param schema: The schema
+        :return: None
+        """
+
+        for table in schema.tables.values():
+            self.register_table(table=table)
+
+    def cancel_schema(self, schema: Schema) -> None:
+        """
+        Deletes all tables of the schema from indexes
+        :param schema: The schema
+        :return: None
+        """
+
+        for table in schema.tables.values():
+            self.cancel_table(table=table)
+
+    #########################
+    #         QUERIES
+    #########################
+
+    def get_columns_by_datatype(self, datatype: DataType.Type) -> List[Column]:
+        """
+        Return all columns with the datatype
+        :param datatype: The datatype, e.g. DataType.Type.VARCHAR
+        :return: List of columns
+        """
+
+        self._load_all()
+        return list(self.columns_by_datatype.get(datatype, ()))
+
+    def get_columns_by_name(self, column_name: str) -> List[Column]:
+        """
+        Return columns with the name across all schemas and tables
+        :param column_name: The column name
+        :return: List of columns
+        """
+
+        self._load_all()
+        return list(self.columns_by_name.get(column_name, ()))
+
+    def get_constrains(self, kind: Type[Constrain]) -> List[Tuple[object, Constrain]]:
+        """
+        Return all constraints of the kind
+        :param kind: Constraint class, e.g. PreventNotNull
+        :return: List of (owner, constraint), owner is a column or a table
+        """
+
+        self._load_all()
+        return [(owner, constrain) for constrain, owner in self.constrains_by_kind.get(kind, {}).items()]
+
+    def get_tables_without_primary_key(self) -> List[Table]:
+        """
+        Return tables which have no primary key
+        :return: List of tables
+        """
+
+        self._load_all()
+        return list(self.tables_without_primary_key)
+
+    def get_foreign_keys(self, table: Table) -> List[ForeignKey]:
+        """
+        Return foreign keys of the table
+        :param table: Referencing table
+        :return: List of foreign keys
+        """
+
+        return self.dependencies.get_foreign_keys(table=table)
+
+    def get_referencing_foreign_keys(self, table: Table) -> List[ForeignKey]:
+        """
+        Return foreign keys which reference the table
+        :param table: Referenced table
+        :return: List of foreign keys
+        """
+
+        self.database.load_referencing_tables(table=table)
+        return self.dependencies.get_referencing_foreign_keys(table=table)
+
+    def get_referencing_tables(self, table: Table) -> List[Table]:
+        """
+        Return tables which reference the table by a foreign key
+        :param table: Referenced table
+        :return: List of tables
+        """
+
+        self.database.load_referencing_tables(table=table)
+        return self.dependencies.get_referencing_tables(table=table)
+
+    def get_referenced_tables(self, table: Table) -> List[Table]:
+        """
+        Return tables which are referenced by foreign keys of the table
+        :param table: Referencing table
+        :return: List of tables
+        """
+
+        return self.dependencies.get_referenced_tables(table=table)
@@ -0,0 +1,107 @@
+#######################################
+# File name: catalog_storage.py
+# Purpose: CatalogStorage class is the interface of storage which keeps memory representation out of memory
+#
+# Key features:
+#     CatalogStorage:
+#        Database with a storage keeps in memory only the tables which were used recently,
+#        other tables are loaded from the storage when they are looked up
+#        Database, schemas, tables and columns have the same API, lookups of database call the storage
+#        (load_table, load_schema_tables, ...) before they search in memory
+#        Changes are reported by notify_change of database, the storage writes changed tables back
+#        Tables are released only at safe points between statements (release_tables),
+#        so objects used by the statement now being processed stay valid
+#
+#######################################
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from sql_code_analyzer.in_memory_representation.struct.table import Table
+
+
+class CatalogStorage(ABC):
+    """
+    Storage of memory representation, see SQLiteStorage
+    """
+
+    @abstractmethod
+    def notify_change(self, changed_object) -> None:
+        """
+        The object is going to be changed
+        :param changed_object: Database, schema, table or column
+        :return: None
+        """
+
+    @abstractmethod
+    def load_table(self, schema_name: str, table_name: str) -> None:
+        """
+        Loads the table into its schema if it is stored and not loaded yet
+        :param schema_name: Schema name
+        :param table_name: Table name
+        :return: None
+        """
+
+    @abstractmethod
+    def load_schema_tables(self, schema_name: str) -> None:
+        """
+        Loads all tables of the schema
+        :param schema_name: Schema name
+        :return: None
+        """
+
+    @abstractmethod
+    def load_referencing_tables(self, table: Table) -> None:
+        """
+        Loads all tables which reference the table by a foreign key
+        :param table: Referenced table
+        :return: None
+        """
+
+    @abstractmethod
+    def load_index_owners(self, schema_name: str, index_name: str) -> None:
+        """
+        Loads all tables of the schema which have the index with that name
+        :param schema_name: Schema name
+        :param index_name: The index name
+        :return: None
+        """
+
+    @abstractmethod
+    def load_all(self) -> None:
+        """
+        Loads all tables
+        :return: None
+        """
+
+    @abstractmethod
+    def release_tables(self) -> None:
+        """
+        Writes back and releases tables which were not used recently
+        :return: None
+        """
+
+    @abstractmethod
+    def get_fingerprint(self) -> bytes:
+        """
+        Writes all changes and returns hash of the stored memory representation,
+        equal contents have equal hashes
+        :return: The hash
+        """
+
+    @abstractmethod
+    def flush(self) -> None:
+        """
+        Writes all changes to the storage
+        :return: None
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Writes all changes to the storage and closes it
+        :return: None
+        """
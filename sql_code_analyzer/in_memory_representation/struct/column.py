@@ -8,13 +8,16 @@
 #                column datatype
 #                column constrains
 #                connection to the table that belongs to
+#                structural hash (see structural_hash)
 #
 ######################################
 
 from __future__ import annotations
 
 from sql_code_analyzer.in_memory_representation.struct.base import Base
-from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
+from sql_code_analyzer.in_memory_representation.tools.interning import intern_name
+from sql_code_analyzer.in_memory_representation.tools.structural_hash import get_constrains_value, \
+    get_datatype_value, get_digest
 from sqlglot import expressions as exp
 
 from typing import TYPE_CHECKING, Type
@@ -58,6 +61,8 @@ class Column(Base):
     Represents table column in memory representation
     """
 
+    __slots__ = ("name", "is_name_quoted", "datatype", "constrains", "table", "structural_hash")
+
     ###################################
     #              INIT
     ###################################
@@ -75,52 +80,15 @@ class Column(Base):
         :param table: The table to which the column belongs
         """
 
-        self.name: str = identifier.args['this']
+        self.name: str = intern_name(identifier.args['this'])
         self.is_name_quoted: bool = identifier.args['quoted']
         self.datatype: Datatype = datatype
         self.constrains: list = constrains
         self.table: Table = table
-        self._add_column_to_table()
-
-    @property
-    def name(self) -> str:
-        return self._name
-
-    @name.setter
-    def name(self, value):
-        self._name = value
-
-    @property
-    def is_name_quoted(self) -> bool:
-        return self._is_name_quoted
-
-    @is_name_quoted.setter
-    def is_name_quoted(self, value):
-        self._is_name_quoted = value
-
-    @property
-    def datatype(self) -> Datatype:
-        return self._datatype
 
-    @datatype.setter
-    def datatype(self, value):
-        self._datatype = value
-
-    @property
-    def constrains(self) -> list:
-        return self._constrains
-
-    @constrains.setter
-    def constrains(self, value):
-        self._constrains = value
-
-    @property
-    def table(self) -> Table:
-        return self._table
-
-    @table.setter
-    def table(self, value):
-        self._table = value
+        # Cached structural hash, None if not computed since the last change
+        self.structural_hash: bytes | None = None
+        self._add_column_to_table()
 
     def __repr__(self):
         return repr("Column "+str(self.name)+" "+str(self.datatype))
@@ -145,9 +113,11 @@ class Column(Base):
             )
             return
 
+        self.table.database.notify_change(changed_object=self.table)
         self.table.columns[self.name] = self
         self.table.database.index_registration(key=(self.table.schema.name, self.table.name, self.name),
                                          reg_object=self)
+        self.table.database.query.register_column(column=self)
 
     ##################################################
     #                 PUBLIC METHODS
@@ -172,7 +142,9 @@ class Column(Base):
             )
             return
 
+        self.table.database.notify_change(changed_object=self)
         self.constrains.append(constrain)
+        self.table.database.query.register_constrain(owner=self, constrain=constrain)
 
     def delete_constrain(self, constrain: Constrain) -> None:
         """
@@ -190,7 +162,9 @@ class Column(Base):
             )
             return
 
+        self.table.database.notify_change(changed_object=self)
         self.constrains.remove(constrain)
+        self.table.database.query.cancel_constrain(constrain=constrain)
 
     #########################
     #        DATATYPE
@@ -203,7 +177,10 @@ class Column(Base):
         :return: None
         """
 
+        self.table.database.notify_change(changed_object=self)
+        self.table.database.query.cancel_column(column=self)
         self.datatype = new_datatype
+        self.table.database.query.register_column(column=self)
 
     #########################
     #      DELETE COLUMN
@@ -224,12 +201,44 @@ class Column(Base):
                 return
 
         self.table.database.index_cancel_registration(key=(self.table.schema.name, self.table.name, self.name))
+        self.table.database.query.cancel_column(column=self)
+        self.table.database.notify_change(changed_object=self.table)
         del self.table.columns[self.name]
 
     #########################
     #         API
     #########################
 
+    def get_state(self) -> tuple:
+        """
+        Return the state captured by snapshots of memory representation
+        :return: (datatype, constraints)
+        """
+
+        return self.datatype, self.constrains
+
+    def get_structural_hash(self) -> bytes:
+        """
+        Return structural hash of the column, it is computed only if the column changed since the last call
+        :return: The hash
+        """
+
+        structural_hash = getattr(self, "structural_hash", None)
+        if structural_hash is None:
+            structural_hash = self.structural_hash = get_digest("C", self.name, self.is_name_quoted,
+                                                                get_datatype_value(self.datatype),
+                                                                get_constrains_value(self.constrains))
+        return structural_hash
+
+    def invalidate_structural_hash(self) -> None:
+        """
+        Drops cached structural hash of the column and of the objects above it
+        :return: None
+        """
+
+        self.structural_hash = None
+        self.table.invalidate_structural_hash()
+
     ################
     #     GET
     ################
@@ -241,7 +250,7 @@ class Column(Base):
         :return: The constraint or None
         """
 
-        for constrain in self._constrains:
+        for constrain in self.constrains:
             if type(constrain) is constrain_type:
                 return constrain
 
@@ -291,7 +300,7 @@ class Column(Base):
         :return: True/False
         """
 
-        for constrain in self._constrains:
+        for constrain in self.constrains:
             if type(constrain) is constrain_type:
                 return True
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from sql_code_analyzer.in_memory_representation.struct.base import Base
+from sql_code_analyzer.in_memory_representation.tools.interning import intern_name
 
 from typing import TYPE_CHECKING, List
 
@@ -13,6 +14,8 @@ class Constrain(Base):
     This class provides a constraint-specific interface to children classes
     """
 
+    __slots__ = ("name",)
+
     def __init__(self):
         self.name: str = ""
 
@@ -23,7 +26,7 @@ class Constrain(Base):
         :return: None
         """
 
-        self.name: str = name
+        self.name: str = intern_name(name)
 
     def set_property(self, attr: str, val) -> None:
         """
@@ -41,6 +44,8 @@ class PreventNotNull(Constrain):
     Represent NOT NULL constraint in memory representation
     """
 
+    __slots__ = ("column",)
+
     def __init__(self, column: Column | None, name=None):
         """
         :param column: Column to which the restriction applies
@@ -57,15 +62,16 @@ class PrimaryKey(Constrain):
     """
     Represent constraint PRIMARY KEY in memory representation
     """
+
+    __slots__ = ("composite", "columns")
+
     def __init__(self, columns: list):
         """
         :param columns: Columns to which the restriction applies
         """
 
         super().__init__()
-        if len(columns) > 1:
-            self.composite = True
-
+        self.composite: bool = len(columns) > 1
         self.columns = columns
 
 
@@ -73,6 +79,9 @@ class ForeignKey(Constrain):
     """
     Represent FOREIGN KEY constraint in memory representation
     """
+
+    __slots__ = ("table_fk", "table_ref", "fk_columns", "reference_columns")
+
     def __init__(self, fk_columns: [Column], reference_columns: [Column], table_fk, table_ref, name: str = None):
         """
         :param fk_columns: List of columns represents foreign key
@@ -102,8 +111,12 @@ class ForeignKey(Constrain):
         table_fk_key: tuple = (self.table_fk, self.table_fk)
         table_ref_key: tuple = (self.table_ref, self.table_fk)
 
+        self.table_fk.database.notify_change(changed_object=self.table_fk)
+        self.table_fk.database.notify_change(changed_object=self.table_ref)
         table_fk_constrains[table_fk_key].remove(self)
         table_ref_constrains[table_ref_key].remove(self)
+        self.table_fk.database.dependencies.remove_foreign_key(foreign_key=self)
+        self.table_fk.database.query.cancel_constrain(constrain=self)
 
         if len(table_fk_constrains[table_fk_key]) == 0:
             table_fk_constrains.pop(table_fk_key, None)
@@ -116,6 +129,9 @@ class UniqueValue(Constrain):
     """
     Represent UNIQUE constraint in memory representation
     """
+
+    __slots__ = ("column", "primary_key")
+
     def __init__(self, column: Column, primary_key=False, name=None):
         """
         :param column: Column to which the restriction applies
@@ -135,6 +151,9 @@ class DefaultValue(Constrain):
     """
     Represent DEFAULT constraint in memory representation
     """
+
+    __slots__ = ("default_value", "column")
+
     def __init__(self, default_value, column: Column | None, name=None):
         """
         :param default_value: Default value of constraint
@@ -152,6 +171,9 @@ class Index(Constrain):
     """
     Represent INDEX in memory representation
     """
+
+    __slots__ = ("columns",)
+
     def __init__(self, name: str, columns: List[Column]):
         """
         :param columns: Columns to which the restriction applies
@@ -167,6 +189,9 @@ class CheckExpression(Constrain):
     """
     Represent CHECK constraint in memory representation
     """
+
+    __slots__ = ("expression",)
+
     def __init__(self, expression, name=None):
         """
         :param expression: Representation of condition
@@ -6,24 +6,41 @@
 #     Database:
 #        Stores: database name,
 #                database schemas
-#                index with points to every object in a database providing shortcuts
+#                index with points to every object in a database providing shortcuts (see ObjectIndex)
+#                map of index names to the tables which own the index
+#                graph of foreign key relationships between tables (see DependencyGraph)
+#                secondary indexes for queries about objects (see CatalogQuery)
+#        Bulk loading defers maintenance of indexes, they are built in one pass at the end
+#        Copy-on-write snapshots of memory representation (see CatalogSnapshot)
+#        Schemas loaded from a catalog file are materialized on first access (see serialization)
+#        Tables kept in a catalog storage are loaded on first access (see CatalogStorage)
+#        Structural hash of the whole catalog, only hashes of objects changed since the last read are computed
+#        (see structural_hash)
 #
 #######################################
 
 
 from __future__ import annotations
 
+import weakref
+from contextlib import contextmanager
+
 from sql_code_analyzer.in_memory_representation.exceptions import MissingTableException, MissingSchemaException, \
-    TableAlreadyExists
+    TableAlreadyExists, CatalogFormatError
 from sql_code_analyzer.in_memory_representation.struct.base import Base
+from sql_code_analyzer.in_memory_representation.struct.catalog_query import CatalogQuery
+from sql_code_analyzer.in_memory_representation.struct.dependency_graph import DependencyGraph
+from sql_code_analyzer.in_memory_representation.struct.object_index import ObjectIndex
+from sql_code_analyzer.in_memory_representation.struct.snapshot import CatalogSnapshot
 from sql_code_analyzer.in_memory_representation.struct.table import Table
 from sql_code_analyzer.in_memory_representation.struct.schema import Schema
-from typing import TYPE_CHECKING
+from sql_code_analyzer.in_memory_representation.tools.structural_hash import get_digest
+from typing import TYPE_CHECKING, Iterator, List
 
 from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
 
 if TYPE_CHECKING:
-    ...
+    from sql_code_analyzer.in_memory_representation.struct.catalog_storage import CatalogStorage
 
 
 class Database(Base):
@@ -31,6 +48,9 @@ class Database(Base):
     Represents a database in memory representation.
     """
 
+    __slots__ = ("name", "default_schema", "schemas", "object_index", "index_owners", "dependencies", "query",
+                 "bulk_loading", "snapshots", "lazy_schemas", "storage", "structural_hash")
+
     ###################################
     #              INIT
     ###################################
@@ -42,39 +62,43 @@ class Database(Base):
         self.name = db_name
         self.default_schema = "dbo"
         self.schemas = {}
-        self.object_index = {}
+        self.object_index = ObjectIndex(database=self)
+
+        # (schema name, index name) -> tables which have the index, keyed by table name
+        self.index_owners = {}
 
-    @property
-    def name(self) -> str:
-        return self._name
+        # Foreign keys between tables
+        self.dependencies = DependencyGraph()
 
-    @name.setter
-    def name(self, value):
-        self._name = value
+        # Columns by datatype, constraints by kind, tables without primary key etc.
+        self.query = CatalogQuery(database=self, dependencies=self.dependencies)
 
-    @property
-    def schemas(self) -> dict:
-        return self._schemas
+        # Objects are not registered to indexes while bulk loading
+        self.bulk_loading = False
 
-    @schemas.setter
-    def schemas(self, value):
-        self._schemas = value
+        # Snapshots which capture changes of memory representation
+        self.snapshots = weakref.WeakSet()
 
-    @property
-    def object_index(self) -> dict:
-        return self._object_index
+        # Schema name -> segment of catalog file with the schema, the schema is not materialized yet
+        self.lazy_schemas = {}
 
-    @object_index.setter
-    def object_index(self, value):
-        self._object_index = value
+        # Storage of tables which are not in memory, None if the whole database is in memory
+        self.storage: CatalogStorage | None = None
 
-    @property
-    def default_schema(self):
-        return self._default_schema
+        # Cached structural hash, None if not computed since the last change
+        self.structural_hash: bytes | None = None
 
-    @default_schema.setter
-    def default_schema(self, value):
-        self._default_schema = value
+    def __getstate__(self):
+        # Snapshots and storage belong to the running program, they are not serialized
+        return None, {name: getattr(self, name) for name in self.__slots__ if name not in ("snapshots", "storage")}
+
+    def __setstate__(self, state):
+        _, slots = state
+        self.structural_hash = None
+        for name, value in slots.items():
+            setattr(self, name, value)
+        self.snapshots = weakref.WeakSet()
+        self.storage = None
 
     ##################################################
     #                  PRIVATE METHODS
@@ -116,89 +140,404 @@ class Database(Base):
         :return: None
         """
 
+        if self.bulk_loading:
+            return
+
         self.object_index[key] = reg_object
 
     def index_cancel_registration(self, key) -> None:
         """
         Delete an object from database index
+        All objects below the object are deleted as well,
+        e.g. when a table is deleted, also its columns are deleted from the index
         :param key: The key of object in database index
         :return: None
         """
 
-        # list where are stored items that will be deleted from object_index
-        to_delete = []
-
-        # iterate through all items in object_index
-        for o in self.object_index:
-
-            # because the algorithm works with __len__() then functionality is different
-            # when str, then __len__() counts number of chars
-            # when tuple, then __len() counts number of items in tuple
-
-            # if strings are same
-            if o is str and key is str:
-                if o == key:
-                    to_delete.append(o)
-
-            # not same type, cant be same, continue
-            elif isinstance(o, str) and not isinstance(key, str):
-                continue
-
-            # not same type, cant be same, continue
-            elif not isinstance(o, str) and isinstance(key, str):
-                continue
-
-            # check if tuples have mutual attributes in structure like
-            # we need to delete all references to sublevel parts of deleted item
-            # so all objects that have the same attributes(on the same level) as deleted one,
-            # they need to be deleted as well
-            #
-            #       |level0|  |level1|  |level2| ... |level n||
-            # 1) (  schema1,  table1,    col1   )
-            # 2) (  schema1,  table1,    col2   )
-            # 3) (  schema1,  table2,    col1   )
-            #
-            # 1) and 2) have same schema1, table1 => same table, different columns (object points to columns)
-            # 1), 2), 3) have same schema, but different table, then they are differs from table level
-            elif o.__len__() >= key.__len__():
-                mutual_parents = True
-                for i in range(0, key.__len__()):
-                    if o[i] != key[i]:
-                        mutual_parents = False
-                        break
-                if mutual_parents:
-                    to_delete.append(o)
-
-        for reg in to_delete:
-            self.object_index.pop(reg)
+        if self.bulk_loading:
+            return
+
+        self.object_index.remove(key)
+
+    def index_owner_registration(self, schema_name: str, index_name: str, table: Table) -> None:
+        """
+        Register the table as owner of the index
+        :param schema_name: Schema name of the table
+        :param index_name: The index name
+        :param table: The table
+        :return: None
+        """
+
+        if self.bulk_loading:
+            return
+
+        self.index_owners.setdefault((schema_name, index_name), {})[table.name] = table
+
+    def index_owner_cancel_registration(self, schema_name: str, index_name: str, table_name: str) -> None:
+        """
+        Cancel registration of the table as owner of the index
+        :param schema_name: Schema name of the table
+        :param index_name: The index name
+        :param table_name: The table name
+        :return: None
+        """
+
+        if self.bulk_loading:
+            return
+
+        key = (schema_name, index_name)
+        owners = self.index_owners.get(key)
+        if owners is None:
+            return
+
+        owners.pop(table_name, None)
+        if not owners:
+            del self.index_owners[key]
+
+    def get_index_owners(self, schema_name: str, index_name: str) -> List[Table]:
+        """
+        Return tables of the schema which have the index with that name
+        :param schema_name: Schema name
+        :param index_name: The index name
+        :return: List of tables
+        """
+
+        self.load_schema(schema_name=schema_name)
+        if self.storage is not None:
+            self.storage.load_index_owners(schema_name=schema_name, index_name=index_name)
+        return list(self.index_owners.get((schema_name, index_name), {}).values())
+
+    def get_object_by_path(self, index_key):
+        """
+        Get an object by walking schemas, tables and columns, the database index is not used
+        :param index_key: The database index key which refers to the object
+        :return: The object or None
+        """
+
+        path = (index_key,) if isinstance(index_key, str) else tuple(index_key)
+        if not path:
+            return None
+
+        self.load_schema(schema_name=path[0])
+        if len(path) >= 2:
+            self.load_table(schema_name=path[0], table_name=path[1])
+        found = self.schemas.get(path[0])
+        if found is not None and len(path) >= 2:
+            found = found.tables.get(path[1])
+        if found is not None and len(path) >= 3:
+            found = found.columns.get(path[2])
+
+        return found
 
     def get_indexed_object(self, index_key):
         """
         Get an object from a database using database index
+        While bulk loading, the index is not complete and the object is found by its path
         :param index_key: The database index key which refers to the object
         :return:
         """
-        if index_key in self.object_index:
+        if self.lazy_schemas and index_key:
+            self.load_schema(schema_name=index_key if isinstance(index_key, str) else index_key[0])
+
+        if self.storage is not None and not isinstance(index_key, str) and len(index_key) >= 2:
+            self.load_table(schema_name=index_key[0], table_name=index_key[1])
+
+        if self.bulk_loading:
+            found = self.get_object_by_path(index_key=index_key)
+            if found is not None:
+                return found
+
+        elif index_key in self.object_index:
             return self.object_index[index_key]
-        else:
-            parsed_index_str = ""
-            index_key_len = len(index_key)
-
-            if index_key_len >= 1:
-                parsed_index_str = parsed_index_str + f"schema {index_key[0]}"
-            if index_key_len >= 2:
-                parsed_index_str = parsed_index_str + f", table {index_key[1]}"
-            if index_key_len >= 3:
-                parsed_index_str = parsed_index_str + f", column {index_key[2]}"
-
-            ProgramReporter.show_missing_property_error_message(
-                message=f"The {parsed_index_str} is not exists.\n"
-                        f"You see this error because program tried to access property that does not exists.\n"
-                        f"This can happen if SQL is in wrong order. Please check why this property not exists.\n"
-                        f"An error occurred in this SQL statement:\n\n" +
-                        self._rule_reporter.statement[0]
+
+        parsed_index_str = ""
+        index_key_len = len(index_key)
+
+        if index_key_len >= 1:
+            parsed_index_str = parsed_index_str + f"schema {index_key[0]}"
+        if index_key_len >= 2:
+            parsed_index_str = parsed_index_str + f", table {index_key[1]}"
+        if index_key_len >= 3:
+            parsed_index_str = parsed_index_str + f", column {index_key[2]}"
+
+        ProgramReporter.show_missing_property_error_message(
+            message=f"The {parsed_index_str} is not exists.\n"
+                    f"You see this error because program tried to access property that does not exists.\n"
+                    f"This can happen if SQL is in wrong order. Please check why this property not exists.\n"
+                    f"An error occurred in this SQL statement:\n\n" +
+                    self._rule_reporter.statement[0]
+        )
+
+    ###########################
+    #        SNAPSHOTS
+    ###########################
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        Creates copy-on-write snapshot of memory representation, nothing is copied at this moment
+        The snapshot captures changes until it is released or garbage collected
+        :return: The snapshot
+        """
+
+        snapshot = CatalogSnapshot(database=self)
+        self.snapshots.add(snapshot)
+        return snapshot
+
+    def notify_change(self, changed_object) -> None:
+        """
+        Notifies snapshots that the object is going to be changed, so they can save its current state
+        :param changed_object: Database, schema, table or column
+        :return: None
+        """
+
+        if self.storage is not None:
+            self.storage.notify_change(changed_object=changed_object)
+
+        changed_object.invalidate_structural_hash()
+
+        if not self.snapshots:
+            return
+
+        for snapshot in self.snapshots:
+            snapshot.save(catalog_object=changed_object)
+
+    def get_state(self) -> tuple:
+        """
+        Return the state captured by snapshots of memory representation
+        :return: (schemas, )
+        """
+
+        return self.schemas,
+
+    ###########################
+    #     STRUCTURAL HASH
+    ###########################
+    def get_structural_hash(self) -> bytes:
+        """
+        Return structural hash of the whole catalog, equal catalogs have equal hashes
+        Only hashes of objects changed since the last call are computed, reading an unchanged catalog costs O(1)
+        Database name is not part of the hash, so catalogs of differently named databases can be compared
+        :return: The hash
+        """
+
+        structural_hash = getattr(self, "structural_hash", None)
+        if structural_hash is None:
+            for schema_name in list(self.lazy_schemas):
+                self.load_schema(schema_name=schema_name)
+
+            structural_hash = self.structural_hash = get_digest(
+                "D", self.default_schema,
+                tuple(sorted((name, schema.get_structural_hash()) for name, schema in self.schemas.items())))
+        return structural_hash
+
+    def invalidate_structural_hash(self) -> None:
+        """
+        Drops cached structural hash of the database
+        :return: None
+        """
+
+        self.structural_hash = None
+
+    ###########################
+    #      LAZY SCHEMAS
+    ###########################
+    def register_schema(self, schema: Schema) -> None:
+        """
+        Registers the schema with all its objects to the database index, dependency graph and secondary indexes,
+        e.g. of a schema loaded from a file or moved from another process
+        :param schema: The schema, already stored in the database
+        :return: None
+        """
+
+        self.index_registration(key=schema.name,
+                                reg_object=schema)
+
+        for table in schema.tables.values():
+            self.register_table(table=table)
+
+    def register_table(self, table: Table) -> None:
+        """
+        Registers the table with its columns to the database index, dependency graph and secondary indexes,
+        e.g. of a table loaded from a catalog storage
+        :param table: The table, already stored in its schema
+        :return: None
+        """
+
+        schema_name = table.schema.name
+        self.index_registration(key=(schema_name, table.name),
+                                reg_object=table)
+        self.dependencies.register_table(table=table)
+        for index_name in table.indexes:
+            self.index_owner_registration(schema_name=schema_name,
+                                          index_name=index_name,
+                                          table=table)
+        for column in table.columns.values():
+            self.index_registration(key=(schema_name, table.name, column.name),
+                                    reg_object=column)
+
+        self.query.register_table(table=table)
+
+    def cancel_table_registration(self, table: Table) -> None:
+        """
+        Cancels registration of the table made by register_table, e.g. of a table released to a catalog storage
+        :param table: The table
+        :return: None
+        """
+
+        table.cancel_index_owner_registration()
+        self.index_cancel_registration(key=(table.schema.name, table.name))
+        self.dependencies.remove_table(table=table)
+        self.query.cancel_table(table=table)
+
+    def load_schema(self, schema_name: str) -> None:
+        """
+        Materializes the schema if it was not loaded from a catalog file yet.
+        Schemas related by foreign keys are stored in one segment and they are materialized together.
+        :param schema_name: Schema name
+        :return: None
+        """
+
+        segment = self.lazy_schemas.get(schema_name)
+        if segment is None:
+            return
+
+        for name in segment.schema_names:
+            self.lazy_schemas.pop(name, None)
+
+        try:
+            schemas = segment.load(database=self)
+
+        except CatalogFormatError as e:
+            ProgramReporter.show_error_message(
+                message=f"Deserialization of schema {schema_name} failed, {e}"
+            )
+            return
+
+        for schema in schemas:
+            self.register_schema(schema=schema)
+
+            # The schema existed when the snapshots were created
+            for snapshot in self.snapshots:
+                snapshot.add_loaded_schema(schema=schema)
+
+    def load_all_schemas(self) -> None:
+        """
+        Materializes all schemas which were not loaded from a catalog file yet
+        :return: None
+        """
+
+        for schema_name in list(self.lazy_schemas):
+            self.load_schema(schema_name=schema_name)
+
+        if self.storage is not None:
+            self.storage.load_all()
+
+    ###########################
+    #     CATALOG STORAGE
+    ###########################
+    def load_table(self, schema_name: str, table_name: str) -> None:
+        """
+        Loads the table from catalog storage if it is not in memory
+        :param schema_name: Schema name
+        :param table_name: Table name
+        :return: None
+        """
+
+        if self.storage is None:
+            return
+
+        try:
+            self.storage.load_table(schema_name=schema_name, table_name=table_name)
+
+        except CatalogFormatError as e:
+            ProgramReporter.show_error_message(
+                message=f"Loading of table {schema_name}.{table_name} from catalog storage failed, {e}"
             )
 
+    def load_schema_tables(self, schema_name: str) -> None:
+        """
+        Materializes the schema and loads all its tables from catalog storage
+        :param schema_name: Schema name
+        :return: None
+        """
+
+        self.load_schema(schema_name=schema_name)
+        if self.storage is not None:
+            self.storage.load_schema_tables(schema_name=schema_name)
+
+    def load_referencing_tables(self, table: Table) -> None:
+        """
+        Loads tables which reference the table from catalog storage,
+        so the dependency graph contains all relationships of the table
+        :param table: Referenced table
+        :return: None
+        """
+
+        if self.storage is not None:
+            self.storage.load_referencing_tables(table=table)
+
+    def release_tables(self) -> None:
+        """
+        Releases least recently used tables to catalog storage, changed tables are written back
+        Must be called only between statements, when no released object is in use
+        :return: None
+        """
+
+        if self.storage is not None:
+            self.storage.release_tables()
+
+    ###########################
+    #        BULK LOAD
+    ###########################
+    @contextmanager
+    def bulk_load(self) -> Iterator[Database]:
+        """
+        Context manager for loading many objects at once, e.g. the schema of a database server.
+        Inside the context, objects are not registered to indexes one by one.
+        All indexes are built in one pass when the context is left.
+        :return: Database instance
+        """
+
+        self.bulk_loading = True
+        self.query.suspended = True
+        try:
+            yield self
+        finally:
+            self.bulk_loading = False
+            self.query.suspended = False
+            self.rebuild_indexes()
+
+    def rebuild_indexes(self, dependencies: bool = False) -> None:
+        """
+        Builds the database index, index owners and secondary indexes from schemas, tables and columns
+        Dependency graph is kept, it is maintained also while bulk loading
+        :param dependencies: Builds also the dependency graph, e.g. of a database loaded from a file
+        :return: None
+        """
+
+        self.object_index = ObjectIndex(database=self)
+        self.index_owners = {}
+
+        if dependencies:
+            self.dependencies = DependencyGraph()
+            for schema in self.schemas.values():
+                for table in schema.tables.values():
+                    self.dependencies.register_table(table=table)
+
+        self.query = CatalogQuery(database=self, dependencies=self.dependencies)
+
+        self.object_index.update_children(key=(), objects=self.schemas)
+
+        for schema in self.schemas.values():
+            self.object_index.update_children(key=schema.name, objects=schema.tables)
+
+            for table in schema.tables.values():
+                self.object_index.update_children(key=(schema.name, table.name), objects=table.columns)
+
+                for index_name in table.indexes:
+                    self.index_owner_registration(schema_name=schema.name, index_name=index_name, table=table)
+
+            self.query.register_schema(schema=schema)
+
     ###########################
     #         CHECKS
     ###########################
@@ -209,6 +548,7 @@ class Database(Base):
         :return: True/False
         """
 
+        self.load_schema(schema_name=target_schema_name)
         return self.check_if_exists(target_schema_name, self.schemas)
 
     ###########################
@@ -224,6 +564,7 @@ class Database(Base):
         if schema_name == "":
             schema_name = self.default_schema
 
+        self.load_schema(schema_name=schema_name)
         schema_instance = self.get_instance_or_error(find_attr_val=schema_name,
                                                      find_in_struct=self.schemas,
                                                      exception=MissingSchemaException
@@ -237,6 +578,7 @@ class Database(Base):
         :param schema_name: Schema name
         :return: Schema object
         """
+        self.load_schema(schema_name=schema_name)
         instance = self.get_instance_or_none(find_attr_val=schema_name,
                                              find_in_struct=self.schemas
                                              )
@@ -257,6 +599,7 @@ class Database(Base):
         """
 
         schema_instance = self.get_schema_by_name_or_error(schema_name)
+        self.load_table(schema_name=schema_instance.name, table_name=table_name)
 
         table_instance = self.get_instance_or_error(find_attr_val=table_name,
                                                     find_in_struct=schema_instance.tables,
@@ -278,10 +621,12 @@ class Database(Base):
         :return: Table object
         """
 
+        self.load_schema(schema_name=schema_name)
         schema_instance = self.get_instance_or_error(find_attr_val=schema_name,
                                                      find_in_struct=self.schemas,
                                                      exception=MissingSchemaException
                                                      )
+        self.load_table(schema_name=schema_name, table_name=table_name)
 
         table_instance = self.get_instance_or_none(find_attr_val=table_name,
                                                    find_in_struct=schema_instance.tables
@@ -307,10 +652,12 @@ class Database(Base):
         :return: Table object
         """
 
+        self.load_schema(schema_name=schema_name)
         schema_instance = self.get_instance_or_error(find_attr_val=schema_name,
                                                      find_in_struct=self.schemas,
                                                      exception=MissingSchemaException
                                                      )
+        self.load_table(schema_name=schema_name, table_name=table_name)
 
         table_instance = self.get_instance_or_none(find_attr_val=table_name,
                                                    find_in_struct=schema_instance.tables
@@ -6,6 +6,9 @@ class Datatype(Base):
     Represents column datatype in memory representation
     """
 
+    # Shared datatypes are weakly referenced by interning (see interning.py)
+    __slots__ = ("column_datatype", "literals", "args", "__weakref__")
+
     def __init__(self, node, literals: list):
         """
         :param node: Datatype node from abstract syntax tree
@@ -13,25 +16,17 @@ class Datatype(Base):
         """
         self.column_datatype = node.this
 
+        # Datatype can be shared by more columns, so its literals are not modified
         self.literals: list = literals
 
-        self.args = {}
-        for arg in node.args:
-            if arg not in ["this", "kind", "expressions"]:
-                self.args[arg] = node.args[arg]
-
-    @property
-    def column_datatype(self):
-        return self._column_datatype
-
-    @column_datatype.setter
-    def column_datatype(self, value):
-        self._column_datatype = value
+        self.args = self.get_plain_args(node=node, exclude=("this", "kind", "expressions"))
 
-    @property
-    def literals(self) -> list:
-        return self._literals
+    def get_key(self) -> tuple:
+        """
+        Return the key of the datatype value, datatypes with the same key can be shared
+        :return: The key
+        """
+        return (self.column_datatype,
+                tuple(literal.get_key() for literal in self.literals),
+                tuple(sorted(self.args.items())))
 
-    @literals.setter
-    def literals(self, value):
-        self._literals = value
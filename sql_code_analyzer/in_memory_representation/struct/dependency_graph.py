@@ -0,0 +1,213 @@
+#######################################
+# File name: dependency_graph.py
+# Purpose: DependencyGraph class represents foreign key relationships between tables
+#
+# Key features:
+#     DependencyGraph:
+#        Stores: referenced tables of each table with the foreign keys which reference them
+#                referencing tables of each table with their foreign keys
+#        Provides topological order of tables, referenced tables are ordered before referencing
+#        The cost of queries and updates is proportional to the count of relationships of the table,
+#        not to the size of database
+#
+#######################################
+
+from __future__ import annotations
+
+from collections import deque
+
+from sql_code_analyzer.in_memory_representation.struct.constrain import ForeignKey
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, List
+    from sql_code_analyzer.in_memory_representation.struct.table import Table
+
+
+class DependencyGraph:
+    """
+    Bidirectional graph of foreign keys between tables.
+    Edge goes from the referencing table to the referenced table, each edge holds the foreign keys.
+    """
+
+    __slots__ = ("references", "referenced_by")
+
+    def __init__(self):
+        # Referencing table -> referenced table -> foreign keys
+        self.references: Dict[Table, Dict[Table, List[ForeignKey]]] = {}
+
+        # Referenced table -> referencing table -> foreign keys
+        self.referenced_by: Dict[Table, Dict[Table, List[ForeignKey]]] = {}
+
+    ##################################################
+    #                  PRIVATE METHODS
+    ##################################################
+
+    @staticmethod
+    def _remove_edge(graph: dict, source: Table, target: Table, foreign_key: ForeignKey | None = None) -> None:
+        """
+        Removes the foreign key from the edge, or the whole edge if foreign key is not provided
+        """
+
+        edges = graph.get(source)
+        if edges is None or target not in edges:
+            return
+
+        if foreign_key is not None:
+            if foreign_key in edges[target]:
+                edges[target].remove(foreign_key)
+            if edges[target]:
+                return
+
+        del edges[target]
+        if not edges:
+            del graph[source]
+
+    ##################################################
+    #                  PUBLIC METHODS
+    ##################################################
+
+    #########################
+    #      REGISTRATION
+    #########################
+
+    def add_foreign_key(self, foreign_key: ForeignKey) -> None:
+        """
+        Adds the edge between referencing and referenced table of the foreign key
+        :param foreign_key: The foreign key
+        :return: None
+        """
+
+        table_fk, table_ref = foreign_key.table_fk, foreign_key.table_ref
+        self.references.setdefault(table_fk, {}).setdefault(table_ref, []).append(foreign_key)
+        self.referenced_by.setdefault(table_ref, {}).setdefault(table_fk, []).append(foreign_key)
+
+    def remove_foreign_key(self, foreign_key: ForeignKey) -> None:
+        """
+        Removes the foreign key, the edge is removed with the last foreign key
+        :param foreign_key: The foreign key
+        :return: None
+        """
+
+        table_fk, table_ref = foreign_key.table_fk, foreign_key.table_ref
+        self._remove_edge(self.references, table_fk, table_ref, foreign_key)
+        self._remove_edge(self.referenced_by, table_ref, table_fk, foreign_key)
+
+    def register_table(self, table: Table) -> None:
+        """
+        Adds foreign keys of the table, e.g. of a table loaded from another process
+        :param table: The table
+        :return: None
+        """
+
+        for constrain in table.constrains.get((table, table), ()):
+            if isinstance(constrain, ForeignKey):
+                self.add_foreign_key(foreign_key=constrain)
+
+    def remove_table(self, table: Table) -> None:
+        """
+        Removes all edges of the table in both directions
+        :param table: The table
+        :return: None
+        """
+
+        for table_ref in self.references.pop(table, {}):
+            self._remove_edge(self.referenced_by, table_ref, table)
+
+        for table_fk in self.referenced_by.pop(table, {}):
+            self._remove_edge(self.references, table_fk, table)
+
+    #########################
+    #         QUERIES
+    #########################
+
+    def get_referenced_tables(self, table: Table) -> List[Table]:
+        """
+        Return tables which are referenced by foreign keys of the table
+        :param table: Referencing table
+        :return: List of tables
+        """
+
+        return list(self.references.get(table, ()))
+
+    def get_referencing_tables(self, table: Table) -> List[Table]:
+        """
+        Return tables which reference the table by a foreign key
+        :param table: Referenced table
+        :return: List of tables
+        """
+
+        return list(self.referenced_by.get(table, ()))
+
+    def get_foreign_keys(self, table: Table) -> List[ForeignKey]:
+        """
+        Return foreign keys of the table
+        :param table: Referencing table
+        :return: List of foreign keys
+        """
+
+        return [fk for fks in self.references.get(table, {}).values() for fk in fks]
+
+    def get_referencing_foreign_keys(self, table: Table) -> List[ForeignKey]:
+        """
+        Return foreign keys which reference the table
+        :param table: Referenced table
+        :return: List of foreign keys
+        """
+
+        return [fk for fks in self.referenced_by.get(table, {}).values() for fk in fks]
+
+    def is_referenced(self, table: Table) -> bool:
+        """
+        Verify if another table references the table, self-references are ignored
+        :param table: The table
+        :return: True/False
+        """
+
+        referencing = self.referenced_by.get(table, {})
+        return len(referencing) > 1 or (len(referencing) == 1 and table not in referencing)
+
+    def verify_relationship(self, table: Table, another_table: Table) -> bool:
+        """
+        Verify if one of the tables references the other one
+        :param table: The table
+        :param another_table: Another table
+        :return: True/False
+        """
+
+        return another_table in self.references.get(table, {}) or another_table in self.referenced_by.get(table, {})
+
+    def get_topological_order(self, tables: Iterable[Table]) -> List[Table]:
+        """
+        Return tables ordered so that referenced tables are before the tables which reference them.
+        Only relationships between the provided tables are considered, self-references are ignored.
+        Tables in reference cycles are appended at the end in their original order.
+        :param tables: Tables to order
+        :return: Ordered list of tables
+        """
+
+        tables = list(dict.fromkeys(tables))
+        selected = set(tables)
+
+        # Table -> count of referenced tables which are not ordered yet
+        pending = {}
+        for table in tables:
+            pending[table] = sum(1 for table_ref in self.references.get(table, ())
+                                 if table_ref in selected and table_ref is not table)
+
+        queue = deque(table for table in tables if pending[table] == 0)
+        ordered = []
+        while queue:
+            table = queue.popleft()
+            ordered.append(table)
+
+            for table_fk in self.referenced_by.get(table, ()):
+                if table_fk in selected and table_fk is not table:
+                    pending[table_fk] -= 1
+                    if pending[table_fk] == 0:
+                        queue.append(table_fk)
+
+        if len(ordered) < len(tables):
+            ordered.extend(table for table in tables if pending[table] > 0)
+
+        return ordered
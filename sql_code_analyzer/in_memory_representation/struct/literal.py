@@ -5,6 +5,10 @@ class Literal(Base):
     """
     Represents datatype additional arguments in memory representation
     """
+
+    # Shared literals are weakly referenced by interning (see interning.py)
+    __slots__ = ("value", "is_int", "is_number", "is_star", "is_string", "args", "__weakref__")
+
     def __init__(self, node):
         """
         :param node: Node of literal from abstract syntax tree
@@ -15,52 +19,13 @@ class Literal(Base):
         self.is_number = node.is_number
         self.is_star = node.is_star
         self.is_string = node.is_string
-        self.args = node.args
-
-    @property
-    def value(self):
-        return self._value
-
-    @value.setter
-    def value(self, val):
-        self._value = val
-
-    @property
-    def is_int(self) -> bool:
-        return self._is_int
-
-    @is_int.setter
-    def is_int(self, val):
-        self._is_int = val
-
-    @property
-    def is_number(self) -> bool:
-        return self._is_number
+        self.args = self.get_plain_args(node=node, exclude=("this",))
 
-    @is_number.setter
-    def is_number(self, val):
-        self._is_number = val
-
-    @property
-    def is_star(self) -> bool:
-        return self._is_star
-
-    @is_star.setter
-    def is_star(self, val):
-        self._is_star = val
-
-    @property
-    def is_string(self) -> bool:
-        return self._is_string
-
-    @is_string.setter
-    def is_string(self, val):
-        self._is_string = val
-
-    @property
-    def args(self):
-        return self._args
+    def get_key(self) -> tuple:
+        """
+        Return the key of the literal value, literals with the same key can be shared
+        :return: The key
+        """
+        return (self.value, self.is_int, self.is_number, self.is_star, self.is_string,
+                tuple(sorted(self.args.items())))
 
-    @args.setter
-    def args(self, val):
-        self._args = val
@@ -0,0 +1,259 @@
+#######################################
+# File name: object_index.py
+# Purpose: ObjectIndex class provides shortcuts to every object in a database
+#
+# Key features:
+#     ObjectIndex:
+#        Stores: objects of database hierarchically by path schema -> table -> column
+#        Provides the same interface as dictionary keyed by
+#                 "schema" or (schema, ) for schema,
+#                 (schema, table) for table,
+#                 (schema, table, column) for column
+#        Removing an object removes its whole subtree,
+#        the cost is proportional to the subtree size, not to the size of index
+#        Schemas not materialized from a catalog file yet and tables released to catalog storage
+#        are loaded before they are looked up
+#
+#######################################
+
+from __future__ import annotations
+
+from collections.abc import MutableMapping
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Dict, Iterator
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+
+
+class _Missing:
+    """
+    Marker of an index node which has children but no registered object
+    """
+
+    def __repr__(self):
+        return "<missing>"
+
+    def __reduce__(self):
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+
+
+class _IndexNode:
+    """
+    One level of the object index
+    """
+
+    __slots__ = ("value", "children")
+
+    def __init__(self):
+        self.value = _MISSING
+        self.children: Dict[str, _IndexNode] = {}
+
+
+class ObjectIndex(MutableMapping):
+    """
+    Hierarchical index of database objects with dictionary interface.
+    Deleting a key deletes also all keys below it,
+    e.g. deleting (schema, table) deletes also all (schema, table, column) keys.
+    """
+
+    def __init__(self, database: Database | None = None):
+        """
+        :param database: Indexed database, its pending schemas are materialized by lookups
+        """
+
+        self._root = _IndexNode()
+        self._count = 0
+        self.database = database
+
+    @staticmethod
+    def _get_path(key) -> tuple:
+        """
+        Converts a key to the path in the index
+        :param key: Schema name or tuple of names
+        :return: Tuple of names
+        """
+
+        if isinstance(key, str):
+            return key,
+
+        return tuple(key)
+
+    def _get_node(self, key) -> _IndexNode | None:
+        """
+        Return index node on the path of the key
+        :param key: The key
+        :return: Index node or None
+        """
+
+        node = self._root
+        for name in self._get_path(key):
+            node = node.children.get(name)
+            if node is None:
+                return None
+
+        return node
+
+    def _load(self, path: tuple, children: bool = False) -> None:
+        """
+        Materializes schemas on the path which were not loaded from a catalog file yet
+        and loads the table on the path from catalog storage, the empty path loads everything
+        :param path: Path of the looked up object
+        :param children: Objects below the path are looked up, e.g. all tables of a schema
+        :return: None
+        """
+
+        database = self.database
+        if database is None or not (database.lazy_schemas or database.storage is not None):
+            return
+
+        if not path:
+            database.load_all_schemas()
+        elif len(path) >= 2:
+            database.load_schema(schema_name=path[0])
+            database.load_table(schema_name=path[0], table_name=path[1])
+        elif children:
+            database.load_schema_tables(schema_name=path[0])
+        else:
+            database.load_schema(schema_name=path[0])
+
+    @staticmethod
+    def _count_values(node: _IndexNode) -> int:
+        """
+        Counts the registered objects in the subtree
+        :param node: Root of the subtree
+        :return: Count of objects
+        """
+
+        count = 0
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.value is not _MISSING:
+                count += 1
+            stack.extend(node.children.values())
+
+        return count
+
+    ##################################################
+    #                  MAPPING INTERFACE
+    ##################################################
+
+    def __getitem__(self, key):
+        self._load(path=self._get_path(key))
+        node = self._get_node(key)
+        if node is None or node.value is _MISSING:
+            raise KeyError(key)
+
+        return node.value
+
+    def __setitem__(self, key, value) -> None:
+        node = self._root
+        for name in self._get_path(key):
+            child = node.children.get(name)
+            if child is None:
+                child = node.children[name] = _IndexNode()
+            node = child
+
+        if node.value is _MISSING:
+            self._count += 1
+        node.value = value
+
+    def __delitem__(self, key) -> None:
+        if key not in self:
+            raise KeyError(key)
+
+        self.remove(key)
+
+    def __contains__(self, key) -> bool:
+        self._load(path=self._get_path(key))
+        node = self._get_node(key)
+        return node is not None and node.value is not _MISSING
+
+    def __iter__(self) -> Iterator:
+        """
+        Iterates over keys, schemas are yielded as names, other objects as tuples
+        """
+
+        self._load(path=())
+        stack = [((), self._root)]
+        while stack:
+            path, node = stack.pop()
+            for name, child in node.children.items():
+                child_path = path + (name,)
+                if child.value is not _MISSING:
+                    yield name if len(child_path) == 1 else child_path
+                if child.children:
+                    stack.append((child_path, child))
+
+    def __len__(self) -> int:
+        self._load(path=())
+        return self._count
+
+    def __repr__(self):
+        return f"ObjectIndex({dict(self.items())})"
+
+    ##################################################
+    #                  PUBLIC METHODS
+    ##################################################
+
+    def remove(self, key) -> int:
+        """
+        Removes the object and all objects below it from the index
+        :param key: The key of the object
+        :return: Count of removed objects
+        """
+
+        path = self._get_path(key)
+        if not path:
+            return 0
+
+        parent = self._get_node(path[:-1])
+        if parent is None or path[-1] not in parent.children:
+            return 0
+
+        removed = self._count_values(parent.children.pop(path[-1]))
+        self._count -= removed
+        return removed
+
+    def update_children(self, key, objects: Dict) -> None:
+        """
+        Registers objects directly below the key at once, e.g. all columns of a table
+        The path of the key is walked only once, not for every object
+        :param key: The key, e.g. (schema, table) to register columns of the table
+        :param objects: Dictionary of name -> object
+        :return: None
+        """
+
+        node = self._root
+        for name in self._get_path(key):
+            child = node.children.get(name)
+            if child is None:
+                child = node.children[name] = _IndexNode()
+            node = child
+
+        children = node.children
+        for name, value in objects.items():
+            child = children.get(name)
+            if child is None:
+                child = children[name] = _IndexNode()
+            if child.value is _MISSING:
+                self._count += 1
+            child.value = value
+
+    def get_children(self, key) -> Dict:
+        """
+        Return objects registered directly below the key
+        :param key: The key, e.g. schema name to get tables of the schema
+        :return: Dictionary of name -> object
+        """
+
+        self._load(path=self._get_path(key), children=True)
+        node = self._get_node(key)
+        if node is None:
+            return {}
+
+        return {name: child.value for name, child in node.children.items() if child.value is not _MISSING}
@@ -7,12 +7,15 @@
 #        Stores: schema name,
 #                tables related to schema,
 #                connection to a table database that belongs to
+#                structural hash (see structural_hash)
 #
 #######################################
 
 from __future__ import annotations
 
 from sql_code_analyzer.in_memory_representation.struct.base import Base
+from sql_code_analyzer.in_memory_representation.tools.interning import intern_name
+from sql_code_analyzer.in_memory_representation.tools.structural_hash import get_digest
 
 from typing import TYPE_CHECKING
 
@@ -25,6 +28,8 @@ class Schema(Base):
     Represents table schema in memory representation
     """
 
+    __slots__ = ("name", "tables", "database", "structural_hash")
+
     ###################################
     #              INIT
     ###################################
@@ -35,34 +40,13 @@ class Schema(Base):
         :param database: The database to which the schema belongs
         :param schema_name: The schema name
         """
-        self.name = schema_name
+        self.name = intern_name(schema_name)
         self.tables: dict = {}
         self.database: Database = database
-        self.__add_schema_to_database()
-
-    @property
-    def name(self) -> str:
-        return self._name
-
-    @name.setter
-    def name(self, value):
-        self._name = value
-
-    @property
-    def tables(self) -> dict:
-        return self._tables
-
-    @tables.setter
-    def tables(self, value):
-        self._tables = value
 
-    @property
-    def database(self) -> Database:
-        return self._database
-
-    @database.setter
-    def database(self, value):
-        self._database = value
+        # Cached structural hash, None if not computed since the last change
+        self.structural_hash: bytes | None = None
+        self.__add_schema_to_database()
 
     ##################################################
     #                  PRIVATE METHODS
@@ -82,6 +66,7 @@ class Schema(Base):
             )
             return
 
+        self.database.notify_change(changed_object=self.database)
         self.database.schemas[self.name] = self
         self.database.index_registration(key=self.name,
                                          reg_object=self)
@@ -102,6 +87,7 @@ class Schema(Base):
         if not isinstance(table, str):
             table = table.name
 
+        self.database.load_table(schema_name=self.name, table_name=table)
         return self.check_if_exists(find_attr_val=table,
                                     struct=self.tables)
 
@@ -114,6 +100,14 @@ class Schema(Base):
         :return: None
         """
 
+        self.database.load_schema_tables(schema_name=self.name)
+
+        for table in list(self.tables.values()):
+            table.delete_references()
+            table.cancel_index_owner_registration()
+        self.database.query.cancel_schema(schema=self)
+
+        self.database.notify_change(changed_object=self.database)
         del self.database.schemas[self.name]
         self.database.index_cancel_registration(key=self.name)
 
@@ -121,6 +115,38 @@ class Schema(Base):
     #         API
     #########################
 
+    def get_state(self) -> tuple:
+        """
+        Return the state captured by snapshots of memory representation
+        :return: (tables, )
+        """
+
+        return self.tables,
+
+    def get_structural_hash(self) -> bytes:
+        """
+        Return structural hash of the schema, it is computed only if the schema changed since the last call,
+        only hashes of changed tables are computed again
+        :return: The hash
+        """
+
+        structural_hash = getattr(self, "structural_hash", None)
+        if structural_hash is None:
+            # Tables kept in a catalog storage are loaded, tables released later keep the hash valid
+            self.database.load_schema_tables(schema_name=self.name)
+            structural_hash = self.structural_hash = get_digest(
+                "S", self.name, tuple(sorted((name, table.get_structural_hash()) for name, table in self.tables.items())))
+        return structural_hash
+
+    def invalidate_structural_hash(self) -> None:
+        """
+        Drops cached structural hash of the schema and of the database
+        :return: None
+        """
+
+        self.structural_hash = None
+        self.database.invalidate_structural_hash()
+
     ################
     #     GET
     ################
@@ -0,0 +1,282 @@
+#######################################
+# File name: snapshot.py
+# Purpose: CatalogSnapshot class represents memory representation at the moment of its creation
+#
+# Key features:
+#     CatalogSnapshot:
+#        Creation of snapshot costs O(1), nothing is copied
+#        Before an object of memory representation is changed for the first time after the snapshot was created,
+#        the snapshot saves the state of the object (copy-on-write),
+#        so a change copies only the touched object, e.g. the table and not its schema or columns
+#        Provides read API of the captured state and materialization to an independent Database
+#
+#######################################
+
+from __future__ import annotations
+
+import copy
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Dict, List
+    from sql_code_analyzer.in_memory_representation.struct.column import Column
+    from sql_code_analyzer.in_memory_representation.struct.constrain import Constrain, Index, PrimaryKey
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+    from sql_code_analyzer.in_memory_representation.struct.datatype import Datatype
+    from sql_code_analyzer.in_memory_representation.struct.schema import Schema
+    from sql_code_analyzer.in_memory_representation.struct.table import Table
+
+
+class CatalogSnapshot:
+    """
+    Copy-on-write snapshot of memory representation.
+    Objects which were not changed since the snapshot was created are read from memory representation,
+    changed objects are read from states saved by the snapshot.
+    Constraints are treated as immutable values, a changed constraint has to be replaced in its owner.
+    """
+
+    __slots__ = ("database", "states", "__weakref__")
+
+    def __init__(self, database: Database):
+        """
+        :param database: The database captured by the snapshot
+        """
+
+        self.database = database
+
+        # Changed object -> its state at the moment of snapshot creation (see get_state of each class)
+        self.states: dict = {}
+
+    def __enter__(self) -> CatalogSnapshot:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+    ##################################################
+    #                  PRIVATE METHODS
+    ##################################################
+
+    @staticmethod
+    def _copy_state(state: tuple) -> tuple:
+        """
+        Copies containers of the state, the objects in containers are not copied
+        Lists in dictionaries are copied too, e.g. lists of table level constraints
+        :param state: The state
+        :return: Copy of state
+        """
+
+        copied = []
+        for item in state:
+            if isinstance(item, dict):
+                item = {key: list(value) if isinstance(value, list) else value for key, value in item.items()}
+            elif isinstance(item, list):
+                item = list(item)
+            copied.append(item)
+
+        return tuple(copied)
+
+    def _get_state(self, catalog_object) -> tuple:
+        """
+        Return state of the object at the moment of snapshot creation
+        :param catalog_object: Database, schema, table or column
+        :return: The state
+        """
+
+        state = self.states.get(catalog_object)
+        if state is None:
+            return catalog_object.get_state()
+
+        return state
+
+    ##################################################
+    #                  PUBLIC METHODS
+    ##################################################
+
+    def save(self, catalog_object) -> None:
+        """
+        Saves the state of object before it is changed for the first time
+        :param catalog_object: Database, schema, table or column
+        :return: None
+        """
+
+        if catalog_object not in self.states:
+            self.states[catalog_object] = self._copy_state(catalog_object.get_state())
+
+    def add_loaded_schema(self, schema: Schema) -> None:
+        """
+        Adds the schema materialized from a catalog file after the snapshot was created to the captured state
+        :param schema: The schema
+        :return: None
+        """
+
+        state = self.states.get(self.database)
+        if state is not None:
+            state[0][schema.name] = schema
+
+    def release(self) -> None:
+        """
+        Stops capturing changes of memory representation and forgets saved states
+        :return: None
+        """
+
+        self.database.snapshots.discard(self)
+        self.states.clear()
+
+    #########################
+    #          READ
+    #########################
+
+    def get_schemas(self) -> Dict[str, Schema]:
+        """
+        Return schemas of the database
+        :return: Dictionary of schema name -> schema
+        """
+
+        self.database.load_all_schemas()
+
+        schemas, = self._get_state(self.database)
+        return schemas
+
+    def get_tables(self, schema: Schema) -> Dict[str, Table]:
+        """
+        Return tables of the schema
+        :param schema: The schema
+        :return: Dictionary of table name -> table
+        """
+
+        tables, = self._get_state(schema)
+        return tables
+
+    def get_table(self, schema_name: str, table_name: str) -> Table | None:
+        """
+        Return the table by its name
+        :param schema_name: Schema name, empty for the default schema
+        :param table_name: Table name
+        :return: The table or None if not exists
+        """
+
+        schema = self.get_schemas().get(schema_name or self.database.default_schema)
+        if schema is None:
+            return None
+
+        return self.get_tables(schema).get(table_name)
+
+    def get_columns(self, table: Table) -> Dict[str, Column]:
+        """
+        Return columns of the table
+        :param table: The table
+        :return: Dictionary of column name -> column
+        """
+
+        return self._get_state(table)[0]
+
+    def get_primary_key(self, table: Table) -> PrimaryKey | None:
+        """
+        Return primary key of the table
+        :param table: The table
+        :return: The primary key or None
+        """
+
+        return self._get_state(table)[1]
+
+    def get_table_constrains(self, table: Table) -> Dict[tuple, List[Constrain]]:
+        """
+        Return table level constraints in the same structure as Table.constrains
+        :param table: The table
+        :return: Dictionary of (table, table) or (table, referencing table) -> constraints
+        """
+
+        return self._get_state(table)[2]
+
+    def get_indexes(self, table: Table) -> Dict[str, Index]:
+        """
+        Return indexes of the table
+        :param table: The table
+        :return: Dictionary of index name -> index
+        """
+
+        return self._get_state(table)[3]
+
+    def get_datatype(self, column: Column) -> Datatype:
+        """
+        Return datatype of the column
+        :param column: The column
+        :return: The datatype
+        """
+
+        return self._get_state(column)[0]
+
+    def get_column_constrains(self, column: Column) -> List[Constrain]:
+        """
+        Return constraints of the column
+        :param column: The column
+        :return: List of constraints
+        """
+
+        return self._get_state(column)[1]
+
+    #########################
+    #      MATERIALIZE
+    #########################
+
+    def materialize(self) -> Database:
+        """
+        Creates an independent database with the state captured by the snapshot
+        Datatypes and literals are shared, they are immutable
+        :return: The database
+        """
+
+        from sql_code_analyzer.in_memory_representation.struct.column import Column
+        from sql_code_analyzer.in_memory_representation.struct.database import Database
+        from sql_code_analyzer.in_memory_representation.struct.schema import Schema
+        from sql_code_analyzer.in_memory_representation.struct.table import Table
+
+        database = Database(db_name=self.database.name)
+        database.default_schema = self.database.default_schema
+
+        # Objects of memory representation -> their copies,
+        # constraints referencing tables and columns are copied with this memo
+        memo = {id(self.database): database}
+        tables = []
+
+        for schema_name, schema in self.get_schemas().items():
+            new_schema = Schema.__new__(Schema)
+            new_schema.name = schema.name
+            new_schema.database = database
+            new_schema.tables = {}
+            database.schemas[schema_name] = new_schema
+            memo[id(schema)] = new_schema
+
+            for table_name, table in self.get_tables(schema).items():
+                new_table = Table.__new__(Table)
+                new_table.name = table.name
+                new_table.schema = new_schema
+                new_table.database = database
+                new_table.args = table.args
+                new_table.columns = {}
+                new_schema.tables[table_name] = new_table
+                memo[id(table)] = new_table
+                tables.append((table, new_table))
+
+                for column_name, column in self.get_columns(table).items():
+                    new_column = Column.__new__(Column)
+                    new_column.name = column.name
+                    new_column.is_name_quoted = column.is_name_quoted
+                    new_column.table = new_table
+                    new_column.datatype = self.get_datatype(column)
+                    new_table.columns[column_name] = new_column
+                    memo[id(column)] = new_column
+
+        # Constraints are copied when all tables and columns have their copies
+        for table, new_table in tables:
+            for column_name, column in self.get_columns(table).items():
+                new_table.columns[column_name].constrains = copy.deepcopy(self.get_column_constrains(column), memo)
+
+            new_table.primary_key = copy.deepcopy(self.get_primary_key(table), memo)
+            new_table.constrains = copy.deepcopy(self.get_table_constrains(table), memo)
+            new_table.indexes = copy.deepcopy(self.get_indexes(table), memo)
+            new_table.rebuild_index_prefixes()
+
+        database.rebuild_indexes(dependencies=True)
+        return database
@@ -8,22 +8,27 @@
 #                table columns
 #                table level constrains(foreign key, check constraint etc.)
 #                table primary key
+#                table indexes and prefixes of indexed columns
 #                connection to the schema that belongs to
 #                connection to the database that belongs to
-#
+#                structural hash (see structural_hash)
 #
 #######################################
 
 from __future__ import annotations
 
 from sql_code_analyzer.in_memory_representation.struct.base import Base
+from sql_code_analyzer.in_memory_representation.tools.interning import intern_name
+from sql_code_analyzer.in_memory_representation.tools.structural_hash import get_constrains_value, get_digest, \
+    get_structural_value
 
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Dict, List
 
 from sql_code_analyzer.in_memory_representation.struct.column import Column
+from sql_code_analyzer.in_memory_representation.struct.constrain import ForeignKey
 
 if TYPE_CHECKING:
-    from sql_code_analyzer.in_memory_representation.struct.constrain import PrimaryKey, ForeignKey, Index
+    from sql_code_analyzer.in_memory_representation.struct.constrain import Constrain, PrimaryKey, Index
     from sql_code_analyzer.in_memory_representation.struct.database import Database
     from sql_code_analyzer.in_memory_representation.struct.schema import Schema
 
@@ -33,6 +38,9 @@ class Table(Base):
     Represents table in memory representation
     """
 
+    __slots__ = ("name", "schema", "database", "columns", "primary_key", "constrains",
+                 "indexes", "index_prefixes", "args", "structural_hash")
+
     ###################################
     #              INIT
     ###################################
@@ -46,7 +54,7 @@ class Table(Base):
         :param schema: The schema to which the table belongs
         :param database: The database to which the table belongs
         """
-        self.name: str = name
+        self.name: str = intern_name(name)
         self.schema: Schema = schema
         self.database: Database = database
         self.columns: dict = {}
@@ -54,70 +62,18 @@ class Table(Base):
         self.constrains: dict = {}
         self.indexes: dict = {}
 
+        # Sets of column names of index prefixes -> count of indexes with that prefix
+        # The index on columns (a, b, c) has prefixes {a}, {a, b} and {a, b, c}
+        self.index_prefixes: dict = {}
+
         self.args = {}
         if node is not None:
-            for arg in node.args:
-                if arg not in ["this", "kind", "expressions"]:
-                    self.args[arg] = node.args[arg]
+            self.args = self.get_plain_args(node=node, exclude=("this", "kind", "expressions"))
 
+        # Cached structural hash, None if not computed since the last change
+        self.structural_hash: bytes | None = None
         self.__add_table_to_schema()
 
-    @property
-    def name(self) -> str:
-        return self._name
-
-    @name.setter
-    def name(self, value):
-        self._name = value
-
-    @property
-    def schema(self) -> Schema:
-        return self._schema
-
-    @schema.setter
-    def schema(self, value):
-        self._schema = value
-
-    @property
-    def database(self) -> Database:
-        return self._database
-
-    @database.setter
-    def database(self, value):
-        self._database = value
-
-    @property
-    def columns(self) -> Dict:
-        return self._columns
-
-    @columns.setter
-    def columns(self, value):
-        self._columns = value
-
-    @property
-    def primary_key(self) -> PrimaryKey | None:
-        return self._primary_key
-
-    @primary_key.setter
-    def primary_key(self, value):
-        self._primary_key = value
-
-    @property
-    def constrains(self) -> Dict:
-        return self._constrains
-
-    @constrains.setter
-    def constrains(self, value):
-        self._constrains = value
-
-    @property
-    def indexes(self) -> Dict:
-        return self._indexes
-
-    @indexes.setter
-    def indexes(self, value):
-        self._indexes = value
-
     def __repr__(self):
         return self.name
 
@@ -140,9 +96,11 @@ class Table(Base):
             )
             return
 
+        self.database.notify_change(changed_object=self.schema)
         self.schema.tables[self.name] = self
         self.schema.database.index_registration(key=(self.schema.name, self.name),
                                                 reg_object=self)
+        self.schema.database.query.register_table(table=self)
 
     ##################################################
     #                  PUBLIC METHODS
@@ -178,15 +136,55 @@ class Table(Base):
             )
             return
 
+        self.database.notify_change(changed_object=self)
         self.primary_key = primary_key
+        self.database.query.register_constrain(owner=self, constrain=primary_key)
+        self.database.query.update_primary_key(table=self)
 
     def delete_primary_key(self) -> None:
+        if self.primary_key is not None:
+            self.database.query.cancel_constrain(constrain=self.primary_key)
+        self.database.notify_change(changed_object=self)
         self.primary_key = None
+        self.database.query.update_primary_key(table=self)
+
+    #########################
+    #      CONSTRAINTS
+    #########################
+
+    def add_constrain(self, constrain: Constrain) -> None:
+        """
+        Adds table level constraint (foreign key, check constraint etc.) to table
+        Foreign key is stored also in the referenced table under key (referenced table, table)
+        :param constrain: The constraint
+        :return: None
+        """
+
+        self.database.notify_change(changed_object=self)
+        self.constrains.setdefault((self, self), []).append(constrain)
+
+        if isinstance(constrain, ForeignKey):
+            self.database.notify_change(changed_object=constrain.table_ref)
+            constrain.table_ref.constrains.setdefault((constrain.table_ref, self), []).append(constrain)
+            self.database.dependencies.add_foreign_key(foreign_key=constrain)
+
+        self.database.query.register_constrain(owner=self, constrain=constrain)
 
     #########################
     #        INDEXES
     #########################
 
+    @staticmethod
+    def _get_index_prefixes(index: Index) -> List[frozenset]:
+        """
+        Return sets of column names of all prefixes of the index
+        :param index: The index
+        :return: List of prefixes
+        """
+
+        column_names = [column.name for column in index.columns]
+        return [frozenset(column_names[:i]) for i in range(1, len(column_names) + 1)]
+
     def add_index(self, index: Index) -> None:
         if index.name in self.indexes:
             self._rule_reporter.add_memory_representation_report(
@@ -195,7 +193,26 @@ class Table(Base):
             )
             return
 
+        self.database.notify_change(changed_object=self)
         self.indexes[index.name] = index
+        self.database.query.register_constrain(owner=self, constrain=index)
+        self.database.index_owner_registration(schema_name=self.schema.name,
+                                               index_name=index.name,
+                                               table=self)
+
+        for prefix in self._get_index_prefixes(index=index):
+            self.index_prefixes[prefix] = self.index_prefixes.get(prefix, 0) + 1
+
+    def rebuild_index_prefixes(self) -> None:
+        """
+        Computes prefixes of all indexes, e.g. of a table loaded from a file
+        :return: None
+        """
+
+        self.index_prefixes = {}
+        for index in self.indexes.values():
+            for prefix in self._get_index_prefixes(index=index):
+                self.index_prefixes[prefix] = self.index_prefixes.get(prefix, 0) + 1
 
     def delete_index(self, index_name) -> None:
         if index_name not in self.indexes:
@@ -205,18 +222,44 @@ class Table(Base):
             )
             return
 
-        self.indexes.pop(index_name)
+        self.database.notify_change(changed_object=self)
+        index = self.indexes.pop(index_name)
+        self.database.query.cancel_constrain(constrain=index)
+        self.database.index_owner_cancel_registration(schema_name=self.schema.name,
+                                                      index_name=index_name,
+                                                      table_name=self.name)
+
+        for prefix in self._get_index_prefixes(index=index):
+            self.index_prefixes[prefix] -= 1
+            if self.index_prefixes[prefix] == 0:
+                del self.index_prefixes[prefix]
 
     #########################
     #         DELETE
     #########################
 
+    def delete_references(self) -> None:
+        """
+        Delete foreign keys of the table and foreign keys which reference the table
+        :return: None
+        """
+
+        self.database.load_referencing_tables(table=self)
+
+        dependencies = self.database.dependencies
+        foreign_keys = dependencies.get_foreign_keys(table=self) + dependencies.get_referencing_foreign_keys(table=self)
+
+        # Self-referencing foreign key is in both lists
+        for foreign_key in dict.fromkeys(foreign_keys):
+            foreign_key.delete_reference()
+
     def delete_cascade(self) -> Table:
-        constrain_key: tuple = (self, self)
-        for constrain in self.constrains[constrain_key]:
-            if isinstance(constrain, ForeignKey):
-                constrain.delete_reference()
+        """
+        Delete foreign keys which reference the table, so the table can be deleted
+        :return: The table
+        """
 
+        self.delete_references()
         return self
 
     def delete_table(self) -> None:
@@ -225,19 +268,68 @@ class Table(Base):
         :return: None
         """
 
-        if not self.verify_can_be_deleted:
+        if not self.verify_can_be_deleted():
             self._rule_reporter.add_memory_representation_report(
                 message=f"Table {self.name} can NOT be deleted because of relations with another tables."
             )
             return
 
+        self.delete_references()
+        self.cancel_index_owner_registration()
         self.database.index_cancel_registration(key=(self.schema.name, self.name))
+        self.database.query.cancel_table(table=self)
+        self.database.notify_change(changed_object=self.schema)
         del self.schema.tables[self.name]
 
+    def cancel_index_owner_registration(self) -> None:
+        """
+        Cancel registration of the table as owner of its indexes
+        :return: None
+        """
+
+        for index_name in self.indexes:
+            self.database.index_owner_cancel_registration(schema_name=self.schema.name,
+                                                          index_name=index_name,
+                                                          table_name=self.name)
+
     #########################
     #         API
     #########################
 
+    def get_state(self) -> tuple:
+        """
+        Return the state captured by snapshots of memory representation
+        :return: (columns, primary key, constraints, indexes)
+        """
+
+        return self.columns, self.primary_key, self.constrains, self.indexes
+
+    def get_structural_hash(self) -> bytes:
+        """
+        Return structural hash of the table, it is computed only if the table changed since the last call
+        Foreign keys which reference the table belong to the referencing table, they are not part of the hash
+        :return: The hash
+        """
+
+        structural_hash = getattr(self, "structural_hash", None)
+        if structural_hash is None:
+            structural_hash = self.structural_hash = get_digest(
+                "T", self.name, tuple(sorted(self.args.items())),
+                tuple((name, column.get_structural_hash()) for name, column in self.columns.items()),
+                get_structural_value(self.primary_key),
+                get_constrains_value(self.constrains.get((self, self), ())),
+                get_constrains_value(self.indexes.values()))
+        return structural_hash
+
+    def invalidate_structural_hash(self) -> None:
+        """
+        Drops cached structural hash of the table and of the objects above it
+        :return: None
+        """
+
+        self.structural_hash = None
+        self.schema.invalidate_structural_hash()
+
     ################
     #     GET
     ################
@@ -279,6 +371,14 @@ class Table(Base):
 
         return False
 
+    def verify_columns_indexed(self, column_names) -> bool:
+        """
+        Verify if the columns are covered by a prefix of some index in any order
+        :param column_names: Names of the columns
+        :return: True/False
+        """
+        return frozenset(column_names) in self.index_prefixes
+
     def verify_columns_count(self, expected_count) -> bool:
         """
         Return count of columns which are belonged to table
@@ -298,19 +398,21 @@ class Table(Base):
     def verify_can_be_deleted(self) -> bool:
         """
         Verify if the table meets requirements to be deleted from memory representation
+        The table can not be deleted while another table references it
         :return: True/False
         """
-        if len(self.constrains) > 1:
-            return False
-        else:
-            return True
+        self.database.load_referencing_tables(table=self)
+        return not self.database.dependencies.is_referenced(table=self)
 
     def verify_is_relationship_with_another_table(self) -> bool:
         """
         Verify if table has the relationship with another table
         :return: True/False
         """
-        return self.verify_can_be_deleted()
+        self.database.load_referencing_tables(table=self)
+        dependencies = self.database.dependencies
+        return any(table is not self for table in dependencies.get_referenced_tables(table=self)) or \
+            dependencies.is_referenced(table=self)
 
     def verify_relationship_with_another_table(self, table: Table) -> bool:
         """
@@ -318,4 +420,4 @@ class Table(Base):
         :param table: Table object
         :return: True/False
         """
-        ...
+        return self.database.dependencies.verify_relationship(table=self, another_table=table)
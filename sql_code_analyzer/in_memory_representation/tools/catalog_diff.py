@@ -0,0 +1,316 @@
+#######################################
+# File name: catalog_diff.py
+# Purpose: Differences between two states of memory representation, e.g. after a migration and in production
+#
+# Key features:
+#     diff_catalogs:
+#        Walks both databases from the top and descends only into schemas, tables and columns
+#        whose structural hashes differ (see structural_hash), so unchanged subtrees are skipped at once
+#        Returns a list of changes of schemas, tables, columns, primary keys, constraints and indexes,
+#        each change is a dictionary of plain values which can be written as JSON
+#
+#     load_catalog:
+#        Loads the database from a catalog file with its journal or from a catalog storage
+#
+#######################################
+
+from __future__ import annotations
+
+import json
+
+from sql_code_analyzer.in_memory_representation.struct.constrain import Constrain
+from sql_code_analyzer.in_memory_representation.tools import serialization
+from sql_code_analyzer.in_memory_representation.tools.journal import CatalogJournal
+from sql_code_analyzer.in_memory_representation.tools.sqlite_storage import is_sqlite_file, open_database
+from sql_code_analyzer.in_memory_representation.tools.structural_hash import get_structural_value
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Dict, List, TextIO
+    from sql_code_analyzer.in_memory_representation.struct.column import Column
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+    from sql_code_analyzer.in_memory_representation.struct.datatype import Datatype
+    from sql_code_analyzer.in_memory_representation.struct.table import Table
+
+# Kinds of changes
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+
+##################################################
+#                  DEFINITIONS
+##################################################
+
+def _get_value(value):
+    """
+    Converts a value of memory representation to a value which can be written as JSON,
+    references to tables and columns are replaced by their names
+    """
+
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+
+    if isinstance(value, (list, tuple)):
+        return [_get_value(item) for item in value]
+
+    if isinstance(value, dict):
+        return {str(key): _get_value(item) for key, item in value.items()}
+
+    if isinstance(value, Constrain):
+        return get_constrain_definition(constrain=value)
+
+    kind = type(value).__name__
+    if kind == "Column":
+        return [value.table.schema.name, value.table.name, value.name]
+
+    if kind == "Table":
+        return [value.schema.name, value.name]
+
+    return repr(value)
+
+
+def get_constrain_definition(constrain: Constrain | None) -> dict | None:
+    """
+    Return definition of the constraint
+    :param constrain: The constraint or None
+    :return: Dictionary with kind of constraint and values of its slots, None if there is no constraint
+    """
+
+    if constrain is None:
+        return None
+
+    definition = {"kind": type(constrain).__name__}
+    for klass in reversed(type(constrain).__mro__):
+        for slot in getattr(klass, "__slots__", ()):
+            definition[slot] = _get_value(getattr(constrain, slot, None))
+
+    return definition
+
+
+def get_datatype_text(datatype: Datatype | None) -> str | None:
+    """
+    Return the datatype as SQL text, e.g. NUMBER(10, 2)
+    :param datatype: The datatype or None
+    :return: The text or None
+    """
+
+    if datatype is None:
+        return None
+
+    text = datatype.column_datatype.value
+    if datatype.literals:
+        text += f"({', '.join(str(literal.value) for literal in datatype.literals)})"
+    return text
+
+
+def get_column_definition(column: Column) -> dict:
+    """
+    Return definition of the column
+    :param column: The column
+    :return: Dictionary with datatype, quoting of name and constraints
+    """
+
+    return {"datatype": get_datatype_text(datatype=column.datatype),
+            "quoted": column.is_name_quoted,
+            "constrains": [get_constrain_definition(constrain=constrain) for constrain in column.constrains]}
+
+
+def get_table_definition(table: Table) -> dict:
+    """
+    Return definition of the table with its columns and constraints,
+    foreign keys which reference the table belong to the referencing table
+    :param table: The table
+    :return: Dictionary of the definition
+    """
+
+    return {"args": _get_value(table.args),
+            "columns": {name: get_column_definition(column=column) for name, column in table.columns.items()},
+            "primary_key": get_constrain_definition(constrain=table.primary_key),
+            "constrains": [get_constrain_definition(constrain=constrain)
+                           for constrain in table.constrains.get((table, table), ())],
+            "indexes": {name: get_constrain_definition(constrain=index) for name, index in table.indexes.items()}}
+
+
+##################################################
+#                     DIFF
+##################################################
+
+class _Differ:
+    """
+    Collects changes between two databases
+    """
+
+    def __init__(self):
+        self.changes: List[dict] = []
+
+    def add(self, change: str, kind: str, schema: str, table: str | None = None, name: str | None = None,
+            **values) -> None:
+        """
+        Adds a change, names which do not apply to the kind of object are omitted
+        """
+
+        record = {"change": change, "object": kind, "schema": schema}
+        if table is not None:
+            record["table"] = table
+        if name is not None:
+            record["name"] = name
+        record.update(values)
+        self.changes.append(record)
+
+    @staticmethod
+    def _get_names(old: dict, new: dict) -> List[str]:
+        """
+        Return names of both dictionaries, names of the old one are first
+        """
+
+        return list(old) + [name for name in new if name not in old]
+
+    def diff_database(self, old: Database, new: Database) -> None:
+        if old.get_structural_hash() == new.get_structural_hash():
+            return
+
+        if old.default_schema != new.default_schema:
+            self.add(change=CHANGED, kind="default_schema", schema=new.default_schema, old=old.default_schema)
+
+        for schema_name in sorted(self._get_names(old=old.schemas, new=new.schemas)):
+            old_schema, new_schema = old.schemas.get(schema_name), new.schemas.get(schema_name)
+
+            if new_schema is None:
+                self.add(change=REMOVED, kind="schema", schema=schema_name)
+
+            elif old_schema is None:
+                self.add(change=ADDED, kind="schema", schema=schema_name)
+                new.load_schema_tables(schema_name=schema_name)
+                for table_name in sorted(new_schema.tables):
+                    self.add(change=ADDED, kind="table", schema=schema_name, table=table_name,
+                             definition=get_table_definition(table=new_schema.tables[table_name]))
+
+            elif old_schema.get_structural_hash() != new_schema.get_structural_hash():
+                # Tables kept in a catalog storage are compared as well
+                old.load_schema_tables(schema_name=schema_name)
+                new.load_schema_tables(schema_name=schema_name)
+                self.diff_schema(old_tables=old_schema.tables, new_tables=new_schema.tables, schema_name=schema_name)
+
+    def diff_schema(self, old_tables: Dict[str, Table], new_tables: Dict[str, Table], schema_name: str) -> None:
+        for table_name in sorted(self._get_names(old=old_tables, new=new_tables)):
+            old_table, new_table = old_tables.get(table_name), new_tables.get(table_name)
+
+            if new_table is None:
+                self.add(change=REMOVED, kind="table", schema=schema_name, table=table_name)
+
+            elif old_table is None:
+                self.add(change=ADDED, kind="table", schema=schema_name, table=table_name,
+                         definition=get_table_definition(table=new_table))
+
+            elif old_table.get_structural_hash() != new_table.get_structural_hash():
+                self.diff_table(old=old_table, new=new_table)
+
+    def diff_table(self, old: Table, new: Table) -> None:
+        schema_name, table_name = new.schema.name, new.name
+
+        if old.args != new.args:
+            self.add(change=CHANGED, kind="table", schema=schema_name, table=table_name,
+                     old={"args": _get_value(old.args)}, new={"args": _get_value(new.args)})
+
+        # Columns
+        for column_name in self._get_names(old=old.columns, new=new.columns):
+            old_column, new_column = old.columns.get(column_name), new.columns.get(column_name)
+
+            if new_column is None:
+                self.add(change=REMOVED, kind="column", schema=schema_name, table=table_name, name=column_name)
+
+            elif old_column is None:
+                self.add(change=ADDED, kind="column", schema=schema_name, table=table_name, name=column_name,
+                         definition=get_column_definition(column=new_column))
+
+            elif old_column.get_structural_hash() != new_column.get_structural_hash():
+                self.add(change=CHANGED, kind="column", schema=schema_name, table=table_name, name=column_name,
+                         old=get_column_definition(column=old_column), new=get_column_definition(column=new_column))
+
+        old_order = [name for name in old.columns if name in new.columns]
+        new_order = [name for name in new.columns if name in old.columns]
+        if old_order != new_order:
+            self.add(change=CHANGED, kind="table", schema=schema_name, table=table_name,
+                     old={"column_order": old_order}, new={"column_order": new_order})
+
+        # Primary key
+        if get_structural_value(old.primary_key) != get_structural_value(new.primary_key):
+            change = ADDED if old.primary_key is None else REMOVED if new.primary_key is None else CHANGED
+            self.add(change=change, kind="primary_key", schema=schema_name, table=table_name,
+                     old=get_constrain_definition(constrain=old.primary_key),
+                     new=get_constrain_definition(constrain=new.primary_key))
+
+        # Table level constraints are compared by their values, a changed constraint is removed and added
+        old_constrains = {repr(get_structural_value(constrain)): constrain
+                          for constrain in old.constrains.get((old, old), ())}
+        new_constrains = {repr(get_structural_value(constrain)): constrain
+                          for constrain in new.constrains.get((new, new), ())}
+        for key in sorted(old_constrains.keys() - new_constrains.keys()):
+            self.add(change=REMOVED, kind="constraint", schema=schema_name, table=table_name,
+                     definition=get_constrain_definition(constrain=old_constrains[key]))
+        for key in sorted(new_constrains.keys() - old_constrains.keys()):
+            self.add(change=ADDED, kind="constraint", schema=schema_name, table=table_name,
+                     definition=get_constrain_definition(constrain=new_constrains[key]))
+
+        # Indexes
+        for index_name in sorted(self._get_names(old=old.indexes, new=new.indexes)):
+            old_index, new_index = old.indexes.get(index_name), new.indexes.get(index_name)
+
+            if new_index is None:
+                self.add(change=REMOVED, kind="index", schema=schema_name, table=table_name, name=index_name)
+
+            elif old_index is None:
+                self.add(change=ADDED, kind="index", schema=schema_name, table=table_name, name=index_name,
+                         definition=get_constrain_definition(constrain=new_index))
+
+            elif get_structural_value(old_index) != get_structural_value(new_index):
+                self.add(change=CHANGED, kind="index", schema=schema_name, table=table_name, name=index_name,
+                         old=get_constrain_definition(constrain=old_index),
+                         new=get_constrain_definition(constrain=new_index))
+
+
+def diff_catalogs(old: Database, new: Database) -> List[dict]:
+    """
+    Return changes which turn the old database to the new one
+    Only schemas, tables and columns with different structural hashes are compared,
+    so the time is proportional to the changes, not to the size of databases
+    :param old: The old database, e.g. production catalog
+    :param new: The new database, e.g. the catalog after a migration
+    :return: List of changes, each change has keys change (added/removed/changed), object, schema
+             and if they apply table, name, definition of an added object or old and new definition
+    """
+
+    differ = _Differ()
+    differ.diff_database(old=old, new=new)
+    return differ.changes
+
+
+def write_changes(changes: List[dict], file: TextIO) -> None:
+    """
+    Writes the changes as JSON Lines, one change per line
+    :param changes: List of changes (see diff_catalogs)
+    :param file: Text file
+    :return: None
+    """
+
+    for change in changes:
+        file.write(json.dumps(change, separators=(",", ":"), ensure_ascii=False))
+        file.write("\n")
+
+
+def load_catalog(path: Path) -> Database:
+    """
+    Loads the database from a catalog file with its journal or opens it from a catalog storage for reading
+    :param path: Path of the file
+    :return: The database
+    """
+
+    if is_sqlite_file(path=path):
+        return open_database(path=path, read_only=True)
+
+    with open(path, "rb") as f:
+        database = serialization.load(f)
+    CatalogJournal.replay(database=database, path=path)
+    return database
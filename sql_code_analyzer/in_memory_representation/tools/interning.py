@@ -0,0 +1,99 @@
+#######################################
+# File name: interning.py
+# Purpose: Sharing of identical immutable values of memory representation
+#
+# Key features:
+#     Datatypes and literals are created only once for each distinct value,
+#     e.g. all VARCHAR(255) columns share one Datatype object.
+#     Identifier strings (schema, table, column and index names) are interned,
+#     so names, index keys and constraint references share one string object.
+#     Shared instances are weakly referenced, they are forgotten when no memory representation uses them,
+#     so released catalogs do not leave their datatypes behind.
+#
+#######################################
+
+from __future__ import annotations
+
+import sys
+import weakref
+
+from sql_code_analyzer.in_memory_representation.struct.datatype import Datatype
+from sql_code_analyzer.in_memory_representation.struct.literal import Literal
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import List
+
+# Value key -> shared instance
+_datatypes: weakref.WeakValueDictionary[tuple, Datatype] = weakref.WeakValueDictionary()
+_literals: weakref.WeakValueDictionary[tuple, Literal] = weakref.WeakValueDictionary()
+
+
+def intern_name(name):
+    """
+    Return the interned identifier string
+    :param name: Identifier string
+    :return: Interned string, other values are returned unchanged
+    """
+
+    if type(name) is str:
+        return sys.intern(name)
+
+    return name
+
+
+def get_literal(node) -> Literal:
+    """
+    Return the shared literal with the same value as the node
+    :param node: Node of literal from abstract syntax tree
+    :return: Literal
+    """
+
+    return share_literal(literal=Literal(node=node))
+
+
+def get_datatype(node, literals: List[Literal]) -> Datatype:
+    """
+    Return the shared datatype with the same value as the node
+    :param node: Datatype node from abstract syntax tree
+    :param literals: List of literal which are defining datatype arguments, expected to be shared too
+    :return: Datatype
+    """
+
+    return share_datatype(datatype=Datatype(node=node, literals=literals))
+
+
+def share_literal(literal: Literal) -> Literal:
+    """
+    Return the shared literal with the same value as the literal, e.g. of a literal loaded from a file
+    :param literal: Literal
+    :return: Shared literal
+    """
+
+    return _literals.setdefault(literal.get_key(), literal)
+
+
+def share_datatype(datatype: Datatype) -> Datatype:
+    """
+    Return the shared datatype with the same value as the datatype, e.g. of a datatype loaded from a file
+    Literals of the datatype are shared too
+    :param datatype: Datatype
+    :return: Shared datatype
+    """
+
+    shared = _datatypes.get(datatype.get_key())
+    if shared is not None:
+        return shared
+
+    datatype.literals = [share_literal(literal=literal) for literal in datatype.literals]
+    return _datatypes.setdefault(datatype.get_key(), datatype)
+
+
+def clear() -> None:
+    """
+    Forgets all shared instances, the instances already used in memory representation are kept
+    :return: None
+    """
+
+    _datatypes.clear()
+    _literals.clear()
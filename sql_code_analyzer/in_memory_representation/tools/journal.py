@@ -0,0 +1,644 @@
+#######################################
+# File name: journal.py
+# Purpose: Append-only journal of changes of memory representation made after its catalog file was saved
+#
+# Key features:
+#     CatalogJournal:
+#        Journal file belongs to a catalog file (see serialization), it is stored next to it with suffix .journal
+#        Journal starts with a header: magic bytes, format version and identifier of its catalog file,
+#        a journal of another catalog file (e.g. of a catalog file saved later) is not replayed
+#        Each record has its length and CRC32 checksum, so a record torn by a crash is detected
+#        and the journal is replayed up to the last complete record
+#        One record contains all changes made since the previous record:
+#           dropped and created schemas, dropped tables, and the whole state of changed tables
+#        Changed objects are found by a copy-on-write snapshot (see CatalogSnapshot),
+#        so the cost of record is proportional to the changed tables, not to the size of database
+#        Tables are referenced by schema and table names, replay updates changed tables in place,
+#        so foreign keys of other tables keep referencing the same tables and columns
+#
+#     LiveReplayer:
+#        Applies a record (see get_changes) to memory representation which is in use,
+#        indexes are updated only for the changed tables, e.g. by the lint cache
+#
+#######################################
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zlib
+
+from sqlglot.expressions import DataType
+
+from sql_code_analyzer.in_memory_representation.exceptions import CatalogFormatError
+from sql_code_analyzer.in_memory_representation.struct.column import Column
+from sql_code_analyzer.in_memory_representation.struct.constrain import ForeignKey
+from sql_code_analyzer.in_memory_representation.struct.datatype import Datatype
+from sql_code_analyzer.in_memory_representation.struct.literal import Literal
+from sql_code_analyzer.in_memory_representation.struct.schema import Schema
+from sql_code_analyzer.in_memory_representation.struct.table import Table
+from sql_code_analyzer.in_memory_representation.tools import serialization
+from sql_code_analyzer.in_memory_representation.tools.interning import intern_name, share_datatype
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import BinaryIO, Dict, List
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+    from sql_code_analyzer.in_memory_representation.struct.snapshot import CatalogSnapshot
+
+MAGIC = b"SQLJRN"
+FORMAT_VERSION = 1
+
+# Magic bytes, format version, identifier of catalog file
+HEADER = struct.Struct("<6sHI")
+
+# Length and CRC32 of record
+RECORD_HEADER = struct.Struct("<II")
+
+
+def get_journal_path(path: Path) -> Path:
+    """
+    Return path of the journal of catalog file
+    :param path: Path of catalog file
+    :return: Path of journal
+    """
+
+    return path.with_name(path.name + ".journal")
+
+
+def get_catalog_id(path: Path) -> int | None:
+    """
+    Return identifier of catalog file, the checksum of its header which covers checksums of its content
+    :param path: Path of catalog file
+    :return: The identifier or None if the file is not a catalog file
+    """
+
+    try:
+        with open(path, "rb") as f:
+            header = f.read(serialization.HEADER.size)
+    except OSError:
+        return None
+
+    if len(header) < serialization.HEADER.size or not header.startswith(serialization.MAGIC):
+        return None
+
+    return zlib.crc32(header)
+
+
+##################################################
+#                     ENCODE
+##################################################
+
+class TableEncoder:
+    """
+    Encodes state of changed tables, tables and columns are referenced by their names
+    """
+
+    def __init__(self):
+        # Constraints are numbered in the record
+        self.constrains: Dict[int, int] = {}
+        self.encoded: list = []
+
+    def encode_value(self, value):
+        if value is None or isinstance(value, (str, bool, int, float)):
+            return value
+
+        if isinstance(value, Column):
+            return ["c", value.table.schema.name, value.table.name, value.name]
+
+        if isinstance(value, Table):
+            return ["t", value.schema.name, value.name]
+
+        if isinstance(value, (list, tuple)):
+            return ["l", [self.encode_value(item) for item in value]]
+
+        kind = type(value).__name__
+        if kind not in serialization.CONSTRAIN_KINDS:
+            raise CatalogFormatError(f"Value of type {kind} can not be serialized.")
+
+        number = self.constrains.get(id(value))
+        if number is not None:
+            return ["r", number]
+
+        self.constrains[id(value)] = len(self.constrains)
+        self.encoded.append(value)
+        return ["k", kind, [self.encode_value(getattr(value, slot, None))
+                            for slot in serialization.CONSTRAIN_SLOTS[kind]]]
+
+    @staticmethod
+    def encode_datatype(datatype: Datatype | None) -> list | None:
+        if datatype is None:
+            return None
+
+        return [datatype.column_datatype.name,
+                [[literal.value, literal.is_int, literal.is_number, literal.is_star, literal.is_string, literal.args]
+                 for literal in datatype.literals],
+                datatype.args]
+
+    @staticmethod
+    def encode_table(table: Table) -> list:
+        return [table.schema.name, table.name, table.args,
+                [[column.name, column.is_name_quoted, TableEncoder.encode_datatype(column.datatype)]
+                 for column in table.columns.values()]]
+
+    def encode_table_constrains(self, table: Table) -> list:
+        """
+        Only own constraints of the table are encoded,
+        foreign keys stored in referenced tables are restored from the tables which own them
+        """
+
+        return [table.schema.name, table.name,
+                self.encode_value(table.primary_key),
+                self.encode_value(table.constrains.get((table, table), [])),
+                [[name, self.encode_value(index)] for name, index in table.indexes.items()],
+                [[column.name, self.encode_value(column.constrains)]
+                 for column in table.columns.values() if column.constrains]]
+
+
+def _is_live(database: Database, table: Table) -> bool:
+    schema = table.schema
+    return database.schemas.get(schema.name) is schema and schema.tables.get(table.name) is table
+
+
+def get_changes(database: Database, snapshot: CatalogSnapshot) -> list | None:
+    """
+    Return record of changes of memory representation captured by the snapshot
+    :param database: Memory representation
+    :param snapshot: Snapshot created before the changes
+    :return: [dropped schemas, created schemas, dropped tables, changed tables, their constraints]
+             or None if nothing was changed
+    """
+
+    states = snapshot.states
+    if not states:
+        return None
+
+    dropped_schemas, created_schemas, dropped_tables = [], [], []
+
+    # Changed tables in order of their first change
+    tables: Dict[Table, None] = {}
+
+    if database in states:
+        old_schemas, = states[database]
+        dropped_schemas = [name for name, schema in old_schemas.items() if database.schemas.get(name) is not schema]
+        for name, schema in database.schemas.items():
+            if old_schemas.get(name) is not schema:
+                created_schemas.append(name)
+                tables.update(dict.fromkeys(schema.tables.values()))
+
+    for changed_object, state in states.items():
+        if isinstance(changed_object, Schema):
+            if database.schemas.get(changed_object.name) is not changed_object:
+                continue
+
+            old_tables, = state
+            dropped_tables += [[changed_object.name, name] for name, table in old_tables.items()
+                               if changed_object.tables.get(name) is not table]
+            tables.update(dict.fromkeys(table for name, table in changed_object.tables.items()
+                                        if old_tables.get(name) is not table))
+
+        elif isinstance(changed_object, Table):
+            if _is_live(database=database, table=changed_object):
+                tables[changed_object] = None
+
+        elif isinstance(changed_object, Column):
+            if _is_live(database=database, table=changed_object.table):
+                tables[changed_object.table] = None
+
+    encoder = TableEncoder()
+    return [dropped_schemas, created_schemas, dropped_tables,
+            [encoder.encode_table(table=table) for table in tables],
+            [encoder.encode_table_constrains(table=table) for table in tables]]
+
+
+##################################################
+#                     REPLAY
+##################################################
+
+class TableReplayer:
+    """
+    Applies records of journal to memory representation
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self.constrains: list = []
+
+    def get_schema(self, schema_name: str) -> Schema | None:
+        self.database.load_schema(schema_name=schema_name)
+        return self.database.schemas.get(schema_name)
+
+    def get_table(self, schema_name: str, table_name: str) -> Table:
+        schema = self.get_schema(schema_name=schema_name)
+        if schema is None or table_name not in schema.tables:
+            raise CatalogFormatError(f"Journal references not existing table {schema_name}.{table_name}.")
+        return schema.tables[table_name]
+
+    def decode_value(self, value):
+        if not isinstance(value, list):
+            return value
+
+        tag = value[0]
+        if tag == "c":
+            return self.get_table(schema_name=value[1], table_name=value[2]).columns[value[3]]
+        if tag == "t":
+            return self.get_table(schema_name=value[1], table_name=value[2])
+        if tag == "l":
+            return [self.decode_value(item) for item in value[1]]
+        if tag == "r":
+            return self.constrains[value[1]]
+        if tag == "k":
+            kind = serialization.CONSTRAIN_KINDS[value[1]]
+            constrain = kind.__new__(kind)
+            self.constrains.append(constrain)
+            for slot, slot_value in zip(serialization.CONSTRAIN_SLOTS[value[1]], value[2]):
+                setattr(constrain, slot, self.decode_value(slot_value))
+            return constrain
+
+        raise CatalogFormatError(f"Unknown value tag {tag}.")
+
+    @staticmethod
+    def decode_datatype(value: list | None) -> Datatype | None:
+        if value is None:
+            return None
+
+        type_name, literals, args = value
+        datatype = Datatype.__new__(Datatype)
+        datatype.column_datatype = DataType.Type[type_name]
+        datatype.literals = []
+        for literal_value, is_int, is_number, is_star, is_string, literal_args in literals:
+            literal = Literal.__new__(Literal)
+            literal.value = literal_value
+            literal.is_int = is_int
+            literal.is_number = is_number
+            literal.is_star = is_star
+            literal.is_string = is_string
+            literal.args = serialization.decode_args(literal_args)
+            datatype.literals.append(literal)
+        datatype.args = serialization.decode_args(args)
+        return share_datatype(datatype=datatype)
+
+    @staticmethod
+    def remove_own_foreign_keys(table: Table) -> list:
+        """
+        Removes own foreign keys of the table from the referenced tables
+        Emptied lists are kept, so the order of constraints is kept if the foreign keys are added again
+        :return: List of (referenced table, key) of emptied lists
+        """
+
+        emptied = []
+        for constrain in table.constrains.get((table, table), []):
+            if not isinstance(constrain, ForeignKey) or constrain.table_ref is table:
+                continue
+
+            key = (constrain.table_ref, table)
+            referenced = constrain.table_ref.constrains.get(key, [])
+            if constrain in referenced:
+                referenced.remove(constrain)
+            if not referenced:
+                emptied.append((constrain.table_ref, key))
+
+        return emptied
+
+    @staticmethod
+    def remove_emptied(emptied: list) -> None:
+        for table_ref, key in emptied:
+            if not table_ref.constrains.get(key, True):
+                del table_ref.constrains[key]
+
+    def drop_schema(self, schema_name: str) -> None:
+        schema = self.get_schema(schema_name=schema_name)
+        if schema is None:
+            return
+
+        for table in schema.tables.values():
+            self.remove_emptied(emptied=self.remove_own_foreign_keys(table=table))
+        del self.database.schemas[schema_name]
+
+    def create_schema(self, schema_name: str) -> None:
+        schema = Schema.__new__(Schema)
+        schema.name = intern_name(schema_name)
+        schema.database = self.database
+        schema.tables = {}
+        self.database.schemas[schema.name] = schema
+
+    def drop_table(self, schema_name: str, table_name: str) -> None:
+        table = self.get_table(schema_name=schema_name, table_name=table_name)
+        self.remove_emptied(emptied=self.remove_own_foreign_keys(table=table))
+        del table.schema.tables[table_name]
+
+    def update_table(self, schema_name: str, table_name: str, args: dict, columns: list) -> None:
+        """
+        Creates the table or updates the existing one in place, existing columns are kept
+        """
+
+        schema = self.get_schema(schema_name=schema_name)
+        if schema is None:
+            raise CatalogFormatError(f"Journal references not existing schema {schema_name}.")
+
+        table = schema.tables.get(table_name)
+        if table is None:
+            table = Table.__new__(Table)
+            table.name = intern_name(table_name)
+            table.schema = schema
+            table.database = self.database
+            table.columns = {}
+            table.primary_key = None
+            table.constrains = {}
+            table.indexes = {}
+            table.index_prefixes = {}
+            schema.tables[table.name] = table
+
+        table.args = serialization.decode_args(args)
+
+        old_columns, table.columns = table.columns, {}
+        for column_name, is_name_quoted, datatype in columns:
+            column = old_columns.get(column_name)
+            if column is None:
+                column = Column.__new__(Column)
+                column.name = intern_name(column_name)
+                column.table = table
+            column.is_name_quoted = is_name_quoted
+            column.datatype = self.decode_datatype(value=datatype)
+            column.constrains = []
+            table.columns[column.name] = column
+
+    def update_table_constrains(self, schema_name: str, table_name: str, primary_key, constrains: list,
+                                indexes: list, column_constrains: list) -> None:
+        table = self.get_table(schema_name=schema_name, table_name=table_name)
+        emptied = self.remove_own_foreign_keys(table=table)
+
+        # Constraints are numbered in the order of encoding, so it has to be the same as the order of decoding
+        table.primary_key = self.decode_value(primary_key)
+
+        # Foreign keys of other tables which reference this table are kept, own constraints keep their position
+        own_constrains = self.decode_value(constrains)
+        if own_constrains:
+            table.constrains[(table, table)] = own_constrains
+        else:
+            table.constrains.pop((table, table), None)
+
+        for constrain in own_constrains:
+            if isinstance(constrain, ForeignKey) and constrain.table_ref is not table:
+                constrain.table_ref.constrains.setdefault((constrain.table_ref, table), []).append(constrain)
+        self.remove_emptied(emptied=emptied)
+
+        table.indexes = {name: self.decode_value(index) for name, index in indexes}
+        table.rebuild_index_prefixes()
+
+        for column_name, value in column_constrains:
+            table.columns[column_name].constrains = self.decode_value(value)
+
+    def apply(self, record: list) -> None:
+        dropped_schemas, created_schemas, dropped_tables, tables, tables_constrains = record
+
+        for schema_name in dropped_schemas:
+            self.drop_schema(schema_name=schema_name)
+        for schema_name in created_schemas:
+            self.create_schema(schema_name=schema_name)
+        for schema_name, table_name in dropped_tables:
+            self.drop_table(schema_name=schema_name, table_name=table_name)
+
+        # All tables exist before constraints are restored, foreign keys can reference any of them
+        for table in tables:
+            self.update_table(*table)
+
+        self.constrains = []
+        for table_constrains in tables_constrains:
+            self.update_table_constrains(*table_constrains)
+
+
+class LiveReplayer(TableReplayer):
+    """
+    Applies a record to memory representation which is in use, e.g. a change replayed from the lint cache.
+    Changes are notified to snapshots and catalog storage and indexes are updated only for the changed tables,
+    instead of rebuilding them after the replay.
+    """
+
+    def get_table(self, schema_name: str, table_name: str) -> Table:
+        self.database.load_table(schema_name=schema_name, table_name=table_name)
+        return super().get_table(schema_name=schema_name, table_name=table_name)
+
+    def cancel_table(self, table: Table) -> None:
+        """
+        Cancels registration of the table, foreign keys of other tables which reference it stay registered
+        """
+
+        for constrain in table.constrains.get((table, table), ()):
+            if isinstance(constrain, ForeignKey):
+                self.database.dependencies.remove_foreign_key(foreign_key=constrain)
+
+        table.cancel_index_owner_registration()
+        self.database.index_cancel_registration(key=(table.schema.name, table.name))
+        self.database.query.cancel_table(table=table)
+
+    def apply(self, record: list) -> None:
+        dropped_schemas, created_schemas, dropped_tables, tables, tables_constrains = record
+        database = self.database
+
+        if dropped_schemas or created_schemas:
+            database.notify_change(changed_object=database)
+
+        for schema_name in dropped_schemas:
+            database.load_schema_tables(schema_name=schema_name)
+            schema = self.get_schema(schema_name=schema_name)
+            if schema is None:
+                continue
+
+            for table in schema.tables.values():
+                self.cancel_table(table=table)
+            self.drop_schema(schema_name=schema_name)
+            database.index_cancel_registration(key=schema_name)
+
+        for schema_name in created_schemas:
+            self.create_schema(schema_name=schema_name)
+            database.index_registration(key=schema_name, reg_object=database.schemas[schema_name])
+
+        for schema_name, table_name in dropped_tables:
+            table = self.get_table(schema_name=schema_name, table_name=table_name)
+            database.notify_change(changed_object=table.schema)
+            self.cancel_table(table=table)
+            self.drop_table(schema_name=schema_name, table_name=table_name)
+
+        for schema_name, table_name, *_ in tables:
+            database.load_table(schema_name=schema_name, table_name=table_name)
+            schema = self.get_schema(schema_name=schema_name)
+            table = schema.tables.get(table_name) if schema is not None else None
+
+            if table is None:
+                if schema is not None:
+                    database.notify_change(changed_object=schema)
+                continue
+
+            database.notify_change(changed_object=table)
+            for column in table.columns.values():
+                database.notify_change(changed_object=column)
+            self.cancel_table(table=table)
+
+        super().apply(record=[[], [], [], tables, tables_constrains])
+
+        for schema_name, table_name, *_ in tables:
+            database.register_table(table=self.get_table(schema_name=schema_name, table_name=table_name))
+
+
+##################################################
+#                     JOURNAL
+##################################################
+
+class CatalogJournal:
+    """
+    Appends changes of memory representation to the journal of catalog file
+    """
+
+    def __init__(self, database: Database, path: Path):
+        """
+        Opens the journal for appending, a torn record at the end of journal is cut off
+        and a journal of another catalog file is started again
+        :param database: Memory representation loaded from the catalog file and its journal
+        :param path: Path of catalog file
+        """
+
+        self.database = database
+        self.path = get_journal_path(path=path)
+
+        catalog_id = get_catalog_id(path=path)
+        if catalog_id is None:
+            raise CatalogFormatError("The journal can be used only with a catalog file.")
+
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, catalog_id)
+        valid_length = 0
+        if self.path.exists():
+            with open(self.path, "rb") as f:
+                if f.read(HEADER.size) == header:
+                    valid_length = HEADER.size + sum(len(data) + RECORD_HEADER.size
+                                                     for data in self._read_records(file=f))
+
+        self.file = open(self.path, "r+b" if valid_length else "wb")
+        if valid_length:
+            self.file.truncate(valid_length)
+            self.file.seek(valid_length)
+        else:
+            self.file.write(header)
+            self.file.flush()
+
+        # Records of previous runs, they are kept if the changes of this run are discarded
+        self.start_size = self.file.tell()
+
+        # Changes since the last record
+        self.snapshot = database.snapshot()
+
+    ##################################################
+    #                  PRIVATE METHODS
+    ##################################################
+
+    @staticmethod
+    def _read_records(file: BinaryIO):
+        """
+        Yields payloads of complete records, stops at the first torn record
+        """
+
+        while True:
+            record_header = file.read(RECORD_HEADER.size)
+            if len(record_header) < RECORD_HEADER.size:
+                return
+
+            length, checksum = RECORD_HEADER.unpack(record_header)
+            data = file.read(length)
+            if len(data) < length or zlib.crc32(data) != checksum:
+                return
+
+            yield data
+
+    def _get_record(self) -> list | None:
+        """
+        Return record of changes captured by the snapshot
+        """
+
+        return get_changes(database=self.database, snapshot=self.snapshot)
+
+    ##################################################
+    #                  PUBLIC METHODS
+    ##################################################
+
+    @staticmethod
+    def replay(database: Database, path: Path) -> int:
+        """
+        Applies the journal of catalog file to memory representation loaded from the catalog file
+        :param database: Memory representation loaded from the catalog file
+        :param path: Path of catalog file
+        :return: Count of applied records
+        """
+
+        journal_path = get_journal_path(path=path)
+        if not journal_path.exists():
+            return 0
+
+        catalog_id = get_catalog_id(path=path)
+        replayer = TableReplayer(database=database)
+        count = 0
+
+        with open(journal_path, "rb") as f:
+            if catalog_id is None or f.read(HEADER.size) != HEADER.pack(MAGIC, FORMAT_VERSION, catalog_id):
+                raise CatalogFormatError(f"The journal does not belong to the catalog file.\nJournal: {journal_path}")
+
+            try:
+                for data in CatalogJournal._read_records(file=f):
+                    replayer.apply(record=json.loads(data))
+                    count += 1
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise CatalogFormatError(f"The journal contains an invalid record: {e}") from e
+
+        if count:
+            database.rebuild_indexes(dependencies=True)
+
+        return count
+
+    def record_changes(self) -> None:
+        """
+        Appends changes made since the previous record to the journal
+        :return: None
+        """
+
+        record = self._get_record()
+        if record is None:
+            return
+
+        data = json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        self.file.write(RECORD_HEADER.pack(len(data), zlib.crc32(data)) + data)
+        self.file.flush()
+
+        self.snapshot.release()
+        self.snapshot = self.database.snapshot()
+
+    def get_size(self) -> int:
+        """
+        Return size of journal in bytes
+        :return: The size
+        """
+
+        return self.path.stat().st_size
+
+    def discard(self) -> None:
+        """
+        Removes records of changes made since the journal was opened and stops recording of changes
+        :return: None
+        """
+
+        self.snapshot.release()
+        self.file.truncate(self.start_size)
+        self.file.close()
+
+    def close(self) -> None:
+        """
+        Writes the journal to the disk and stops recording of changes
+        :return: None
+        """
+
+        self.record_changes()
+        self.snapshot.release()
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
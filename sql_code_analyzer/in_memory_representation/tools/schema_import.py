@@ -0,0 +1,454 @@
+#######################################
+# File name: schema_import.py
+# Purpose: Import of memory representation from a schema description, e.g. an export of information_schema
+#
+# Key features:
+#     read_schema_description:
+#        Reads rows of columns, constraints and indexes from JSON, YAML or CSV files
+#        JSON and YAML file contains an object with lists "columns", "constraints" and "indexes"
+#        or only a list of columns, each CSV file contains one of the lists, which one is given by its header
+#        Names of keys are the same as names of columns of information_schema, their case does not matter:
+#           columns: table_schema, table_name, column_name, ordinal_position, data_type (or column_type),
+#                    character_maximum_length, numeric_precision, numeric_scale, is_nullable, column_default
+#           constraints: table_schema, table_name, constraint_name, constraint_type, column_name,
+#                        ordinal_position, referenced_table_schema, referenced_table_name,
+#                        referenced_column_name, check_clause
+#           indexes: table_schema, table_name, index_name, column_name, ordinal_position
+#
+#     import_schema_description:
+#        Creates schemas, tables, columns, constraints and indexes directly, without SQL statements,
+#        inside bulk load of the database, so indexes of memory representation are built once at the end
+#
+#######################################
+
+from __future__ import annotations
+
+import csv
+import json
+
+from sqlglot import expressions as exp
+from sqlglot.errors import ParseError
+
+from sql_code_analyzer.in_memory_representation.exceptions import SchemaDescriptionError, TableAlreadyExists
+from sql_code_analyzer.in_memory_representation.struct.column import Column
+from sql_code_analyzer.in_memory_representation.struct.constrain import CheckExpression, DefaultValue, \
+    ForeignKey, Index, PreventNotNull, PrimaryKey, UniqueValue
+from sql_code_analyzer.in_memory_representation.tools.interning import get_datatype, get_literal
+from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Dict, Iterable, List, Tuple
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+    from sql_code_analyzer.in_memory_representation.struct.datatype import Datatype
+    from sql_code_analyzer.in_memory_representation.struct.table import Table
+
+# Lists of rows of schema description
+SECTIONS = ("columns", "constraints", "indexes")
+
+# Datatypes which get character_maximum_length as their argument
+_LENGTH_DATATYPES = {exp.DataType.Type.CHAR, exp.DataType.Type.NCHAR, exp.DataType.Type.VARCHAR,
+                     exp.DataType.Type.NVARCHAR, exp.DataType.Type.BINARY, exp.DataType.Type.VARBINARY}
+
+# Datatypes which get numeric_precision and numeric_scale as their arguments
+_PRECISION_DATATYPES = {exp.DataType.Type.DECIMAL}
+
+
+##################################################
+#                    READING
+##################################################
+
+def _get_rows(rows, section: str, path: Path) -> List[dict]:
+    """
+    Return rows with lower case keys, empty values are replaced by None
+    """
+
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise SchemaDescriptionError(f"The {section} of file {path.name} must be a list of objects.")
+
+    return [{str(key).lower(): None if value == "" else value for key, value in row.items()} for row in rows]
+
+
+def _read_csv(path: Path) -> Tuple[str, List[dict]]:
+    """
+    Return the section and rows of the CSV file, the section is given by the header
+    """
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    header = {key.lower() for key in rows[0]} if rows else set()
+    if "constraint_type" in header:
+        section = "constraints"
+    elif "index_name" in header:
+        section = "indexes"
+    else:
+        section = "columns"
+
+    return section, rows
+
+
+def _load_yaml(path: Path):
+    """
+    Return content of the YAML file, PyYAML is needed only for this format
+    """
+
+    try:
+        import yaml
+    except ImportError:
+        raise SchemaDescriptionError(f"The PyYAML package is needed to read file {path.name}.")
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f)
+
+    except yaml.YAMLError as e:
+        raise SchemaDescriptionError(f"The file {path.name} is not a valid YAML: {e}") from e
+
+
+def read_schema_description(paths: Iterable[Path]) -> Dict[str, List[dict]]:
+    """
+    Reads the schema description from the files, rows of all files are joined
+    :param paths: Paths of JSON (.json), YAML (.yaml, .yml) or CSV (.csv) files
+    :return: Dictionary with lists of rows of columns, constraints and indexes
+    """
+
+    description = {section: [] for section in SECTIONS}
+
+    for path in paths:
+        suffix = path.suffix.lower()
+
+        try:
+            if suffix == ".csv":
+                section, rows = _read_csv(path=path)
+                description[section] += _get_rows(rows=rows, section=section, path=path)
+                continue
+
+            if suffix == ".json":
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            elif suffix in (".yaml", ".yml"):
+                data = _load_yaml(path=path)
+            else:
+                raise SchemaDescriptionError(f"Unknown format of file {path.name}, expected JSON, YAML or CSV.")
+
+        except (OSError, UnicodeDecodeError, csv.Error, json.JSONDecodeError) as e:
+            raise SchemaDescriptionError(f"The file {path.name} can not be read: {e}") from e
+
+        # A list is a list of columns
+        if isinstance(data, list):
+            data = {"columns": data}
+
+        if not isinstance(data, dict):
+            raise SchemaDescriptionError(f"The file {path.name} must contain an object or a list of columns.")
+
+        for section in SECTIONS:
+            description[section] += _get_rows(rows=data.get(section) or [], section=section, path=path)
+
+    return description
+
+
+##################################################
+#                    IMPORT
+##################################################
+
+def _get_value(row: dict, key: str, section: str) -> str:
+    """
+    Return the required value of the row as string
+    """
+
+    value = row.get(key)
+    if value is None:
+        raise SchemaDescriptionError(f"A row of {section} has no {key}: {row}")
+    return str(value)
+
+
+def _get_int(row: dict, key: str) -> int | None:
+    """
+    Return the optional integer value of the row
+    """
+
+    value = row.get(key)
+    if value is None:
+        return None
+
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise SchemaDescriptionError(f"The {key} must be an integer: {row}")
+
+
+def _sort_rows(rows: List[dict]) -> List[dict]:
+    """
+    Return rows ordered by ordinal_position, rows without it keep their order
+    """
+
+    positions = [_get_int(row=row, key="ordinal_position") for row in rows]
+    order = sorted(range(len(rows)), key=lambda i: (i if positions[i] is None else positions[i], i))
+    return [rows[i] for i in order]
+
+
+class _Importer:
+    """
+    Creates objects of the schema description in the database
+    """
+
+    def __init__(self, database: Database, dialect: str | None):
+        self.database = database
+        self.dialect = dialect.lower() if dialect else None
+
+        # (schema name, table name) -> imported table
+        self.tables: Dict[tuple, Table] = {}
+
+        # Tables which are not imported, e.g. they already exist
+        self.skipped = set()
+
+        # Values of datatype columns -> shared datatype
+        self.datatypes: Dict[tuple, Datatype] = {}
+
+    def get_table_key(self, row: dict, section: str, prefix: str = "") -> tuple:
+        """
+        Return schema name and table name of the row, the default schema is used if the schema is not set
+        """
+
+        return (str(row.get(f"{prefix}table_schema") or self.database.default_schema),
+                _get_value(row=row, key=f"{prefix}table_name", section=section))
+
+    def get_table(self, key: tuple) -> Table | None:
+        """
+        Return the imported table or a table which already was in the database
+        """
+
+        table = self.tables.get(key)
+        if table is not None:
+            return table
+
+        self.database.load_schema(schema_name=key[0])
+        schema = self.database.schemas.get(key[0])
+        if schema is None:
+            return None
+
+        self.database.load_table(schema_name=key[0], table_name=key[1])
+        return schema.tables.get(key[1])
+
+    def get_columns(self, table: Table, column_names: List[str], kind: str, name: str):
+        """
+        Return columns of the table, None and a warning if some of them does not exist
+        """
+
+        columns = [table.columns.get(column_name) for column_name in column_names]
+        if None in columns:
+            ProgramReporter.show_warning_message(
+                message=f"While importing schema description, {kind} {name} of table {table.name} "
+                        f"references a missing column. The {kind} will be skipped."
+            )
+            return None
+
+        return columns
+
+    def get_datatype(self, row: dict) -> Datatype:
+        """
+        Return the shared datatype of the column row
+        """
+
+        text = row.get("data_type") or _get_value(row=row, key="column_type", section="columns")
+        values = (str(text),
+                  _get_int(row=row, key="character_maximum_length"),
+                  _get_int(row=row, key="numeric_precision"),
+                  _get_int(row=row, key="numeric_scale"))
+
+        datatype = self.datatypes.get(values)
+        if datatype is not None:
+            return datatype
+
+        text, length, precision, scale = values
+        try:
+            node = exp.DataType.build(text, dialect=self.dialect)
+
+            # Arguments of datatype are given separately in information_schema
+            if not node.expressions:
+                if node.this in _LENGTH_DATATYPES and length is not None and length > 0:
+                    node = exp.DataType.build(f"{text}({length})", dialect=self.dialect)
+                elif node.this in _PRECISION_DATATYPES and precision is not None:
+                    arguments = f"{precision}" if scale is None else f"{precision}, {scale}"
+                    node = exp.DataType.build(f"{text}({arguments})", dialect=self.dialect)
+
+        except (ParseError, ValueError) as e:
+            raise SchemaDescriptionError(f"Unknown datatype {text} of column {row.get('column_name')}.") from e
+
+        datatype = self.datatypes[values] = get_datatype(node=node,
+                                                         literals=[get_literal(node=literal)
+                                                                   for literal in node.expressions])
+        return datatype
+
+    ###########################
+    #         COLUMNS
+    ###########################
+    def import_columns(self, rows: List[dict]) -> None:
+        tables: Dict[tuple, List[dict]] = {}
+        for row in rows:
+            tables.setdefault(self.get_table_key(row=row, section="columns"), []).append(row)
+
+        for (schema_name, table_name), table_rows in tables.items():
+            self.database.get_or_create_schema(database=self.database, schema_name=schema_name)
+
+            try:
+                table = self.database.create_table(database=self.database,
+                                                   schema_name=schema_name,
+                                                   table_name=table_name)
+
+            except TableAlreadyExists:
+                ProgramReporter.show_warning_message(
+                    message=f"While importing schema description, table {table_name} already exists. "
+                            "The table will be skipped."
+                )
+                self.skipped.add((schema_name, table_name))
+                continue
+
+            self.tables[(schema_name, table_name)] = table
+
+            for row in _sort_rows(rows=table_rows):
+                column = Column(identifier=exp.to_identifier(_get_value(row=row, key="column_name",
+                                                                        section="columns")),
+                                datatype=self.get_datatype(row=row),
+                                constrains=[],
+                                table=table)
+
+                if str(row.get("is_nullable") or "").upper() in ("NO", "N", "FALSE", "0"):
+                    column.add_constrain(PreventNotNull(column=column))
+
+                if row.get("column_default") is not None:
+                    column.add_constrain(DefaultValue(default_value=str(row["column_default"]), column=column))
+
+    ###########################
+    #       CONSTRAINTS
+    ###########################
+    def import_constraints(self, rows: List[dict]) -> None:
+        # Rows of one constraint have the same name, a table has only one primary key
+        constraints: Dict[tuple, List[dict]] = {}
+        for index, row in enumerate(rows):
+            kind = _get_value(row=row, key="constraint_type", section="constraints").upper()
+            name = row.get("constraint_name") or ("" if kind == "PRIMARY KEY" else index)
+            key = self.get_table_key(row=row, section="constraints")
+            constraints.setdefault((key, kind, name), []).append(row)
+
+        for (key, kind, name), constraint_rows in constraints.items():
+            if key in self.skipped:
+                continue
+
+            table = self.get_table(key=key)
+            if table is None:
+                ProgramReporter.show_warning_message(
+                    message=f"While importing schema description, table {key[1]} of constraint "
+                            f"{name} does not exist. The constraint will be skipped."
+                )
+                continue
+
+            constraint_rows = _sort_rows(rows=constraint_rows)
+            name = constraint_rows[0].get("constraint_name")
+
+            if kind == "CHECK":
+                table.add_constrain(constrain=CheckExpression(
+                    expression=_get_value(row=constraint_rows[0], key="check_clause", section="constraints"),
+                    name=name))
+                continue
+
+            columns = self.get_columns(table=table,
+                                       column_names=[_get_value(row=row, key="column_name", section="constraints")
+                                                     for row in constraint_rows],
+                                       kind=kind.lower(),
+                                       name=name or "")
+            if columns is None:
+                continue
+
+            if kind == "PRIMARY KEY":
+                primary_key = PrimaryKey(columns=columns)
+                if name is not None:
+                    primary_key.set_name(name)
+                table.add_primary_key(primary_key=primary_key)
+
+            elif kind == "FOREIGN KEY":
+                table_ref = self.get_table(key=self.get_table_key(row=constraint_rows[0], section="constraints",
+                                                                  prefix="referenced_"))
+                if table_ref is None:
+                    ProgramReporter.show_warning_message(
+                        message=f"While importing schema description, the referenced table of foreign key "
+                                f"{name or ''} of table {table.name} does not exist. The foreign key will be skipped."
+                    )
+                    continue
+
+                reference_columns = self.get_columns(
+                    table=table_ref,
+                    column_names=[str(row.get("referenced_column_name")) for row in constraint_rows],
+                    kind="foreign key",
+                    name=name or "")
+                if reference_columns is None:
+                    continue
+
+                table.add_constrain(constrain=ForeignKey(fk_columns=columns,
+                                                         reference_columns=reference_columns,
+                                                         table_fk=table,
+                                                         table_ref=table_ref,
+                                                         name=name))
+
+            elif kind == "UNIQUE" and len(columns) == 1:
+                columns[0].add_constrain(UniqueValue(column=columns[0], name=name))
+
+            else:
+                # Memory representation has no unique constraint of more columns
+                ProgramReporter.show_warning_message(
+                    message=f"While importing schema description, constraint {name or ''} {kind} "
+                            f"of table {table.name} is not supported. The constraint will be skipped."
+                )
+
+    ###########################
+    #         INDEXES
+    ###########################
+    def import_indexes(self, rows: List[dict]) -> None:
+        indexes: Dict[tuple, List[dict]] = {}
+        for row in rows:
+            key = self.get_table_key(row=row, section="indexes")
+            name = _get_value(row=row, key="index_name", section="indexes")
+            indexes.setdefault((key, name), []).append(row)
+
+        for (key, name), index_rows in indexes.items():
+            if key in self.skipped:
+                continue
+
+            table = self.get_table(key=key)
+            if table is None:
+                ProgramReporter.show_warning_message(
+                    message=f"While importing schema description, table {key[1]} of index "
+                            f"{name} does not exist. The index will be skipped."
+                )
+                continue
+
+            columns = self.get_columns(table=table,
+                                       column_names=[_get_value(row=row, key="column_name", section="indexes")
+                                                     for row in _sort_rows(rows=index_rows)],
+                                       kind="index",
+                                       name=name)
+            if columns is not None:
+                table.add_index(index=Index(name=name, columns=columns))
+
+
+def import_schema_description(database: Database, description: Dict[str, List[dict]],
+                              dialect: str | None = None) -> int:
+    """
+    Creates objects of the schema description in the database, the database is bulk loaded
+    Constraints and indexes are created after all tables, so foreign keys can reference any imported table
+    :param database: The database
+    :param description: Rows of columns, constraints and indexes (see read_schema_description)
+    :param dialect: Dialect of datatypes
+    :return: Count of imported tables
+    """
+
+    importer = _Importer(database=database, dialect=dialect)
+
+    with database.bulk_load():
+        importer.import_columns(rows=description.get("columns", []))
+        importer.import_constraints(rows=description.get("constraints", []))
+        importer.import_indexes(rows=description.get("indexes", []))
+
+    return len(importer.tables)
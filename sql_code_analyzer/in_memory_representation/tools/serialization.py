@@ -0,0 +1,735 @@
+#######################################
+# File name: serialization.py
+# Purpose: Versioned file format of memory representation used by --serialization-file and --deserialization-file
+#
+# Key features:
+#     File starts with a header: magic bytes, format version, location and CRC32 checksum of table of contents
+#     Segments are written one after another as their records are encoded, table of contents is written
+#     after them, so the file is written in one pass and no segment is held in memory as a whole
+#     Table of contents contains database name, default schema and location of segments in the file
+#     Segments contain one record per line, each record is a compact JSON array starting with its tag:
+#        D  datatype with its literals (all datatypes are in the first segment)
+#        S  schema
+#        T  table with its columns
+#        K  constraints of a table (written after all tables, so foreign keys can reference any table)
+#     Schemas related by foreign keys are stored in one segment, other schemas have their own segments
+#     Each segment has its own CRC32 checksum, verified before any object of the segment is created
+#     References to tables, columns and constraints are tagged values, so the file does not depend
+#     on layout of Python classes or on sqlglot version
+#     Schemas are materialized on their first access, so loading cost scales with the schemas actually used
+#     Only files of the current format version are loaded
+#     Files created by pickle in previous versions of program are still loaded, objects of their
+#     classes (with properties and sqlglot nodes in arguments) are converted to the current classes
+#
+#######################################
+
+from __future__ import annotations
+
+import io
+import json
+import pickle
+import struct
+import zlib
+
+from sqlglot.expressions import DataType
+
+from sql_code_analyzer.in_memory_representation.exceptions import CatalogFormatError
+from sql_code_analyzer.in_memory_representation.struct.base import Base
+from sql_code_analyzer.in_memory_representation.struct.column import Column
+from sql_code_analyzer.in_memory_representation.struct.constrain import PreventNotNull, PrimaryKey, ForeignKey, \
+    UniqueValue, DefaultValue, Index, CheckExpression
+from sql_code_analyzer.in_memory_representation.struct.database import Database
+from sql_code_analyzer.in_memory_representation.struct.datatype import Datatype
+from sql_code_analyzer.in_memory_representation.struct.literal import Literal
+from sql_code_analyzer.in_memory_representation.struct.schema import Schema
+from sql_code_analyzer.in_memory_representation.struct.table import Table
+from sql_code_analyzer.in_memory_representation.tools.interning import intern_name, share_datatype
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import BinaryIO, Dict, Iterable, List
+
+MAGIC = b"SQLCAT"
+
+# Version 2: table of contents and segments of schemas
+# Version 3: table of contents after segments
+FORMAT_VERSION = 3
+
+# Magic bytes, format version, offset, length and CRC32 of table of contents
+HEADER = struct.Struct("<6sHQQI")
+
+# Constraint classes which can be stored, constraints are stored by their slots
+CONSTRAIN_KINDS = {kind.__name__: kind for kind in (PreventNotNull, PrimaryKey, ForeignKey, UniqueValue,
+                                                    DefaultValue, Index, CheckExpression)}
+
+
+def _get_slots(kind) -> tuple:
+    """
+    Return names of all slots of the class including the inherited ones
+    """
+
+    slots = []
+    for klass in reversed(kind.__mro__):
+        slots.extend(getattr(klass, "__slots__", ()))
+    return tuple(slots)
+
+
+CONSTRAIN_SLOTS = {name: _get_slots(kind) for name, kind in CONSTRAIN_KINDS.items()}
+
+
+def _to_tuples(value):
+    """
+    Converts lists decoded from JSON back to tuples used by plain arguments
+    """
+
+    if isinstance(value, list):
+        return tuple(_to_tuples(item) for item in value)
+    return value
+
+
+def decode_args(args: dict) -> dict:
+    """
+    Converts arguments decoded from JSON back to plain arguments
+    """
+
+    return {key: _to_tuples(value) for key, value in args.items()}
+
+
+def _encode_record(record: list) -> bytes:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _write_records(file: BinaryIO, records: Iterable[list]) -> tuple:
+    """
+    Writes records one per line as they are encoded
+    :param file: File opened for binary writing
+    :param records: Records of a segment
+    :return: Length and CRC32 checksum of written data
+    """
+
+    length = 0
+    checksum = 0
+    separator = b""
+    for record in records:
+        data = separator + _encode_record(record)
+        file.write(data)
+        length += len(data)
+        checksum = zlib.crc32(data, checksum)
+        separator = b"\n"
+
+    return length, checksum
+
+
+##################################################
+#                     WRITE
+##################################################
+
+class _Writer:
+    """
+    Encodes memory representation to records
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+
+        # Datatypes are numbered in the whole file
+        self.datatypes: Dict[int, int] = {}
+        self.datatype_records: List[list] = []
+
+        # Tables and constraints are numbered in their segment
+        self.tables: Dict[Table, int] = {}
+        self.constrains: Dict[int, int] = {}
+
+        # Keeps encoded constraints alive, so their identities are not reused
+        self.encoded: list = []
+
+    def encode_value(self, value):
+        """
+        Encodes a value of constraint slot
+        Plain values are stored as they are, references are stored as tagged lists
+        """
+
+        if value is None or isinstance(value, (str, bool, int, float)):
+            return value
+
+        if isinstance(value, Column):
+            return ["c", self.tables[value.table], value.name]
+
+        if isinstance(value, Table):
+            return ["t", self.tables[value]]
+
+        if isinstance(value, (list, tuple)):
+            return ["l", [self.encode_value(item) for item in value]]
+
+        if type(value).__name__ in CONSTRAIN_KINDS:
+            return self.encode_constrain(value)
+
+        raise CatalogFormatError(f"Value of type {type(value).__name__} can not be serialized.")
+
+    def encode_constrain(self, constrain) -> list:
+        """
+        Encodes the constraint, the same constraint is stored only once and then referenced
+        """
+
+        number = self.constrains.get(id(constrain))
+        if number is not None:
+            return ["r", number]
+
+        self.constrains[id(constrain)] = len(self.constrains)
+        self.encoded.append(constrain)
+
+        kind = type(constrain).__name__
+        return ["k", kind, [self.encode_value(getattr(constrain, slot, None)) for slot in CONSTRAIN_SLOTS[kind]]]
+
+    def encode_datatype(self, datatype: Datatype) -> int | None:
+        """
+        Return number of the datatype, the datatype record is added with its first use
+        """
+
+        if datatype is None:
+            return None
+
+        number = self.datatypes.get(id(datatype))
+        if number is None:
+            number = self.datatypes[id(datatype)] = len(self.datatypes)
+            self.datatype_records.append(["D", number, datatype.column_datatype.name,
+                                          [[literal.value, literal.is_int, literal.is_number, literal.is_star,
+                                            literal.is_string, literal.args] for literal in datatype.literals],
+                                          datatype.args])
+
+        return number
+
+    def get_segments(self) -> List[List[str]]:
+        """
+        Groups schemas to segments, schemas related by foreign keys are in the same segment
+        :return: List of schema names of each segment
+        """
+
+        schemas = self.database.schemas
+        groups = {schema_name: {schema_name} for schema_name in schemas}
+
+        for schema in schemas.values():
+            for table in schema.tables.values():
+                for key in table.constrains:
+                    for related_table in key:
+                        group, related_group = groups[schema.name], groups[related_table.schema.name]
+                        if group is related_group:
+                            continue
+
+                        if len(group) < len(related_group):
+                            group, related_group = related_group, group
+                        group.update(related_group)
+                        for schema_name in related_group:
+                            groups[schema_name] = group
+
+        segments = {}
+        for schema_name in schemas:
+            segments.setdefault(id(groups[schema_name]), []).append(schema_name)
+
+        return list(segments.values())
+
+    def get_segment_records(self, schema_names: List[str]):
+        """
+        Yields records of schemas of the segment
+        """
+
+        self.tables = {}
+        self.constrains = {}
+
+        tables: List[Table] = []
+        for schema_name in schema_names:
+            schema = self.database.schemas[schema_name]
+            yield ["S", schema.name]
+
+            for table in schema.tables.values():
+                self.tables[table] = len(self.tables)
+                tables.append(table)
+
+                yield ["T", table.name, table.args,
+                       [[column.name, column.is_name_quoted, self.encode_datatype(column.datatype)]
+                        for column in table.columns.values()]]
+
+        for number, table in enumerate(tables):
+            if table.primary_key is None and not table.constrains and not table.indexes \
+                    and not any(column.constrains for column in table.columns.values()):
+                continue
+
+            # Constraints are numbered in the order of encoding, so it has to be the same as the order of reading
+            primary_key = self.encode_value(table.primary_key)
+            constrains = [[self.encode_value(key), self.encode_value(constrains)]
+                          for key, constrains in table.constrains.items()]
+            indexes = [[name, self.encode_value(index)] for name, index in table.indexes.items()]
+            column_constrains = [[column.name, self.encode_value(column.constrains)]
+                                 for column in table.columns.values() if column.constrains]
+
+            yield ["K", number, primary_key, constrains, indexes, column_constrains]
+
+
+def dump(database: Database, file: BinaryIO) -> None:
+    """
+    Writes memory representation to the binary file
+    :param database: Memory representation
+    :param file: Seekable file opened for binary writing
+    :return: None
+    """
+
+    database.load_all_schemas()
+    writer = _Writer(database=database)
+
+    # Header is written when table of contents is known, so an unfinished file is not a catalog file
+    start = file.tell()
+    file.write(bytes(HEADER.size))
+
+    offset = 0
+    locations = []
+    try:
+        for schema_names in writer.get_segments():
+            length, checksum = _write_records(file=file, records=writer.get_segment_records(schema_names))
+            locations.append([offset, length, checksum, schema_names])
+            offset += length
+    except KeyError as e:
+        raise CatalogFormatError(f"Constraint references a table of another database: {e}") from e
+
+    # Datatypes are collected while schemas are encoded, they are written after schemas but read first
+    length, checksum = _write_records(file=file, records=writer.datatype_records)
+    datatypes_location = [offset, length, checksum]
+    offset += length
+
+    toc = _encode_record(["B", database.name, database.default_schema, datatypes_location, locations])
+    file.write(toc)
+    end = file.tell()
+
+    file.seek(start)
+    file.write(HEADER.pack(MAGIC, FORMAT_VERSION, offset, len(toc), zlib.crc32(toc)))
+    file.seek(end)
+
+
+##################################################
+#                      READ
+##################################################
+
+class _Reader:
+    """
+    Creates objects of memory representation from records of one segment
+    """
+
+    def __init__(self, database: Database, datatypes: Dict[int, Datatype]):
+        self.database = database
+        self.datatypes = datatypes
+        self.schemas: List[Schema] = []
+        self.schema: Schema | None = None
+        self.tables: List[Table] = []
+        self.constrains: list = []
+
+    def decode_value(self, value):
+        """
+        Decodes a value of constraint slot
+        """
+
+        if not isinstance(value, list):
+            return value
+
+        tag = value[0]
+        if tag == "c":
+            return self.tables[value[1]].columns[value[2]]
+        if tag == "t":
+            return self.tables[value[1]]
+        if tag == "l":
+            return [self.decode_value(item) for item in value[1]]
+        if tag == "r":
+            return self.constrains[value[1]]
+        if tag == "k":
+            return self.decode_constrain(kind=value[1], values=value[2])
+
+        raise CatalogFormatError(f"Unknown value tag {tag}.")
+
+    def decode_constrain(self, kind: str, values: list):
+        if kind not in CONSTRAIN_KINDS:
+            raise CatalogFormatError(f"Unknown constraint {kind}.")
+
+        constrain = CONSTRAIN_KINDS[kind].__new__(CONSTRAIN_KINDS[kind])
+        self.constrains.append(constrain)
+
+        for slot, value in zip(CONSTRAIN_SLOTS[kind], values):
+            setattr(constrain, slot, self.decode_value(value))
+
+        return constrain
+
+    def read_datatype(self, number: int, type_name: str, literals: list, args: dict) -> None:
+        shared_literals = []
+        for value, is_int, is_number, is_star, is_string, literal_args in literals:
+            literal = Literal.__new__(Literal)
+            literal.value = value
+            literal.is_int = is_int
+            literal.is_number = is_number
+            literal.is_star = is_star
+            literal.is_string = is_string
+            literal.args = decode_args(literal_args)
+            shared_literals.append(literal)
+
+        datatype = Datatype.__new__(Datatype)
+        datatype.column_datatype = DataType.Type[type_name]
+        datatype.literals = shared_literals
+        datatype.args = decode_args(args)
+        self.datatypes[number] = share_datatype(datatype=datatype)
+
+    def read_schema(self, name: str) -> None:
+        schema = self.schema = Schema.__new__(Schema)
+        schema.name = intern_name(name)
+        schema.database = self.database
+        schema.tables = {}
+        self.database.schemas[schema.name] = schema
+        self.schemas.append(schema)
+
+    def read_table(self, name: str, args: dict, columns: list) -> None:
+        table = Table.__new__(Table)
+        table.name = intern_name(name)
+        table.schema = self.schema
+        table.database = self.database
+        table.args = decode_args(args)
+        table.columns = {}
+        table.primary_key = None
+        table.constrains = {}
+        table.indexes = {}
+        table.index_prefixes = {}
+        self.schema.tables[table.name] = table
+        self.tables.append(table)
+
+        datatypes = self.datatypes
+        for column_name, is_name_quoted, datatype in columns:
+            column = Column.__new__(Column)
+            column.name = intern_name(column_name)
+            column.is_name_quoted = is_name_quoted
+            column.datatype = datatypes[datatype] if datatype is not None else None
+            column.constrains = []
+            column.table = table
+            table.columns[column.name] = column
+
+    def read_table_constrains(self, number: int, primary_key, constrains: list, indexes: list,
+                              column_constrains: list) -> None:
+        table = self.tables[number]
+        table.primary_key = self.decode_value(primary_key)
+        table.constrains = {tuple(self.decode_value(key)): self.decode_value(value) for key, value in constrains}
+        table.indexes = {name: self.decode_value(index) for name, index in indexes}
+        table.rebuild_index_prefixes()
+
+        for column_name, value in column_constrains:
+            table.columns[column_name].constrains = self.decode_value(value)
+
+    def read(self, data: bytes) -> None:
+        """
+        Reads records of the segment one by one in a single pass
+        """
+
+        if not data:
+            return
+
+        try:
+            for line in data.split(b"\n"):
+                record = json.loads(line)
+                tag = record[0]
+                if tag == "T":
+                    self.read_table(*record[1:])
+                elif tag == "K":
+                    self.read_table_constrains(*record[1:])
+                elif tag == "S":
+                    self.read_schema(*record[1:])
+                elif tag == "D":
+                    self.read_datatype(*record[1:])
+                else:
+                    raise CatalogFormatError(f"Unknown record {tag}.")
+
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise CatalogFormatError(f"The file contains an invalid record: {e}") from e
+
+
+class _Segment:
+    """
+    Part of catalog file with schemas which are materialized together
+    """
+
+    __slots__ = ("data", "checksum", "schema_names", "datatypes")
+
+    def __init__(self, data: memoryview, checksum: int, schema_names: List[str], datatypes: Dict[int, Datatype]):
+        self.data = data
+        self.checksum = checksum
+        self.schema_names = schema_names
+        self.datatypes = datatypes
+
+    def load(self, database: Database) -> List[Schema]:
+        """
+        Creates schemas of the segment in the database, the schemas are not registered to indexes
+        :param database: The database
+        :return: Created schemas
+        """
+
+        data, self.data = self.data, None
+        if data is None:
+            return []
+
+        if zlib.crc32(data) != self.checksum:
+            raise CatalogFormatError("The checksum of segment does not match, the file is damaged.")
+
+        reader = _Reader(database=database, datatypes=self.datatypes)
+        reader.read(data=data.tobytes())
+        return reader.schemas
+
+
+##################################################
+#                 LEGACY FORMATS
+##################################################
+
+# Classes of memory representation pickled by previous versions of program
+_LEGACY_CLASSES = {"Database", "Schema", "Table", "Column", "Datatype", "Literal", *CONSTRAIN_KINDS}
+
+# Values of constraint slots which previous versions of program did not always set
+_LEGACY_DEFAULTS = {"composite": False}
+
+
+class _LegacyObject:
+    """
+    State of an object of memory representation pickled by previous versions of program
+    Their classes had properties which stored values in attributes prefixed by underscore
+    """
+
+    kind = ""
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
+    def get(self, name: str, default=None):
+        state = self.__dict__
+        return state.get(f"_{name}", state.get(name, default))
+
+
+class _LegacyUnpickler(pickle.Unpickler):
+    """
+    Unpickles classes of memory representation as their legacy states, other classes are unpickled as they are
+    """
+
+    def __init__(self, file):
+        super().__init__(file)
+        self.classes: Dict[str, type] = {}
+
+    def find_class(self, module: str, name: str):
+        if name in _LEGACY_CLASSES and module.rpartition(".")[0].endswith("in_memory_representation.struct"):
+            kind = self.classes.get(name)
+            if kind is None:
+                kind = self.classes[name] = type(name, (_LegacyObject,), {"kind": name})
+            return kind
+
+        return super().find_class(module, name)
+
+
+def _get_plain_args(args: dict, exclude=()) -> dict:
+    """
+    Converts arguments of a legacy object like Base.get_plain_args converts arguments of node
+    """
+
+    return {arg: Base.get_plain_value(value) for arg, value in args.items()
+            if arg not in exclude and value is not None and value is not False}
+
+
+class _LegacyConverter:
+    """
+    Creates memory representation from the legacy states
+    """
+
+    def __init__(self):
+        # Identity of legacy object -> converted object
+        self.objects: Dict[int, object] = {}
+
+    def convert_value(self, value):
+        """
+        Converts a value of constraint slot, references are replaced by the converted objects
+        """
+
+        if isinstance(value, _LegacyObject):
+            converted = self.objects.get(id(value))
+            return converted if converted is not None else self.convert_constrain(legacy=value)
+
+        if isinstance(value, list):
+            return [self.convert_value(item) for item in value]
+
+        if isinstance(value, tuple):
+            return tuple(self.convert_value(item) for item in value)
+
+        return Base.get_plain_value(value)
+
+    def convert_constrain(self, legacy: _LegacyObject):
+        if legacy.kind not in CONSTRAIN_KINDS:
+            raise CatalogFormatError(f"The pickle references {legacy.kind} which is not in the database.")
+
+        kind = CONSTRAIN_KINDS[legacy.kind]
+        constrain = self.objects[id(legacy)] = kind.__new__(kind)
+        for slot in CONSTRAIN_SLOTS[legacy.kind]:
+            setattr(constrain, slot, self.convert_value(legacy.get(slot, _LEGACY_DEFAULTS.get(slot))))
+
+        return constrain
+
+    def convert_datatype(self, legacy: _LegacyObject | None) -> Datatype | None:
+        if legacy is None:
+            return None
+
+        datatype = self.objects.get(id(legacy))
+        if datatype is not None:
+            return datatype
+
+        literals = []
+        for legacy_literal in legacy.get("literals") or ():
+            literal = Literal.__new__(Literal)
+            literal.value = legacy_literal.get("value")
+            literal.is_int = legacy_literal.get("is_int")
+            literal.is_number = legacy_literal.get("is_number")
+            literal.is_star = legacy_literal.get("is_star")
+            literal.is_string = legacy_literal.get("is_string")
+            literal.args = _get_plain_args(args=legacy_literal.get("args") or {}, exclude=("this",))
+            literals.append(literal)
+
+        datatype = Datatype.__new__(Datatype)
+        datatype.column_datatype = legacy.get("column_datatype")
+        datatype.literals = literals
+        datatype.args = _get_plain_args(args=legacy.get("args") or {}, exclude=("this", "kind", "expressions"))
+        datatype = self.objects[id(legacy)] = share_datatype(datatype=datatype)
+        return datatype
+
+    def convert(self, legacy: _LegacyObject) -> Database:
+        database = Database(db_name=legacy.get("name"))
+        database.default_schema = legacy.get("default_schema")
+
+        # Tables and columns are created first, so constraints can reference any of them
+        tables = []
+        for legacy_schema in legacy.get("schemas").values():
+            schema = Schema.__new__(Schema)
+            schema.name = intern_name(legacy_schema.get("name"))
+            schema.database = database
+            schema.tables = {}
+            database.schemas[schema.name] = schema
+
+            for legacy_table in legacy_schema.get("tables").values():
+                table = self.objects[id(legacy_table)] = Table.__new__(Table)
+                table.name = intern_name(legacy_table.get("name"))
+                table.schema = schema
+                table.database = database
+                table.args = _get_plain_args(args=legacy_table.get("args") or {})
+                table.columns = {}
+                table.primary_key = None
+                table.constrains = {}
+                table.indexes = {}
+                table.index_prefixes = {}
+                schema.tables[table.name] = table
+                tables.append((legacy_table, table))
+
+                for legacy_column in legacy_table.get("columns").values():
+                    column = self.objects[id(legacy_column)] = Column.__new__(Column)
+                    column.name = intern_name(legacy_column.get("name"))
+                    column.is_name_quoted = legacy_column.get("is_name_quoted")
+                    column.datatype = self.convert_datatype(legacy=legacy_column.get("datatype"))
+                    column.constrains = []
+                    column.table = table
+                    table.columns[column.name] = column
+
+        for legacy_table, table in tables:
+            table.primary_key = self.convert_value(legacy_table.get("primary_key"))
+            table.constrains = {self.convert_value(key): self.convert_value(value)
+                                for key, value in legacy_table.get("constrains").items()}
+            table.indexes = {name: self.convert_value(index) for name, index in legacy_table.get("indexes").items()}
+            table.rebuild_index_prefixes()
+
+            for legacy_column in legacy_table.get("columns").values():
+                self.objects[id(legacy_column)].constrains = self.convert_value(legacy_column.get("constrains"))
+
+        for schema in database.schemas.values():
+            database.register_schema(schema=schema)
+
+        return database
+
+
+def _load_pickle(data) -> Database:
+    """
+    Reads memory representation pickled by previous versions of program
+    """
+
+    try:
+        legacy = _LegacyUnpickler(io.BytesIO(data)).load()
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError) as e:
+        raise CatalogFormatError(f"The file is neither a catalog file nor a catalog pickle: {e}") from e
+
+    if not isinstance(legacy, _LegacyObject) or legacy.kind != "Database":
+        raise CatalogFormatError("The pickle does not contain a database.")
+
+    try:
+        return _LegacyConverter().convert(legacy=legacy)
+    except (AttributeError, TypeError, KeyError) as e:
+        raise CatalogFormatError(f"The pickle contains an unknown layout of database: {e}") from e
+
+
+def load(file: BinaryIO, lazy: bool = True) -> Database:
+    """
+    Reads memory representation from the binary file
+    Files created by pickle in previous versions of program are converted to the current classes
+    :param file: File opened for binary reading
+    :param lazy: Schemas are materialized on their first access, otherwise all schemas are materialized now
+    :return: Memory representation
+    """
+
+    return loads(data=file.read(), lazy=lazy)
+
+
+def loads(data, lazy: bool = True) -> Database:
+    """
+    Reads memory representation from the content of binary file
+    Segments of lazy schemas refer to the data without copying, so the data may be a read-only memory map
+    :param data: Bytes-like object with the content of file
+    :param lazy: Schemas are materialized on their first access, otherwise all schemas are materialized now
+    :return: Memory representation
+    """
+
+    content = memoryview(data)
+    header = content[:HEADER.size].tobytes()
+    if not header.startswith(MAGIC):
+        return _load_pickle(data=content)
+
+    if len(header) < HEADER.size:
+        raise CatalogFormatError("The file is truncated.")
+
+    _, version, toc_offset, length, checksum = HEADER.unpack(header)
+    if version != FORMAT_VERSION:
+        raise CatalogFormatError(f"Unsupported format version {version}, expected version {FORMAT_VERSION}.")
+
+    content = content[HEADER.size:]
+    toc = content[toc_offset:toc_offset + length].tobytes()
+    if len(toc) != length:
+        raise CatalogFormatError("The file is truncated.")
+    if zlib.crc32(toc) != checksum:
+        raise CatalogFormatError("The checksum of file does not match, the file is damaged.")
+
+    try:
+        _, name, default_schema, datatypes_location, locations = json.loads(toc)
+    except (ValueError, TypeError) as e:
+        raise CatalogFormatError(f"The file contains an invalid table of contents: {e}") from e
+
+    if any(offset + length > toc_offset for offset, length, *_ in [datatypes_location, *locations]):
+        raise CatalogFormatError("The file is truncated.")
+
+    database = Database(db_name=name)
+    database.default_schema = default_schema
+
+    datatypes = {}
+    offset, length, checksum = datatypes_location
+    _Segment(data=content[offset:offset + length], checksum=checksum, schema_names=[], datatypes=datatypes) \
+        .load(database=database)
+
+    for offset, length, checksum, schema_names in locations:
+        segment = _Segment(data=content[offset:offset + length], checksum=checksum, schema_names=schema_names,
+                           datatypes=datatypes)
+
+        if lazy:
+            for schema_name in schema_names:
+                database.lazy_schemas[schema_name] = segment
+            continue
+
+        for schema in segment.load(database=database):
+            database.register_schema(schema=schema)
+
+    return database
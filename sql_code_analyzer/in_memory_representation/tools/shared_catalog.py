@@ -0,0 +1,106 @@
+#######################################
+# File name: shared_catalog.py
+# Purpose: Read-only memory representation shared by worker processes
+#
+# Key features:
+#     SharedCatalog:
+#        Exports memory representation in the catalog file format (see serialization) into a file
+#        in shared memory (/dev/shm if available, otherwise temporary directory)
+#        Every export is a new version in a new file, the file of previous version is removed
+#        Memory representation kept in an SQLite catalog storage is not copied,
+#        its changes are committed and workers read the storage file itself
+#
+#     attach:
+#        Maps the exported file read-only, so all worker processes read one physical copy of the catalog
+#        from the page cache instead of unpickling their own copies
+#        Attached memory representation is lazy, lookups (get_table_by_name_or_error, ...) materialize
+#        only the schemas they use, segments of other schemas stay in the shared mapping
+#        Storage file is opened read-only, workers load only the tables they use (see SQLiteStorage)
+#
+#######################################
+
+from __future__ import annotations
+
+import mmap
+import os
+import tempfile
+from pathlib import Path
+
+from sql_code_analyzer.in_memory_representation.tools import serialization
+from sql_code_analyzer.in_memory_representation.tools.sqlite_storage import SQLiteStorage, is_sqlite_file, \
+    open_database
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+
+# Files in shared memory are never written to the disk
+SHARED_MEMORY_DIRECTORY = "/dev/shm"
+
+
+class SharedCatalog:
+    """
+    Versions of memory representation exported for worker processes
+    """
+
+    def __init__(self):
+        directory = SHARED_MEMORY_DIRECTORY if os.path.isdir(SHARED_MEMORY_DIRECTORY) else None
+        self._directory = tempfile.TemporaryDirectory(prefix="sql_code_analyzer_", dir=directory)
+
+        self.version = 0
+        self.path: Path | None = None
+
+    def export(self, database: Database) -> Path:
+        """
+        Exports memory representation as a new version
+        :param database: Memory representation
+        :return: Path of the exported file
+        """
+
+        if isinstance(database.storage, SQLiteStorage):
+            database.storage.flush()
+            self.version += 1
+            return database.storage.path
+
+        path = Path(self._directory.name) / f"catalog_{self.version + 1}.bin"
+        with open(path, "wb") as f:
+            serialization.dump(database, f)
+
+        self.version += 1
+        previous_path, self.path = self.path, path
+
+        # Workers which still map the previous version keep their mapping,
+        # a file which can not be removed yet is removed with the directory
+        if previous_path is not None:
+            try:
+                previous_path.unlink()
+            except OSError:
+                pass
+
+        return path
+
+    def close(self) -> None:
+        """
+        Removes all exported files, worker processes must be terminated before
+        :return: None
+        """
+
+        self._directory.cleanup()
+        self.path = None
+
+
+def attach(path: Path) -> Database:
+    """
+    Maps exported memory representation read-only
+    :param path: Path of the exported file
+    :return: Lazy memory representation
+    """
+
+    if is_sqlite_file(path=path):
+        return open_database(path=path, read_only=True)
+
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Segments of not yet materialized schemas keep the mapping alive
+    return serialization.loads(data=mapping, lazy=True)
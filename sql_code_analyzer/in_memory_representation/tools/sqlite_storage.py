@@ -0,0 +1,434 @@
+#######################################
+# File name: sqlite_storage.py
+# Purpose: Catalog storage which keeps memory representation in an SQLite file
+#
+# Key features:
+#     SQLiteStorage:
+#        Every table is one row of the file, encoded like a record of the journal (see journal),
+#        tables and columns are referenced by their names, so a table can be loaded alone
+#        Indexed tables of foreign keys and index owners find the stored tables which have to be loaded
+#        before a table is deleted or the owners of an index are looked up
+#        Only recently used tables are kept in memory, least recently used tables are written back
+#        if they were changed and released between statements
+#        A table is released only if no other loaded table references it,
+#        so foreign keys of loaded tables always reference loaded tables and columns
+#        Changes are written in one transaction which is committed by flush and close
+#
+#     open_database:
+#        Opens the file (a new one is created) and returns memory representation backed by it
+#
+#######################################
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+from sql_code_analyzer.in_memory_representation.exceptions import CatalogFormatError
+from sql_code_analyzer.in_memory_representation.struct.catalog_storage import CatalogStorage
+from sql_code_analyzer.in_memory_representation.struct.column import Column
+from sql_code_analyzer.in_memory_representation.struct.constrain import ForeignKey
+from sql_code_analyzer.in_memory_representation.struct.database import Database
+from sql_code_analyzer.in_memory_representation.struct.schema import Schema
+from sql_code_analyzer.in_memory_representation.struct.table import Table
+from sql_code_analyzer.in_memory_representation.tools.interning import intern_name
+from sql_code_analyzer.in_memory_representation.tools.journal import TableEncoder, TableReplayer
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Dict
+
+FORMAT_VERSION = 1
+
+# Count of tables kept in memory, tables referenced by other loaded tables are kept above it
+DEFAULT_CACHE_SIZE = 1000
+
+# The first bytes of every SQLite file
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schemas (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS tables (
+    schema TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (schema, name)
+);
+CREATE TABLE IF NOT EXISTS foreign_keys (
+    schema TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ref_schema TEXT NOT NULL,
+    ref_name TEXT NOT NULL,
+    PRIMARY KEY (schema, name, ref_schema, ref_name)
+);
+CREATE INDEX IF NOT EXISTS foreign_keys_ref ON foreign_keys (ref_schema, ref_name);
+CREATE TABLE IF NOT EXISTS indexes (
+    schema TEXT NOT NULL,
+    index_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (schema, index_name, name)
+);
+CREATE INDEX IF NOT EXISTS indexes_table ON indexes (schema, name);
+"""
+
+
+def is_sqlite_file(path: Path) -> bool:
+    """
+    Verify if the file is an SQLite file
+    :param path: Path of the file
+    :return: True/False
+    """
+
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+class _StorageReplayer(TableReplayer):
+    """
+    Loads tables referenced by the loaded table from the storage
+    """
+
+    def get_table(self, schema_name: str, table_name: str) -> Table:
+        self.database.load_table(schema_name=schema_name, table_name=table_name)
+        return super().get_table(schema_name=schema_name, table_name=table_name)
+
+
+class SQLiteStorage(CatalogStorage):
+    """
+    Keeps memory representation in an SQLite file, only recently used tables are in memory
+    """
+
+    def __init__(self, path: Path, cache_size: int = DEFAULT_CACHE_SIZE, read_only: bool = False):
+        """
+        :param path: Path of the file
+        :param cache_size: Count of tables kept in memory
+        :param read_only: Changes are not written, e.g. in worker processes
+        """
+
+        self.path = Path(path)
+        self.cache_size = cache_size
+        self.read_only = read_only
+        self.database: Database | None = None
+
+        if read_only:
+            self.connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            self.connection = sqlite3.connect(self.path)
+
+            # Readers in worker processes do not block writing of this process
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+
+        # Schemas and loaded tables as they are in the file
+        self.schemas: Dict[str, Schema] = {}
+        self.tables: Dict[str, Dict[str, Table]] = {}
+
+        # Loaded tables from the least recently used one
+        self.recent: Dict[Table, None] = {}
+
+        # Tables changed since they were written, database and schemas changed since the last sync
+        self.dirty: Dict[Table, None] = {}
+        self.changed_schemas: Dict[Schema, None] = {}
+        self.database_changed = False
+
+    ##################################################
+    #                  PRIVATE METHODS
+    ##################################################
+
+    def _is_live(self, table: Table) -> bool:
+        schema = table.schema
+        return self.database.schemas.get(schema.name) is schema and schema.tables.get(table.name) is table
+
+    def _forget(self, table: Table) -> None:
+        self.recent.pop(table, None)
+        self.dirty.pop(table, None)
+
+    def _delete_rows(self, schema_name: str, table_name: str) -> None:
+        for name in ("tables", "foreign_keys", "indexes"):
+            self.connection.execute(f"DELETE FROM {name} WHERE schema = ? AND name = ?", (schema_name, table_name))
+
+    def _drop_schema(self, schema_name: str) -> None:
+        for table in self.tables.pop(schema_name).values():
+            self._forget(table=table)
+        del self.schemas[schema_name]
+
+        for name in ("tables", "foreign_keys", "indexes"):
+            self.connection.execute(f"DELETE FROM {name} WHERE schema = ?", (schema_name,))
+        self.connection.execute("DELETE FROM schemas WHERE name = ?", (schema_name,))
+
+    def _sync(self) -> None:
+        """
+        Applies dropped and created schemas and tables to the file,
+        created tables are written later with other changed tables
+        """
+
+        if self.database_changed:
+            self.database_changed = False
+            schemas = self.database.schemas
+
+            for name, schema in list(self.schemas.items()):
+                if schemas.get(name) is not schema:
+                    self._drop_schema(schema_name=name)
+
+            for name, schema in schemas.items():
+                if name not in self.schemas:
+                    self.connection.execute("INSERT INTO schemas (name) VALUES (?)", (name,))
+                    self.schemas[name] = schema
+                    self.tables[name] = {}
+                    self.changed_schemas[schema] = None
+
+        for schema in self.changed_schemas:
+            if self.schemas.get(schema.name) is not schema:
+                continue
+
+            loaded = self.tables[schema.name]
+            for name, table in list(loaded.items()):
+                if schema.tables.get(name) is not table:
+                    del loaded[name]
+                    self._forget(table=table)
+                    self._delete_rows(schema_name=schema.name, table_name=name)
+
+            for name, table in schema.tables.items():
+                if loaded.get(name) is not table:
+                    loaded[name] = table
+                    self.recent[table] = None
+                    self.dirty[table] = None
+
+        self.changed_schemas.clear()
+
+    def _write(self, table: Table) -> None:
+        """
+        Writes the table with rows of its foreign keys and indexes
+        """
+
+        encoder = TableEncoder()
+        record = [encoder.encode_table(table=table), encoder.encode_table_constrains(table=table)]
+        data = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+
+        key = (table.schema.name, table.name)
+        self.connection.execute("INSERT INTO tables (schema, name, data) VALUES (?, ?, ?) "
+                                "ON CONFLICT (schema, name) DO UPDATE SET data = excluded.data", key + (data,))
+
+        self.connection.execute("DELETE FROM foreign_keys WHERE schema = ? AND name = ?", key)
+        self.connection.executemany("INSERT OR IGNORE INTO foreign_keys VALUES (?, ?, ?, ?)",
+                                    [key + (constrain.table_ref.schema.name, constrain.table_ref.name)
+                                     for constrain in table.constrains.get((table, table), ())
+                                     if isinstance(constrain, ForeignKey) and constrain.table_ref is not table])
+
+        self.connection.execute("DELETE FROM indexes WHERE schema = ? AND name = ?", key)
+        self.connection.executemany("INSERT INTO indexes (schema, index_name, name) VALUES (?, ?, ?)",
+                                    [(table.schema.name, index_name, table.name) for index_name in table.indexes])
+
+    def _write_back(self) -> None:
+        for table in self.dirty:
+            if self._is_live(table=table):
+                self._write(table=table)
+        self.dirty.clear()
+
+    def _load(self, schema: Schema, data: str) -> None:
+        try:
+            table_record, constrains_record = json.loads(data)
+
+            replayer = _StorageReplayer(database=self.database)
+            replayer.update_table(*table_record)
+
+            # Tables loaded while foreign keys are decoded can reference this table
+            table = schema.tables[table_record[1]]
+            self.tables[schema.name][table.name] = table
+            self.recent[table] = None
+
+            replayer.update_table_constrains(*constrains_record)
+
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise CatalogFormatError(f"The catalog storage contains an invalid table: {e}") from e
+
+        self.database.register_table(table=table)
+
+    def _release(self, table: Table) -> None:
+        """
+        Writes back the table if it was changed and removes it from memory,
+        its foreign keys are removed from the referenced tables which stay loaded
+        """
+
+        if table in self.dirty:
+            self._write(table=table)
+            del self.dirty[table]
+
+        TableReplayer.remove_emptied(emptied=TableReplayer.remove_own_foreign_keys(table=table))
+        self.database.cancel_table_registration(table=table)
+
+        del table.schema.tables[table.name]
+        del self.tables[table.schema.name][table.name]
+        del self.recent[table]
+
+    ##################################################
+    #                  PUBLIC METHODS
+    ##################################################
+
+    def notify_change(self, changed_object) -> None:
+        if self.read_only:
+            return
+
+        if isinstance(changed_object, Table):
+            self.dirty[changed_object] = None
+        elif isinstance(changed_object, Column):
+            self.dirty[changed_object.table] = None
+        elif isinstance(changed_object, Schema):
+            self.changed_schemas[changed_object] = None
+        else:
+            self.database_changed = True
+
+    def load_table(self, schema_name: str, table_name: str) -> None:
+        schema = self.database.schemas.get(schema_name)
+        if schema is None:
+            return
+
+        table = schema.tables.get(table_name)
+        if table is not None:
+            # The table becomes the most recently used one
+            if table in self.recent:
+                del self.recent[table]
+                self.recent[table] = None
+            return
+
+        # A dropped table must not be loaded again
+        self._sync()
+
+        row = self.connection.execute("SELECT data FROM tables WHERE schema = ? AND name = ?",
+                                      (schema_name, table_name)).fetchone()
+        if row is not None:
+            self._load(schema=schema, data=row[0])
+
+    def load_schema_tables(self, schema_name: str) -> None:
+        self._sync()
+
+        if schema_name not in self.database.schemas:
+            return
+
+        names = self.connection.execute("SELECT name FROM tables WHERE schema = ? ORDER BY rowid",
+                                        (schema_name,)).fetchall()
+        for name, in names:
+            self.load_table(schema_name=schema_name, table_name=name)
+
+    def load_referencing_tables(self, table: Table) -> None:
+        self._sync()
+
+        tables = self.connection.execute("SELECT schema, name FROM foreign_keys WHERE ref_schema = ? AND ref_name = ?",
+                                         (table.schema.name, table.name)).fetchall()
+        for schema_name, table_name in tables:
+            self.load_table(schema_name=schema_name, table_name=table_name)
+
+    def load_index_owners(self, schema_name: str, index_name: str) -> None:
+        self._sync()
+
+        tables = self.connection.execute("SELECT name FROM indexes WHERE schema = ? AND index_name = ?",
+                                         (schema_name, index_name)).fetchall()
+        for table_name, in tables:
+            self.load_table(schema_name=schema_name, table_name=table_name)
+
+    def load_all(self) -> None:
+        self._sync()
+
+        for schema_name in list(self.schemas):
+            self.load_schema_tables(schema_name=schema_name)
+
+    def release_tables(self) -> None:
+        # Snapshots capture loaded objects, bulk loading does not maintain indexes of released tables
+        if self.database.snapshots or self.database.bulk_loading:
+            return
+
+        self._sync()
+        if len(self.recent) <= self.cache_size:
+            return
+
+        dependencies = self.database.dependencies
+        for table in list(self.recent):
+            if len(self.recent) <= self.cache_size:
+                break
+
+            if not dependencies.is_referenced(table=table):
+                self._release(table=table)
+
+    def get_fingerprint(self) -> bytes:
+        self.flush()
+
+        hasher = hashlib.sha256()
+        hasher.update(f"{self.database.name}\0{self.database.default_schema}".encode("utf-8"))
+        for name, in self.connection.execute("SELECT name FROM schemas ORDER BY name"):
+            hasher.update(f"\0s{name}".encode("utf-8"))
+        for data, in self.connection.execute("SELECT data FROM tables ORDER BY schema, name"):
+            hasher.update(b"\0t" + data.encode("utf-8"))
+
+        return hasher.digest()
+
+    def flush(self) -> None:
+        if self.read_only:
+            return
+
+        self._sync()
+        self._write_back()
+
+        self.connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                    [("format_version", str(FORMAT_VERSION)),
+                                     ("name", self.database.name),
+                                     ("default_schema", self.database.default_schema)])
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+
+def open_database(path: Path, cache_size: int = DEFAULT_CACHE_SIZE, read_only: bool = False) -> Database:
+    """
+    Opens memory representation kept in the SQLite file, a new file contains an empty database
+    :param path: Path of the file
+    :param cache_size: Count of tables kept in memory
+    :param read_only: Changes are not written, e.g. in worker processes
+    :return: Memory representation backed by the file
+    """
+
+    try:
+        storage = SQLiteStorage(path=path, cache_size=cache_size, read_only=read_only)
+        meta = dict(storage.connection.execute("SELECT key, value FROM meta").fetchall())
+        schema_names = [name for name, in storage.connection.execute("SELECT name FROM schemas ORDER BY rowid")]
+
+    except sqlite3.Error as e:
+        raise CatalogFormatError(f"The catalog storage can not be opened: {e}") from e
+
+    if meta and meta.get("format_version") != str(FORMAT_VERSION):
+        storage.connection.close()
+        raise CatalogFormatError(f"Unsupported version {meta.get('format_version')} of catalog storage.")
+
+    database = Database(meta.get("name", "MemoryDB"))
+    database.default_schema = meta.get("default_schema", database.default_schema)
+    database.storage = storage
+    storage.database = database
+
+    # Schemas are always in memory, their tables are loaded on first access
+    for schema_name in schema_names:
+        schema = Schema.__new__(Schema)
+        schema.name = intern_name(schema_name)
+        schema.database = database
+        schema.tables = {}
+        database.schemas[schema.name] = schema
+        database.index_registration(key=schema.name, reg_object=schema)
+
+        storage.schemas[schema.name] = schema
+        storage.tables[schema.name] = {}
+
+    if not meta:
+        database.set_default_scheme()
+
+    return database
@@ -0,0 +1,115 @@
+#######################################
+# File name: structural_hash.py
+# Purpose: Structural hashes of objects of memory representation
+#
+# Key features:
+#     Each column, table, schema and database caches its structural hash (Merkle-style),
+#     the hash of a table is computed from hashes of its columns, the hash of a schema from hashes of its tables etc.
+#     A change of object (see notify_change of database) drops the cached hash of the object
+#     and of all objects above it, the next read computes only the dropped hashes
+#     Equal structures have equal hashes regardless of the order in which tables and constraints were created,
+#     references to tables and columns are hashed by their names, so objects of two databases can be compared
+#
+#######################################
+
+from __future__ import annotations
+
+import hashlib
+
+from sql_code_analyzer.in_memory_representation.struct.constrain import Constrain
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Dict
+    from sql_code_analyzer.in_memory_representation.struct.datatype import Datatype
+
+# Size of hash in bytes
+DIGEST_SIZE = 16
+
+
+def _get_slots(kind) -> tuple:
+    """
+    Return names of all slots of the class including the inherited ones
+    """
+
+    slots = []
+    for klass in reversed(kind.__mro__):
+        slots.extend(getattr(klass, "__slots__", ()))
+    return tuple(slots)
+
+
+# Constraint class -> names of its slots
+_CONSTRAIN_SLOTS = {}
+
+# Shared datatype -> its plain value, datatypes are shared and kept for the whole run (see interning)
+_datatype_values: Dict[Datatype, str] = {}
+
+
+def get_digest(*parts) -> bytes:
+    """
+    Return hash of the parts
+    :param parts: Plain values, e.g. names and hashes of contained objects
+    :return: The hash
+    """
+
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+def get_structural_value(value):
+    """
+    Converts a value of memory representation to a plain value,
+    references to tables and columns are replaced by their names
+    :param value: Plain value, table, column, constraint or their list
+    :return: The plain value
+    """
+
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+
+    if isinstance(value, (list, tuple)):
+        return tuple(get_structural_value(item) for item in value)
+
+    if isinstance(value, Constrain):
+        kind = type(value)
+        slots = _CONSTRAIN_SLOTS.get(kind)
+        if slots is None:
+            slots = _CONSTRAIN_SLOTS[kind] = _get_slots(kind)
+        return (kind.__name__,) + tuple(get_structural_value(getattr(value, slot, None)) for slot in slots)
+
+    kind = type(value).__name__
+    if kind == "Column":
+        return "c", value.table.schema.name, value.table.name, value.name
+
+    if kind == "Table":
+        return "t", value.schema.name, value.name
+
+    return repr(value)
+
+
+def get_datatype_value(datatype: Datatype | None) -> str | None:
+    """
+    Return plain value of the datatype
+    :param datatype: The datatype or None
+    :return: The plain value
+    """
+
+    if datatype is None:
+        return None
+
+    value = _datatype_values.get(datatype)
+    if value is None:
+        value = _datatype_values[datatype] = repr(datatype.get_key())
+    return value
+
+
+def get_constrains_value(constrains) -> tuple:
+    """
+    Return plain value of the constraints, their order does not matter
+    :param constrains: Iterable of constraints
+    :return: The plain value
+    """
+
+    if not constrains:
+        return ()
+
+    return tuple(sorted(repr(get_structural_value(constrain)) for constrain in constrains))
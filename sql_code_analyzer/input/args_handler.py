@@ -5,7 +5,9 @@ from pathlib import Path
 from sys import stdin
 import re
 
+from sql_code_analyzer.in_memory_representation.tools.sqlite_storage import DEFAULT_CACHE_SIZE
 from sql_code_analyzer.input.database_server.base import database_connection_handler
+from sql_code_analyzer.linter.lint_cache import DEFAULT_LINT_CACHE_SIZE
 from sql_code_analyzer.input.database_server.config import DBConfig
 from sql_code_analyzer.output import enums
 from sql_code_analyzer.output.reporter.base import OutputType, Reporter
@@ -15,6 +17,10 @@ from sql_code_analyzer.tools.path import get_program_root_path, get_absolute_pat
     verify_path_exists, create_path_if_not_exists, ProgramPathConfig
 
 
+# Count of statements between checkpoints if no interval is set
+DEFAULT_CHECKPOINT_INTERVAL = 10000
+
+
 class CArgs:
     """
     Instance from CArgs class contains all data comes as input of program.
@@ -37,15 +43,40 @@ class CArgs:
         self.tests: bool = False
         self.raw_sql: str = ""
         self.statements: list = []
+        self.jobs: int = 1
+        self.partition_by_schema: bool = False
 
         self.rules_path: str = ""
         self.include_folders: list = []
         self.exclude_folders: list = []
+        self.no_rule_packages: bool = False
 
         self.serialization_file: str | None = None
         self.serialization_path: str | None = None
         self.deserialization_file: str | None = None
         self.deserialization_path: str | None = None
+        self.serialization_journal: bool = False
+
+        self.schema_description_file: list | None = None
+        self.schema_description_path: str | None = None
+
+        self.catalog_storage: str | None = None
+        self.catalog_storage_path: str | None = None
+        self.catalog_storage_cache: int = DEFAULT_CACHE_SIZE
+
+        self.checkpoint_file: str | None = None
+        self.checkpoint_path: str | None = None
+        self.checkpoint_interval: int | None = None
+        self.checkpoint_time: float | None = None
+        self.resume: bool = False
+
+        self.lint_cache_file: str | None = None
+        self.lint_cache_path: str | None = None
+        self.lint_cache_size: int = DEFAULT_LINT_CACHE_SIZE
+
+        self.catalog_diff_file: str | None = None
+        self.catalog_diff_path: str | None = None
+        self.catalog_diff_output: str | None = None
 
         self.connection_file_create: bool = False
         self.connection_file_option: str | None = None
@@ -174,7 +205,39 @@ class CArgs:
             verify_path_exists(path=self.serialization_path)
             verify_path_access(path=self.serialization_path)
 
-        # If serialization file is set, the then program provides deserialization
+        if self.serialization_journal and self.serialization_file is None:
+            ProgramReporter.show_warning_message(
+                message="Parameter --serialization-journal needs parameter --serialization-file. "
+                        "The journal will not be used."
+            )
+
+        # If catalog storage is set, then memory representation is kept in the storage file
+        if self.catalog_storage is not None:
+
+            if self.deserialization_file is not None:
+                ProgramReporter.show_error_message(
+                    message="Parameters --catalog-storage and --deserialization-file are mutually exclusive.\n"
+                            "Memory representation is loaded from the catalog storage."
+                )
+
+            if self.catalog_storage_cache < 1:
+                ProgramReporter.show_error_message(
+                    message="Parameter --catalog-storage-cache must be a positive number."
+                )
+
+            # If a catalog storage path is None, then use the default one
+            # This also creates necessary folders!
+            if self.catalog_storage_path is None:
+                self.catalog_storage_path = create_path_if_not_exists(
+                    path=ProgramPathConfig.get_program_backup_path())
+
+            # Make sure the path is absolute
+            self.catalog_storage_path = get_absolute_path(path=self.catalog_storage_path)
+
+            # Verify path, the storage file is created if it does not exist
+            verify_path_exists(path=self.catalog_storage_path)
+            verify_path_access(path=self.catalog_storage_path)
+
         if self.deserialization_file is not None:
 
             # If a deserialization path is None, then use the default one
@@ -190,6 +253,117 @@ class CArgs:
             verify_path_exists(path=self.deserialization_path / self.deserialization_file)
             verify_path_access(path=self.deserialization_path / self.deserialization_file)
 
+        ################################
+        #      SCHEMA DESCRIPTION
+        ################################
+        # If schema description files are set, then memory representation is imported from them
+        if self.schema_description_file is not None:
+
+            # If a schema description path is None, then use the default one
+            # This also creates necessary folders!
+            if self.schema_description_path is None:
+                self.schema_description_path = create_path_if_not_exists(
+                    path=ProgramPathConfig.get_program_backup_path())
+
+            # Make sure the path is absolute
+            self.schema_description_path = get_absolute_path(path=self.schema_description_path)
+
+            # Verify paths
+            for schema_description_file in self.schema_description_file:
+                verify_path_exists(path=self.schema_description_path / schema_description_file)
+
+        ################################
+        #          CHECKPOINTS
+        ################################
+        if self.resume and self.checkpoint_file is None:
+            ProgramReporter.show_error_message(
+                message="Parameter --resume needs parameter --checkpoint-file."
+            )
+
+        # If checkpoint file is set, then the program periodically saves the state of the run
+        if self.checkpoint_file is not None:
+
+            if self.catalog_storage is not None:
+                ProgramReporter.show_error_message(
+                    message="Parameters --checkpoint-file and --catalog-storage are mutually exclusive.\n"
+                            "Memory representation in the catalog storage is changed after a checkpoint."
+                )
+
+            if self.checkpoint_interval is None and self.checkpoint_time is None:
+                self.checkpoint_interval = DEFAULT_CHECKPOINT_INTERVAL
+
+            if (self.checkpoint_interval is not None and self.checkpoint_interval < 1) or \
+                    (self.checkpoint_time is not None and self.checkpoint_time <= 0):
+                ProgramReporter.show_error_message(
+                    message="Parameters --checkpoint-interval and --checkpoint-time must be positive numbers."
+                )
+
+            # If a checkpoint path is None, then use the default one
+            # This also creates necessary folders!
+            if self.checkpoint_path is None:
+                self.checkpoint_path = create_path_if_not_exists(
+                    path=ProgramPathConfig.get_program_backup_path())
+
+            # Make sure the path is absolute
+            self.checkpoint_path = get_absolute_path(path=self.checkpoint_path)
+
+            # Verify path
+            verify_path_exists(path=self.checkpoint_path)
+            verify_path_access(path=self.checkpoint_path)
+
+        ################################
+        #          LINT CACHE
+        ################################
+        # If lint cache file is set, then results of unchanged statements are replayed from it
+        if self.lint_cache_file is not None:
+
+            if self.lint_cache_size < 1:
+                ProgramReporter.show_error_message(
+                    message="Parameter --lint-cache-size must be a positive number."
+                )
+
+            # If a lint cache path is None, then use the default one
+            # This also creates necessary folders!
+            if self.lint_cache_path is None:
+                self.lint_cache_path = create_path_if_not_exists(
+                    path=ProgramPathConfig.get_program_backup_path())
+
+            # Make sure the path is absolute
+            self.lint_cache_path = get_absolute_path(path=self.lint_cache_path)
+
+            # Verify path
+            verify_path_exists(path=self.lint_cache_path)
+            verify_path_access(path=self.lint_cache_path)
+
+        ################################
+        #         CATALOG DIFF
+        ################################
+        if self.catalog_diff_output is not None and self.catalog_diff_file is None:
+            ProgramReporter.show_warning_message(
+                message="Parameter --catalog-diff-output needs parameter --catalog-diff-file. "
+                        "The catalog diff will not be made."
+            )
+
+        # If catalog diff file is set, then memory representation after the run is compared with the catalog
+        if self.catalog_diff_file is not None:
+
+            # If a catalog diff path is None, then use the default one
+            # This also creates necessary folders!
+            if self.catalog_diff_path is None:
+                self.catalog_diff_path = create_path_if_not_exists(
+                    path=ProgramPathConfig.get_program_backup_path())
+
+            # Make sure the path is absolute
+            self.catalog_diff_path = get_absolute_path(path=self.catalog_diff_path)
+
+            # Verify path
+            verify_path_exists(path=self.catalog_diff_path / self.catalog_diff_file)
+            verify_path_access(path=self.catalog_diff_path / self.catalog_diff_file)
+
+            if self.catalog_diff_output is not None:
+                self.catalog_diff_output = create_path_if_not_exists(
+                    path=ProgramPathConfig.get_program_output_path()) / self.catalog_diff_output
+
         ################################
         #            RULES
         ################################
@@ -343,6 +517,23 @@ def parse_args() -> argparse:
                              "then the program expects it on standard input.",
                         default=None)
 
+    parser.add_argument("-j", "--jobs",
+                        type=int,
+                        metavar="",
+                        required=False,
+                        help="Number of processes used for linting. Statements which do not modify "
+                             "the memory representation (SELECT, ...) are linted in parallel "
+                             "between statements which modify it.",
+                        default=1)
+
+    parser.add_argument("-pbs", "--partition-by-schema",
+                        action='store_true',
+                        required=False,
+                        help="If set together with --jobs, statements are partitioned by the schema they reference "
+                             "and each partition is processed by its own process. Statements referencing more "
+                             "schemas are synchronization points.",
+                        default=False)
+
     ############################
     #         DATABASE
     ############################
@@ -391,6 +582,15 @@ def parse_args() -> argparse:
                         help="If specified, then the serialization path will be changed to the specified path.",
                         default=None)
 
+    parser.add_argument("-sj", "--serialization-journal",
+                        action='store_true',
+                        required=False,
+                        help="If set and the serialization file is the same as the deserialization file, "
+                             "changes of the memory representation are appended to a journal of the file "
+                             "after each statement instead of rewriting the whole file. "
+                             "The journal is merged into the file when it grows too large.",
+                        default=False)
+
     # Activates deserialization feature
     parser.add_argument("-df", "--deserialization-file",
                         required=False,
@@ -407,6 +607,156 @@ def parse_args() -> argparse:
                         help="If specified, then the deserialization path will be changed to the specified path.",
                         default=None)
 
+    ############################
+    #    SCHEMA DESCRIPTION
+    ############################
+    # Activates schema description import feature
+    parser.add_argument("-sdf", "--schema-description-file",
+                        nargs="+",
+                        required=False,
+                        type=str,
+                        help="If set, the memory representation is imported from files with the specified names "
+                             "on the selected/default path, which describe schemas like information_schema "
+                             "(JSON, YAML or CSV rows of columns, constraints and indexes). Objects are created "
+                             "directly, without SQL statements, before the input is processed.",
+                        default=None)
+
+    # The default value will be set later
+    # This avoids unnecessary directory creation for output.
+    parser.add_argument("-sdp", "--schema-description-path",
+                        required=False,
+                        type=str,
+                        help="If specified, then the schema description path will be changed to the specified path.",
+                        default=None)
+
+    ############################
+    #      CATALOG STORAGE
+    ############################
+    # Activates catalog storage feature
+    parser.add_argument("-cs", "--catalog-storage",
+                        required=False,
+                        type=str,
+                        help="If set, the memory representation is kept in an SQLite file with the specified name "
+                             "on the selected/default path and only recently used tables are kept in memory. "
+                             "The file is created if it does not exist, changes are saved to it at the end.",
+                        default=None)
+
+    # The default value will be set later
+    # This avoids unnecessary directory creation for output.
+    parser.add_argument("-csp", "--catalog-storage-path",
+                        required=False,
+                        type=str,
+                        help="If specified, then the catalog storage path will be changed to the specified path.",
+                        default=None)
+
+    parser.add_argument("-csc", "--catalog-storage-cache",
+                        type=int,
+                        metavar="",
+                        required=False,
+                        help="Count of tables of the catalog storage kept in memory. "
+                             "Tables referenced by foreign keys of other tables in memory are kept above it.",
+                        default=DEFAULT_CACHE_SIZE)
+
+    ############################
+    #        CHECKPOINTS
+    ############################
+    # Activates checkpoint feature
+    parser.add_argument("-ckf", "--checkpoint-file",
+                        required=False,
+                        type=str,
+                        help="If set, the program periodically saves the state of the run (memory representation, "
+                             "state of rules, reports and the position in the input) to a file with the specified "
+                             "name on the selected/default path. The file is removed when the run is finished.",
+                        default=None)
+
+    # The default value will be set later
+    # This avoids unnecessary directory creation for output.
+    parser.add_argument("-ckp", "--checkpoint-path",
+                        required=False,
+                        type=str,
+                        help="If specified, then the checkpoint path will be changed to the specified path.",
+                        default=None)
+
+    parser.add_argument("-cki", "--checkpoint-interval",
+                        type=int,
+                        metavar="",
+                        required=False,
+                        help="Count of statements between checkpoints. "
+                             f"If neither this nor --checkpoint-time is set, then {DEFAULT_CHECKPOINT_INTERVAL}.",
+                        default=None)
+
+    parser.add_argument("-ckt", "--checkpoint-time",
+                        type=float,
+                        metavar="",
+                        required=False,
+                        help="Seconds between checkpoints, can be combined with --checkpoint-interval.",
+                        default=None)
+
+    parser.add_argument("-r", "--resume",
+                        action='store_true',
+                        required=False,
+                        help="If set, the run continues from the checkpoint file of an interrupted run "
+                             "with the same input, statements processed before the checkpoint are skipped.",
+                        default=False)
+
+    ############################
+    #        LINT CACHE
+    ############################
+    # Activates lint cache feature
+    parser.add_argument("-lcf", "--lint-cache-file",
+                        required=False,
+                        type=str,
+                        help="If set, results of statements (reports and changes of memory representation) are saved "
+                             "to a file with the specified name on the selected/default path. A statement which is "
+                             "unchanged since a previous run, with the same memory representation before it, "
+                             "is replayed from the file instead of being parsed and linted.",
+                        default=None)
+
+    # The default value will be set later
+    # This avoids unnecessary directory creation for output.
+    parser.add_argument("-lcp", "--lint-cache-path",
+                        required=False,
+                        type=str,
+                        help="If specified, then the lint cache path will be changed to the specified path.",
+                        default=None)
+
+    parser.add_argument("-lcs", "--lint-cache-size",
+                        type=int,
+                        metavar="",
+                        required=False,
+                        help="Size of the lint cache in megabytes, least recently used results are removed above it. "
+                             f"Default is {DEFAULT_LINT_CACHE_SIZE}.",
+                        default=DEFAULT_LINT_CACHE_SIZE)
+
+    ############################
+    #       CATALOG DIFF
+    ############################
+    # Activates catalog diff feature
+    parser.add_argument("-cdf", "--catalog-diff-file",
+                        required=False,
+                        type=str,
+                        help="If set, the memory representation after the run is compared with the catalog "
+                             "in a file with the specified name on the selected/default path, e.g. a production "
+                             "snapshot made by --serialization-file or a catalog storage. Changes of schemas, "
+                             "tables, columns, primary keys, constraints and indexes are written as JSON Lines.",
+                        default=None)
+
+    # The default value will be set later
+    # This avoids unnecessary directory creation for output.
+    parser.add_argument("-cdp", "--catalog-diff-path",
+                        required=False,
+                        type=str,
+                        help="If specified, then the catalog diff path will be changed to the specified path.",
+                        default=None)
+
+    parser.add_argument("-cdo", "--catalog-diff-output",
+                        type=str,
+                        metavar="",
+                        required=False,
+                        help="If set, expects path where program will store the changes of the catalog diff, "
+                             "otherwise they are written to standard output.",
+                        default=None)
+
     ############################
     #           RULES
     ############################
@@ -437,6 +787,14 @@ def parse_args() -> argparse:
                              "Accepted format: -ef folder1 folder2 folderN",
                         default=[])
 
+    parser.add_argument("-nrp", "--no-rule-packages",
+                        action='store_true',
+                        required=False,
+                        help="If set, rules from installed rule packages (registered under the "
+                             "\"sql_code_analyzer.rules\" entry point group) are not loaded. "
+                             "Parameters --include-folders and --exclude-folders are applied to rule packages too.",
+                        default=False)
+
     ############################
     #          REPORT
     ############################
@@ -0,0 +1,177 @@
+#######################################
+# File name: checkpoint.py
+# Purpose: Checkpoints of a lint run, an interrupted run can be resumed from the last checkpoint
+#
+# Key features:
+#     Checkpoint:
+#        State of the run after a statement: index of the next statement, checksum of input statements,
+#        memory representation in the catalog file format (see serialization), state of persistent rules,
+#        reports detached from abstract syntax tree and the parse error flag
+#
+#     Checkpointer:
+#        Decides when a checkpoint is due, every N statements and/or every N seconds
+#        The checkpoint file is replaced at once, so a crash while writing keeps the previous checkpoint
+#
+#######################################
+
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import time
+import zlib
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pathlib import Path
+
+MAGIC = b"SQLCKP"
+FORMAT_VERSION = 1
+
+# Magic bytes, format version
+HEADER = struct.Struct("<6sH")
+
+
+class CheckpointError(Exception):
+    """
+    The file is not a checkpoint of this program
+    """
+
+
+def get_input_checksum(statements: list) -> int:
+    """
+    Return checksum of input statements, a checkpoint can be resumed only with the same input
+    :param statements: List of (statement, position)
+    :return: CRC32 of statements
+    """
+
+    checksum = 0
+    for statement, _ in statements:
+        checksum = zlib.crc32(statement.encode("utf-8"), checksum)
+    return checksum
+
+
+def get_rule_key(rule) -> str:
+    """
+    Return the key of persistent rule in checkpoint
+    :param rule: Instance of rule
+    :return: Module and class name of the rule
+    """
+
+    return f"{type(rule).__module__}.{type(rule).__qualname__}"
+
+
+class Checkpoint:
+    """
+    State of a lint run after the statements before next_statement were processed
+    """
+
+    def __init__(self, next_statement: int, input_checksum: int, catalog: bytes, rules: dict, reports: list,
+                 parse_error_occurred: bool):
+        """
+        :param next_statement: Index of the first statement which was not processed yet
+        :param input_checksum: Checksum of input statements
+        :param catalog: Memory representation in the catalog file format
+        :param rules: Key of persistent rule -> its state
+        :param reports: Reports detached from abstract syntax tree
+        :param parse_error_occurred: A statement failed to parse
+        """
+
+        self.next_statement = next_statement
+        self.input_checksum = input_checksum
+        self.catalog = catalog
+        self.rules = rules
+        self.reports = reports
+        self.parse_error_occurred = parse_error_occurred
+
+
+class Checkpointer:
+    """
+    Writes checkpoints of a lint run
+    """
+
+    def __init__(self, path: Path, interval: int | None, interval_time: float | None):
+        """
+        :param path: Path of the checkpoint file
+        :param interval: Count of statements between checkpoints, None if not used
+        :param interval_time: Seconds between checkpoints, None if not used
+        """
+
+        self.path = path
+        self.interval = interval
+        self.interval_time = interval_time
+
+        self.last_statement = 0
+        self.last_time = time.monotonic()
+
+    def is_due(self, statement: int) -> bool:
+        """
+        Verify if a checkpoint should be written before the statement
+        :param statement: Index of the statement
+        :return: True/False
+        """
+
+        if statement == self.last_statement:
+            return False
+
+        if self.interval is not None and statement - self.last_statement >= self.interval:
+            return True
+
+        return self.interval_time is not None and time.monotonic() - self.last_time >= self.interval_time
+
+    def write(self, checkpoint: Checkpoint) -> None:
+        """
+        Replaces the checkpoint file by the checkpoint
+        If writing fails, the next checkpoint is due after the whole interval again
+        :param checkpoint: The checkpoint
+        :return: None
+        """
+
+        try:
+            temporary_path = self.path.with_name(self.path.name + ".tmp")
+            with open(temporary_path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION))
+                pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_path, self.path)
+
+        finally:
+            self.last_statement = checkpoint.next_statement
+            self.last_time = time.monotonic()
+
+    def remove(self) -> None:
+        """
+        Removes the checkpoint file, e.g. when the run is finished
+        :return: None
+        """
+
+        self.path.unlink(missing_ok=True)
+
+
+def load_checkpoint(path: Path) -> Checkpoint:
+    """
+    Reads the checkpoint file
+    :param path: Path of the checkpoint file
+    :return: The checkpoint
+    """
+
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+            raise CheckpointError("The file is not a checkpoint.")
+
+        version = HEADER.unpack(header)[1]
+        if version != FORMAT_VERSION:
+            raise CheckpointError(f"Unsupported checkpoint version {version}.")
+
+        try:
+            checkpoint = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            raise CheckpointError(f"The checkpoint is damaged: {e}") from e
+
+    if not isinstance(checkpoint, Checkpoint):
+        raise CheckpointError("The file is not a checkpoint.")
+
+    return checkpoint
@@ -0,0 +1,319 @@
+#######################################
+# File name: lint_cache.py
+# Purpose: Persistent cache of lint results of statements, unchanged statements are replayed instead of linted
+#
+# Key features:
+#     LintCache:
+#        SQLite file with one entry per statement, the key is a hash of:
+#           fingerprint of the program and rules, dialect, fingerprint of memory representation before the statement
+#           and the statement with line numbers relative to its first line
+#        Fingerprint of memory representation is chained: it starts with a fingerprint of the initial
+#        memory representation and after each modifying statement it becomes the key of that statement,
+#        so two runs have equal fingerprints only after the same modifying statements applied to the same start
+#        Statements linted by persistent rules advance the fingerprint as well, with their position,
+#        because state of persistent rules contains positions of statements
+#        Entry contains reports and program messages of the statement, the change of memory representation
+#        (see get_changes) and state of persistent rules after the statement,
+#        reports keep code locations relative to the statement, so a statement which was only moved is found too
+#        Size of entries is bounded, least recently used entries are evicted when the cache is closed
+#        Hits and misses of the run are counted
+#
+#######################################
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import pickle
+import re
+import sqlite3
+from pathlib import Path
+
+from sql_code_analyzer.adapter.freature_class.detached_node import DetachedNode
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Iterable, List
+
+FORMAT_VERSION = 1
+
+# Size of entries in megabytes
+DEFAULT_LINT_CACHE_SIZE = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    modifies INTEGER NOT NULL,
+    reports BLOB NOT NULL,
+    messages TEXT NOT NULL,
+    changes TEXT,
+    rules BLOB,
+    position INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+# Line number which is appended to each line of statement (see args_handler)
+LINE_NUMBER = re.compile(r"-- (\d+)$", re.MULTILINE)
+
+
+class LintCacheError(Exception):
+    """
+    The file is not a lint cache of this program
+    """
+
+
+def get_fingerprint(paths: Iterable[Path], *values: str) -> bytes:
+    """
+    Return hash of the files and values, e.g. of source files of the program and rules
+    :param paths: Paths of files, their order does not matter
+    :param values: Other values which change results of lint
+    :return: The hash
+    """
+
+    hasher = hashlib.sha256()
+    for value in values:
+        hasher.update(f"{value}\0".encode("utf-8"))
+
+    # Only contents matter, e.g. a copy of catalog file has the same fingerprint
+    for path in sorted({Path(path).resolve() for path in paths}):
+        data = path.read_bytes()
+        hasher.update(f"{len(data)}\0".encode("utf-8"))
+        hasher.update(data)
+
+    return hasher.digest()
+
+
+def move_report(report, offset: int):
+    """
+    Return copy of the report with code locations moved by the offset and without statement,
+    the original report is not changed
+    :param report: Rule report or memory representation report (string)
+    :param offset: Count of lines
+    :return: The moved report
+    """
+
+    # Memory representation reports are strings
+    if isinstance(report, str):
+        return report
+
+    location = getattr(report.node, "code_location", None)
+    if location is not None:
+        location = [dict(token, line=token["line"] + offset) for token in location]
+
+    moved = copy.copy(report)
+    moved.node = DetachedNode(code_location=location)
+    moved.statement = None
+    return moved
+
+
+class CacheEntry:
+    """
+    Result of a statement stored in the lint cache
+    """
+
+    def __init__(self, modifies: bool, reports: list, messages: list, changes: list | None, rules: dict | None):
+        """
+        :param modifies: The statement modifies memory representation
+        :param reports: Reports of the statement, code locations are relative to the first line of statement
+        :param messages: Program messages shown while the statement was processed (see ProgramReporter)
+        :param changes: Change of memory representation made by the statement (see get_changes), None if no change
+        :param rules: Key of persistent rule (see get_rule_key) -> its state after the statement,
+                      None if no persistent rule lints the statement
+        """
+
+        self.modifies = modifies
+        self.reports = reports
+        self.messages = messages
+        self.changes = changes
+        self.rules = rules
+
+
+class LintCache:
+    """
+    Stores results of statements, so they do not have to be parsed and linted again in the next run
+    """
+
+    def __init__(self, path: Path, max_size: int, program_fingerprint: bytes, dialect: str | None,
+                 catalog_fingerprint: bytes):
+        """
+        Opens the cache, a new file is created if it does not exist
+        :param path: Path of the file
+        :param max_size: Size of entries in bytes, least recently used entries are evicted above it
+        :param program_fingerprint: Fingerprint of the program and rules (see get_fingerprint)
+        :param dialect: Dialect of statements
+        :param catalog_fingerprint: Fingerprint of memory representation before the first statement
+        """
+
+        self.path = Path(path)
+        self.max_size = max_size
+
+        try:
+            self.connection = sqlite3.connect(self.path)
+            self.connection.executescript(SCHEMA)
+            meta = dict(self.connection.execute("SELECT key, value FROM meta").fetchall())
+
+        except sqlite3.Error as e:
+            raise LintCacheError(f"The lint cache can not be opened: {e}") from e
+
+        if meta and meta.get("format_version") != str(FORMAT_VERSION):
+            self.connection.close()
+            raise LintCacheError(f"Unsupported version {meta.get('format_version')} of lint cache.")
+
+        # Order of use of entries, it continues from the previous run
+        self.clock = int(meta.get("clock", 0))
+
+        self.prefix = hashlib.sha256(program_fingerprint + f"\0{dialect or ''}".encode("utf-8")).digest()
+        self.catalog_fingerprint = catalog_fingerprint
+
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+
+    ##################################################
+    #                  PUBLIC METHODS
+    ##################################################
+
+    def get_key(self, statement: str, position: int) -> bytes:
+        """
+        Return key of the statement in memory representation of the current fingerprint
+        :param statement: Statement with line numbers
+        :param position: Line where the statement starts
+        :return: The key
+        """
+
+        relative = LINE_NUMBER.sub(lambda match: f"-- {int(match.group(1)) - position}", statement)
+        return hashlib.sha256(self.prefix + self.catalog_fingerprint + relative.encode("utf-8")).digest()
+
+    def advance(self, key: bytes, position: int | None = None) -> None:
+        """
+        The statement of the key modified memory representation or state of persistent rules
+        :param key: Key of the statement
+        :param position: Line where the statement starts if it is linted by a persistent rule
+        :return: None
+        """
+
+        if position is None:
+            self.catalog_fingerprint = key
+        else:
+            self.catalog_fingerprint = hashlib.sha256(key + f"\0{position}".encode("utf-8")).digest()
+
+    def get(self, key: bytes, position: int) -> CacheEntry | None:
+        """
+        Return the stored result of statement, the entry becomes the most recently used one
+        :param key: Key of the statement
+        :param position: Line where the statement starts
+        :return: The entry or None if the statement is not stored
+        """
+
+        row = self.connection.execute("SELECT modifies, reports, messages, changes, rules, position FROM entries "
+                                      "WHERE key = ?", (key,)).fetchone()
+
+        # State of persistent rules is valid only at the same position
+        if row is None or (row[4] is not None and row[5] != position):
+            self.misses += 1
+            return None
+
+        modifies, reports, messages, changes, rules, _ = row
+        try:
+            entry = CacheEntry(modifies=bool(modifies),
+                               reports=pickle.loads(reports),
+                               messages=json.loads(messages),
+                               changes=None if changes is None else json.loads(changes),
+                               rules=None if rules is None else pickle.loads(rules))
+
+        except (pickle.UnpicklingError, ValueError, EOFError, AttributeError, ImportError):
+            # Entry of another version of the program, it is replaced when the statement is stored
+            self.misses += 1
+            return None
+
+        self.clock += 1
+        self.connection.execute("UPDATE entries SET last_used = ? WHERE key = ?", (self.clock, key))
+        self.hits += 1
+        return entry
+
+    def put(self, key: bytes, position: int, modifies: bool, reports: List, messages: list, changes: list | None,
+            rules: dict | None = None) -> None:
+        """
+        Stores result of the statement
+        :param key: Key of the statement
+        :param position: Line where the statement starts
+        :param modifies: The statement modifies memory representation
+        :param reports: Reports of the statement
+        :param messages: Program messages shown while the statement was processed
+        :param changes: Change of memory representation made by the statement, None if no change
+        :param rules: Key of persistent rule -> its state after the statement, None if no persistent rule lints it
+        :return: None
+        """
+
+        reports = pickle.dumps([move_report(report=report, offset=-position) for report in reports],
+                               protocol=pickle.HIGHEST_PROTOCOL)
+        messages = json.dumps(messages, separators=(",", ":"), ensure_ascii=False)
+        if changes is not None:
+            changes = json.dumps(changes, separators=(",", ":"), ensure_ascii=False)
+        if rules is not None:
+            rules = pickle.dumps(rules, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.clock += 1
+        self.connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                (key, int(modifies), reports, messages, changes, rules, position,
+                                 len(key) + len(reports) + len(messages) + len(changes or "") + len(rules or b""),
+                                 self.clock))
+        self.stored += 1
+
+    def get_hit_rate(self) -> float:
+        """
+        Return part of looked up statements which were found in the cache
+        :return: Hit rate from 0 to 1
+        """
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_statistics(self) -> str:
+        """
+        Return statistics of the run
+        :return: Text of statistics
+        """
+
+        return (f"Hits: {self.hits}, misses: {self.misses}, hit rate: {self.get_hit_rate():.1%}\n"
+                f"Stored entries: {self.stored}, evicted entries: {self.evicted}")
+
+    def evict(self) -> None:
+        """
+        Removes least recently used entries until size of entries is not above the maximum
+        :return: None
+        """
+
+        size, = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        excess = size - self.max_size
+        if excess <= 0:
+            return
+
+        keys = []
+        for key, entry_size in self.connection.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            keys.append((key,))
+            excess -= entry_size
+            if excess <= 0:
+                break
+
+        self.connection.executemany("DELETE FROM entries WHERE key = ?", keys)
+        self.evicted += len(keys)
+
+    def close(self) -> None:
+        """
+        Evicts entries above the maximum size, saves the cache and closes it
+        :return: None
+        """
+
+        self.evict()
+        self.connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                    [("format_version", str(FORMAT_VERSION)),
+                                     ("clock", str(self.clock))])
+        self.connection.commit()
+        self.connection.close()
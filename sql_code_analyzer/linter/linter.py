@@ -1,8 +1,14 @@
 import glob
+import hashlib
 import importlib.util
 import inspect
+import io
 import os
 import pickle
+import sqlite3
+import sys
+from itertools import islice
+from pathlib import Path
 from queue import Queue
 from typing import Generator
 
@@ -11,6 +17,7 @@ from typing import Generator
 ###############################################
 import sqlglot
 from sqlglot import Tokenizer
+from sqlglot.tokens import TokenType
 from sql_code_analyzer.output.reporter.rule_reporter import RuleReporter
 from sql_code_analyzer.tools.path import get_program_root_path  
 from sqlglot import expressions as exp
@@ -21,9 +28,20 @@ from sqlglot import expressions as exp
 
 from sql_code_analyzer.adapter.adapt_ast import adapt_ast
 from sql_code_analyzer.checker.tools.rules_handler import CRules
+from sql_code_analyzer.in_memory_representation.exceptions import CatalogFormatError, SchemaDescriptionError
 from sql_code_analyzer.in_memory_representation.struct.database import Database
+from sql_code_analyzer.in_memory_representation.tools import serialization
+from sql_code_analyzer.in_memory_representation.tools.catalog_diff import diff_catalogs, load_catalog, write_changes
+from sql_code_analyzer.in_memory_representation.tools.journal import HEADER as JOURNAL_HEADER, CatalogJournal, \
+    LiveReplayer, get_catalog_id, get_changes, get_journal_path
+from sql_code_analyzer.in_memory_representation.tools.schema_import import import_schema_description, \
+    read_schema_description
+from sql_code_analyzer.in_memory_representation.tools.sqlite_storage import open_database
 from sql_code_analyzer.in_memory_representation.tools.ast_manipulation import get_next_node
 from sql_code_analyzer.input.args_handler import CArgs
+from sql_code_analyzer.linter.checkpoint import Checkpoint, Checkpointer, CheckpointError, get_input_checksum, \
+    get_rule_key, load_checkpoint
+from sql_code_analyzer.linter.lint_cache import LintCache, LintCacheError, get_fingerprint, move_report
 from sql_code_analyzer.output import enums
 from sql_code_analyzer.output.terminator.base import Terminator
 
@@ -56,17 +74,26 @@ class Linter:
         Serialization and deserialization of memory representation for future use
     """
 
-    def __init__(self):
+    # Minimal count of consecutive statements per worker process which are sent to worker processes
+    # when linting in parallel, smaller batches are linted here
+    parallel_min_batch_size = 32
 
-        self._modify_representation_functions = {}
-        self._parse_error_occurred = False
-        self.rule_reporter = RuleReporter()
-        self.statement = None
+    # Tokens of set operations at the top level of a query, the root of its abstract syntax tree is not SELECT
+    set_operation_tokens = {TokenType.UNION, TokenType.INTERSECT, TokenType.EXCEPT}
 
+    # The journal is merged into the serialization file when it is larger than this part of the file
+    journal_compaction_ratio = 0.5
+
+    def __init__(self):
+
+        self._init_state()
         self._init_program_argument_class()
         self._init_rules_class()
         self._init_memory_database_representation()
+        self._init_checkpoint()
+        self._init_journal()
         self._get_modify_representation_statements()
+        self._import_schema_description()
         self._apply_statements_from_database_server()
         self._sql_statements_processing()
 
@@ -75,8 +102,34 @@ class Linter:
         if self.args_data.serialization_file is not None:
             self._make_serialization()
 
+        if self.args_data.catalog_diff_file is not None:
+            self._make_catalog_diff()
+
+        self._close_catalog_storage()
         self._show_reports()
 
+    def _init_state(self) -> None:
+        """
+        Sets the state of linter before any statement is processed
+        Linters of worker processes (see parallel.py) are initialised the same way
+        :return: None
+        """
+
+        self._modify_representation_functions = {}
+        self._parse_error_occurred = False
+        self.rule_reporter = RuleReporter()
+        self.statement = None
+        self.ast = None
+        self.tokens = None
+        self.mem_rep = None
+        self.journal = None
+        self.checkpointer = None
+        self.lint_cache = None
+        self.parallel_linter = None
+
+        # Checkpoint of an interrupted run which is resumed
+        self._checkpoint = None
+
     def _init_program_argument_class(self) -> None:
         """
         Creates an object from CArgs class which encapsulate parsed program arguments data and save it to linter object
@@ -95,7 +148,8 @@ class Linter:
         # init rules class
         self.rules_args_data = CRules(path_to_rules_folder=self.args_data.rules_path,
                                       include_folders=self.args_data.include_folders,
-                                      exclude_folders=self.args_data.exclude_folders)
+                                      exclude_folders=self.args_data.exclude_folders,
+                                      use_rule_packages=not self.args_data.no_rule_packages)
 
     def _init_memory_database_representation(self) -> None:
         """
@@ -113,12 +167,19 @@ class Linter:
 
             try:
                 with open(path, 'rb') as f:
-                    self.mem_rep = pickle.load(f)
+                    self.mem_rep = serialization.load(f)
+
+                # Changes saved to the journal after the file was saved
+                CatalogJournal.replay(database=self.mem_rep, path=path)
 
             except FileNotFoundError:
                 ProgramReporter.show_error_message(
                     message=f"Deserialization failed, file not found!\nPath: {path}"
                 )
+            except CatalogFormatError as e:
+                ProgramReporter.show_error_message(
+                    message=f"Deserialization failed, {e}\nPath: {path}"
+                )
             except pickle.UnpicklingError:
                 ProgramReporter.show_error_message(
                     message=f"Deserialization failed, can not unpickle file!\nPath: {path}"
@@ -129,10 +190,325 @@ class Linter:
                     message=f"Deserialization failed!\nPath: {path}"
                 )
 
+        elif self.args_data.catalog_storage is not None:
+            # Memory representation is kept in the storage file, tables are loaded on first access
+            path = self.args_data.catalog_storage_path / self.args_data.catalog_storage
+
+            try:
+                self.mem_rep = open_database(path=path, cache_size=self.args_data.catalog_storage_cache)
+
+            except CatalogFormatError as e:
+                ProgramReporter.show_error_message(
+                    message=f"Catalog storage can not be opened, {e}\nPath: {path}"
+                )
+
         else:
             # initialize in memory representation
             self.mem_rep: Database = Database("MemoryDB").set_default_scheme()
 
+    def _init_checkpoint(self) -> None:
+        """
+        Creates checkpointer if the user wants to save checkpoints of the run.
+        If the run is resumed, memory representation and reports are restored from the checkpoint.
+        :return: None
+        """
+
+        if self.args_data.checkpoint_file is None:
+            return
+
+        path = self.args_data.checkpoint_path / self.args_data.checkpoint_file
+        self.checkpointer = Checkpointer(path=path,
+                                         interval=self.args_data.checkpoint_interval,
+                                         interval_time=self.args_data.checkpoint_time)
+
+        if not self.args_data.resume:
+            return
+
+        if not path.exists():
+            ProgramReporter.show_warning_message(
+                message=f"There is no checkpoint to resume, all statements will be processed.\nPath: {path}"
+            )
+            return
+
+        try:
+            checkpoint = load_checkpoint(path=path)
+
+            if checkpoint.input_checksum != get_input_checksum(statements=self.args_data.statements):
+                raise CheckpointError("The checkpoint belongs to another input.")
+
+            self.mem_rep = serialization.loads(data=checkpoint.catalog)
+
+        except (OSError, CheckpointError, CatalogFormatError) as e:
+            ProgramReporter.show_error_message(
+                message=f"The run can not be resumed, {e}\nPath: {path}"
+            )
+            return
+
+        self.rule_reporter.reports = checkpoint.reports
+        self._parse_error_occurred = checkpoint.parse_error_occurred
+        self.checkpointer.last_statement = checkpoint.next_statement
+        self._checkpoint = checkpoint
+
+    def _make_checkpoint(self, next_statement: int) -> None:
+        """
+        Saves the state of the run after all statements before the next statement were processed.
+        Reports are detached from abstract syntax tree, so they can be saved.
+        :param next_statement: Index of the first statement which was not processed yet
+        :return: None
+        """
+
+        reports = []
+        for statement, report in self.rule_reporter.reports:
+            # Memory representation reports are strings
+            if not isinstance(report, str):
+                report.detach()
+            reports.append((statement, report))
+
+        try:
+            buffer = io.BytesIO()
+            serialization.dump(self.mem_rep, buffer)
+
+            self.checkpointer.write(
+                checkpoint=Checkpoint(next_statement=next_statement,
+                                      input_checksum=get_input_checksum(statements=self.args_data.statements),
+                                      catalog=buffer.getvalue(),
+                                      rules={get_rule_key(rule=rule): rule.get_state()
+                                             for rule in self.rules_visitor.persistent_rules},
+                                      reports=reports,
+                                      parse_error_occurred=self._parse_error_occurred)
+            )
+
+        except (Exception,) as e:
+            ProgramReporter.show_warning_message(
+                message=f"The checkpoint can not be saved.\nReason: {e}"
+            )
+
+    def _init_journal(self) -> None:
+        """
+        Opens the journal of serialization file if the user wants to append changes to it.
+        The journal can be used only if memory representation was loaded from the same file,
+        otherwise the whole memory representation is saved at the end.
+        :return: None
+        """
+
+        if not self.args_data.serialization_journal or \
+                self.args_data.serialization_file is None or \
+                self.args_data.deserialization_file is None:
+            return
+
+        if self._checkpoint is not None:
+            ProgramReporter.show_warning_message(
+                message="The journal is not used when the run is resumed, "
+                        "the whole memory representation will be saved."
+            )
+            return
+
+        path = self.args_data.serialization_path / self.args_data.serialization_file
+        deserialization_path = self.args_data.deserialization_path / self.args_data.deserialization_file
+        if path.resolve() != deserialization_path.resolve() or get_catalog_id(path=path) is None:
+            return
+
+        try:
+            self.journal = CatalogJournal(database=self.mem_rep, path=path)
+
+        except (OSError, CatalogFormatError) as e:
+            ProgramReporter.show_warning_message(
+                message=f"The journal can not be opened, the whole memory representation will be saved.\n"
+                        f"Reason: {e}"
+            )
+
+    def _record_journal_changes(self) -> None:
+        """
+        Appends changes of memory representation made by the processed statements to the journal
+        :return: None
+        """
+
+        if self.journal is not None:
+            self.journal.record_changes()
+
+    def _close_catalog_storage(self) -> None:
+        """
+        Saves changes of memory representation to the catalog storage if it is used
+        :return: None
+        """
+
+        if self.mem_rep.storage is not None:
+            self.mem_rep.storage.close()
+
+    #########################
+    #       LINT CACHE
+    #########################
+
+    def _get_catalog_fingerprint(self) -> bytes:
+        """
+        Return fingerprint of memory representation before the first statement,
+        it is computed from the sources of memory representation, not from the memory representation itself
+        :return: The fingerprint
+        """
+
+        paths = []
+        values = [self.mem_rep.name, self.mem_rep.default_schema]
+
+        if self._checkpoint is not None:
+            values.append(hashlib.sha256(self._checkpoint.catalog).hexdigest())
+
+        elif self.mem_rep.storage is not None:
+            values.append(self.mem_rep.storage.get_fingerprint().hex())
+
+        elif self.args_data.deserialization_file is not None:
+            path = self.args_data.deserialization_path / self.args_data.deserialization_file
+            paths.append(path)
+
+            # Header of journal identifies the catalog file, only records change memory representation
+            journal_path = get_journal_path(path=path)
+            records = journal_path.read_bytes()[JOURNAL_HEADER.size:] if journal_path.exists() else b""
+            if records:
+                values.append(hashlib.sha256(records).hexdigest())
+
+        if self._checkpoint is None:
+            values += self.args_data.database_statements
+            paths += self._get_schema_description_paths()
+
+        return get_fingerprint(paths, *values)
+
+    def _init_lint_cache(self) -> None:
+        """
+        Opens the lint cache if the user wants to replay results of unchanged statements from it.
+        The cache is not used if it can not be opened, all statements are linted.
+        :return: None
+        """
+
+        if self.args_data.lint_cache_file is None:
+            return
+
+        path = self.args_data.lint_cache_path / self.args_data.lint_cache_file
+
+        # Results depend on the whole program, not only on the rules
+        # The program root is the directory of the started script, the package directory is found from this module
+        package_path = Path(__file__).resolve().parent.parent
+        paths = list(package_path.rglob("*.py"))
+        for rule in self.rules_visitor.persistent_rules + self.rules_visitor.normal_rules:
+            # Rule files are loaded as modules named by their path
+            module = type(rule).__module__
+            rule_path = getattr(sys.modules.get(module), "__file__", None) or module
+            if os.path.isfile(rule_path):
+                paths.append(rule_path)
+
+        program_fingerprint = get_fingerprint(paths, sqlglot.__version__)
+
+        try:
+            self.lint_cache = LintCache(path=path,
+                                        max_size=self.args_data.lint_cache_size * 1024 * 1024,
+                                        program_fingerprint=program_fingerprint,
+                                        dialect=self.args_data.dialect,
+                                        catalog_fingerprint=self._get_catalog_fingerprint())
+
+        except LintCacheError as e:
+            ProgramReporter.show_warning_message(
+                message=f"The lint cache can not be used, all statements will be linted.\nReason: {e}\nPath: {path}"
+            )
+
+    def _close_lint_cache(self) -> None:
+        """
+        Saves the lint cache and shows its statistics
+        :return: None
+        """
+
+        if self.lint_cache is None:
+            return
+
+        try:
+            self.lint_cache.close()
+
+        except sqlite3.Error as e:
+            ProgramReporter.show_warning_message(
+                message=f"The lint cache can not be saved.\nReason: {e}"
+            )
+
+        ProgramReporter.show_verbose_messages(message=self.lint_cache.get_statistics(),
+                                              origin="Lint cache")
+
+    def _replay_cache_entry(self, entry, position: int) -> None:
+        """
+        Replays result of the statement now being processed from the lint cache
+        instead of parsing and linting the statement.
+        :param entry: Entry of the statement
+        :param position: Line where the statement starts
+        :return: None
+        """
+
+        ProgramReporter.show_verbose_messages(message=self.statement,
+                                              origin="===========================================================\n"
+                                                     "Statement (lint cache)")
+
+        ProgramReporter.show_recorded_messages(messages=entry.messages)
+
+        statement = (self.statement, position)
+        for report in entry.reports:
+            report = move_report(report=report, offset=position)
+            if not isinstance(report, str):
+                report.set_statement(statement=statement)
+            self.rule_reporter.reports.append((statement, report))
+
+        if entry.rules is not None:
+            for rule in self.rules_visitor.persistent_rules:
+                state = entry.rules.get(get_rule_key(rule=rule))
+                if state is not None:
+                    rule.set_state(state=state)
+
+        if entry.changes is not None:
+            try:
+                LiveReplayer(database=self.mem_rep).apply(record=entry.changes)
+
+            except (CatalogFormatError, ValueError, KeyError, IndexError, TypeError) as e:
+                ProgramReporter.show_error_message(
+                    message=f"Change of memory representation from the lint cache can not be applied, {e}\n"
+                            "Please remove the lint cache file."
+                )
+
+            self._record_journal_changes()
+
+        self.mem_rep.release_tables()
+
+    def _store_cache_entry(self, cache_key: bytes, position: int, first_report: int, snapshot,
+                           messages: list) -> None:
+        """
+        Stores result of the statement now being processed to the lint cache
+        :param cache_key: Key of the statement
+        :param position: Line where the statement starts
+        :param first_report: Index of the first report of the statement
+        :param snapshot: Snapshot created before the statement modified memory representation, None if not modifying
+        :param messages: Program messages shown while the statement was processed
+        :return: None
+        """
+
+        changes = None
+        if snapshot is not None:
+            try:
+                changes = get_changes(database=self.mem_rep, snapshot=snapshot)
+            except CatalogFormatError:
+                return
+            finally:
+                snapshot.release()
+
+        reports = self.rule_reporter.reports[first_report:]
+
+        # Reports of another statement, e.g. of a persistent rule, can not be replayed
+        statement = (self.statement, position)
+        if any(report_statement != statement for report_statement, _ in reports):
+            return
+
+        # Persistent rules keep data between statements, their state is replayed with the statement
+        rules = self._get_statement_persistent_rules()
+
+        self.lint_cache.put(key=cache_key,
+                            position=position,
+                            modifies=snapshot is not None,
+                            reports=[report for _, report in reports],
+                            messages=messages,
+                            changes=changes,
+                            rules={get_rule_key(rule=rule): rule.get_state() for rule in rules} if rules else None)
+
     def _check_if_modifying_statement(self) -> bool:
         """
         Determines whether the command now being processed is suitable for changing the memory representation.
@@ -172,30 +548,81 @@ class Linter:
             self._parse_error_occurred = True
             return False
 
+    def _get_schema_description_paths(self) -> list:
+        """
+        Return paths of schema description files
+        :return: List of paths, empty if no schema description is imported
+        """
+
+        if self.args_data.schema_description_file is None:
+            return []
+
+        return [self.args_data.schema_description_path / file for file in self.args_data.schema_description_file]
+
+    def _import_schema_description(self) -> None:
+        """
+        Imports memory representation from schema description files
+        Objects are created directly without SQL statements, memory representation is bulk loaded
+
+        :return: None
+        """
+        # Memory representation of a resumed run already contains the imported objects
+        if self.args_data.schema_description_file is None or self._checkpoint is not None:
+            return
+
+        paths = self._get_schema_description_paths()
+
+        try:
+            tables = import_schema_description(database=self.mem_rep,
+                                               description=read_schema_description(paths=paths),
+                                               dialect=self.args_data.dialect)
+
+        except SchemaDescriptionError as e:
+            ProgramReporter.show_error_message(
+                message=f"Schema description import failed, {e}"
+            )
+            return
+
+        ProgramReporter.show_verbose_messages(message=f"Imported tables: {tables}",
+                                              origin="Schema description")
+
+        self._record_journal_changes()
+        self.mem_rep.release_tables()
+
     def _apply_statements_from_database_server(self) -> None:
         """
+        Applies DDL statements of database server to memory representation
+        Memory representation is bulk loaded, indexes are built once after all statements
 
         :return: None
         """
-        # iterate over database SQL statements
-        for self.statement in self.args_data.database_statements:
+        # Memory representation of a resumed run already contains statements of database server
+        if not self.args_data.database_statements or self._checkpoint is not None:
+            return
 
-            success = self._parse_statement()
+        with self.mem_rep.bulk_load():
+            # iterate over database SQL statements
+            for self.statement in self.args_data.database_statements:
 
-            if not success:
-                # Next statement
-                ProgramReporter.show_warning_message(
-                    message=f"An error occurred while processing an SQL statement from database.\n"
-                            "This statement will be skipped.\n"
-                            f"Statement: \n{self.statement}"
-                )
-                continue
+                success = self._parse_statement()
+
+                if not success:
+                    # Next statement
+                    ProgramReporter.show_warning_message(
+                        message=f"An error occurred while processing an SQL statement from database.\n"
+                                "This statement will be skipped.\n"
+                                f"Statement: \n{self.statement}"
+                    )
+                    continue
 
-            self.ast = adapt_ast(self.ast)
+                self.ast = adapt_ast(self.ast)
 
-            # provide changes based on SQL statement to memory representation
-            if self._check_if_modifying_statement():
-                self._modify_representation()
+                # provide changes based on SQL statement to memory representation
+                if self._check_if_modifying_statement():
+                    self._modify_representation()
+
+        self._record_journal_changes()
+        self.mem_rep.release_tables()
 
     def _sql_statements_processing(self) -> None:
         """
@@ -216,56 +643,390 @@ class Linter:
         self.rules_visitor: RulesVisitor = RulesVisitor(rules_args_data=self.rules_args_data,
                                                         mem_rep=self.mem_rep)
 
+        self._init_parallel_linter()
+        self._init_lint_cache()
+
         self._lint_event(event_type="start_lint")
 
+        start = 0
+        if self._checkpoint is not None:
+            start = self._checkpoint.next_statement
+            for rule in self.rules_visitor.persistent_rules:
+                state = self._checkpoint.rules.get(get_rule_key(rule=rule))
+                if state is not None:
+                    rule.set_state(state=state)
+
+        # Parsed statements which wait for parallel processing
+        # Format: (statement, position, ast, tokens, schema name of partition, key of lint cache)
+        parallel_batch = []
+
         # iterate over SQL statements
-        for self.statement, position in self.args_data.statements:
+        for index, (self.statement, position) in enumerate(islice(self.args_data.statements, start, None), start):
+
+            # All statements before a checkpoint are processed
+            if self.checkpointer is not None and self.checkpointer.is_due(statement=index):
+                self._process_parallel_batch(batch=parallel_batch)
+                parallel_batch = []
+                self._make_checkpoint(next_statement=index)
+
+            # Unchanged statement in unchanged memory representation is replayed from the lint cache
+            cache_key = None
+            if self.lint_cache is not None:
+                cache_key = self.lint_cache.get_key(statement=self.statement, position=position)
+                entry = self.lint_cache.get(key=cache_key, position=position)
+
+                if entry is not None:
+                    self._process_parallel_batch(batch=parallel_batch)
+                    parallel_batch = []
+                    self._replay_cache_entry(entry=entry, position=position)
+                    if entry.modifies or entry.rules is not None:
+                        self.lint_cache.advance(key=cache_key,
+                                                position=position if entry.rules is not None else None)
+                    continue
+
+            # Plain queries are recognized by their tokens, they are parsed only when they are linted
+            if self._check_if_parallel_query():
+                parallel_batch.append((self.statement, position, None, None, None, cache_key))
+                continue
 
             success = self._parse_statement()
 
             if not success:
                 # Next statement
-                lines = self.statement.split("\n")
-                result = []
-                for line in lines:
-                    if "--" in line:
-                        text, index = line.split("--")
-                        result.append((text, int(index)))
+                self._show_skipped_statement_warning()
+                continue
+
+            if cache_key is not None:
+                persistent = bool(self._get_statement_persistent_rules())
+                if persistent or self._check_if_modifying_statement():
+                    self.lint_cache.advance(key=cache_key, position=position if persistent else None)
+
+            # Statements between two modifying statements see the same memory representation
+            # so they can be linted in parallel
+            # When partitioned by schema, statements between two cross-schema statements
+            # are processed in parallel per schema
+            if self._check_if_parallel_statement():
+                parallel_batch.append((self.statement, position, self.ast, self.tokens,
+                                       self._get_statement_schema() if self.args_data.partition_by_schema else None,
+                                       cache_key))
+                continue
+
+            self._process_parallel_batch(batch=parallel_batch)
+            parallel_batch = []
+
+            self._process_statement(position=position, cache_key=cache_key)
+
+        self._process_parallel_batch(batch=parallel_batch)
+
+        if self.parallel_linter is not None:
+            self.parallel_linter.shutdown()
 
+        self._lint_event(event_type="end_lint")
+        self._close_lint_cache()
+
+        # The run is finished, there is nothing to resume
+        if self.checkpointer is not None:
+            self.checkpointer.remove()
+
+    def _show_skipped_statement_warning(self) -> None:
+        """
+        Warns that the statement now being processed can not be parsed and is skipped
+        :return: None
+        """
+
+        lines = self.statement.split("\n")
+        result = []
+        for line in lines:
+            if "--" in line:
+                text, index = line.split("--")
+                result.append((text, int(index)))
+
+        ProgramReporter.show_warning_message(
+            message=f"An error occurred while processing an SQL statement that starts at line {result[0][1]}. \n"
+                    "This statement will be skipped.\n"
+        )
+
+    def _process_statement(self, position: int, cache_key: bytes | None = None) -> None:
+        """
+        Process already parsed statement.
+        Includes code locations, lints statement and applies memory representation changes if any.
+        :param position: Line where the statement starts
+        :param cache_key: Key of the statement in the lint cache, None if the result is not stored
+        :return: None
+        """
+
+        first_report = len(self.rule_reporter.reports)
+        if cache_key is not None:
+            ProgramReporter.start_recording()
+
+        ProgramReporter.show_verbose_messages(message=self.statement,
+                                              origin="===========================================================\n"
+                                                     "Statement")
+
+        ProgramReporter.show_verbose_messages(message=repr(self.ast),
+                                              origin="Abstract syntax tree")
+
+        # Library counts the rows from one
+        # It is necessary to calculate the rows to match the input file
+        # The approach is to find out the position of the start of the statement
+        # and add it as a constant to location (line value)
+        # Since we are adding the number of rows to the location, so we have to count from zero
+        # Therefore we have to subtract the value from which we count
+        library_initial_count_number = 1
+        self._include_code_locations(position_const=position - library_initial_count_number)
+
+        self.ast = adapt_ast(self.ast)
+
+        self.rule_reporter.statement = (self.statement, position)
+        self.rules_visitor.statement = (self.statement, position)
+
+        self._lint_statement()
+
+        # provide changes based on SQL statement to memory representation
+        snapshot = None
+        if self._check_if_modifying_statement():
+            if cache_key is not None:
+                snapshot = self.mem_rep.snapshot()
+
+            self._modify_representation()
+            self._record_journal_changes()
+
+        if cache_key is not None:
+            self._store_cache_entry(cache_key=cache_key, position=position, first_report=first_report,
+                                    snapshot=snapshot, messages=ProgramReporter.stop_recording())
+
+        # Tables used by the statement can be released now
+        self.mem_rep.release_tables()
+
+    #########################
+    #   PARALLEL LINTING
+    #########################
+
+    def _init_parallel_linter(self) -> None:
+        """
+        Creates parallel linter if user wants to lint with more than one process.
+        :return: None
+        """
+
+        self.parallel_linter = None
+
+        if self.args_data.jobs is None or self.args_data.jobs <= 1:
+            if self.args_data.partition_by_schema:
                 ProgramReporter.show_warning_message(
-                    message=f"An error occurred while processing an SQL statement that starts at line {result[0][1]}. \n"
-                            "This statement will be skipped.\n"
+                    message="Processing partitioned by schema (--partition-by-schema) needs more than one process. "
+                            "Please set parameter --jobs. Statements will be processed sequentially."
                 )
-                continue
+            return
 
-            ProgramReporter.show_verbose_messages(message=self.statement,
-                                                  origin="===========================================================\n"
-                                                         "Statement")
+        # More processes than processors only add the cost of sending statements and memory representation
+        jobs = min(self.args_data.jobs, self._get_processor_count())
+        if jobs <= 1:
+            ProgramReporter.show_verbose_messages(message="Only one processor is available, "
+                                                          "statements will be processed sequentially.",
+                                                  origin="Parallel linting")
+            return
 
-            ProgramReporter.show_verbose_messages(message=repr(self.ast),
-                                                  origin="Abstract syntax tree")
+        from sql_code_analyzer.linter.parallel import ParallelLinter, SchemaPartitionLinter
 
-            # Library counts the rows from one
-            # It is necessary to calculate the rows to match the input file
-            # The approach is to find out the position of the start of the statement
-            # and add it as a constant to location (line value)
-            # Since we are adding the number of rows to the location, so we have to count from zero
-            # Therefore we have to subtract the value from which we count
-            library_initial_count_number = 1
-            self._include_code_locations(position_const=position - library_initial_count_number)
+        if self.args_data.partition_by_schema:
+            self.parallel_linter = SchemaPartitionLinter(jobs=jobs,
+                                                         rules_args_data=self.rules_args_data,
+                                                         dialect=self.args_data.dialect)
+        else:
+            self.parallel_linter = ParallelLinter(jobs=jobs,
+                                                  rules_args_data=self.rules_args_data,
+                                                  dialect=self.args_data.dialect)
 
-            self.ast = adapt_ast(self.ast)
+    @staticmethod
+    def _get_processor_count() -> int:
+        """
+        Return count of processors the program can run on
+        :return: Count of processors
+        """
 
-            self.rule_reporter.statement = (self.statement, position)
-            self.rules_visitor.statement = (self.statement, position)
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
 
-            self._lint_statement()
+    @classmethod
+    def _check_if_plain_select(cls, tokens: list) -> bool:
+        """
+        Determines from tokens whether the statement is a SELECT without set operations,
+        the root of its abstract syntax tree is a SELECT
+        :param tokens: Tokens of the statement
+        :return: True/False
+        """
 
-            # provide changes based on SQL statement to memory representation
-            if self._check_if_modifying_statement():
-                self._modify_representation()
+        if not tokens or tokens[0].token_type != TokenType.SELECT:
+            return False
 
-        self._lint_event(event_type="end_lint")
+        depth = 0
+        for token in tokens:
+            if token.token_type == TokenType.L_PAREN:
+                depth += 1
+            elif token.token_type == TokenType.R_PAREN:
+                depth -= 1
+            elif depth == 0 and token.token_type in cls.set_operation_tokens:
+                return False
+
+        return True
+
+    def _check_if_parallel_query(self) -> bool:
+        """
+        Determines whether the statement now being processed is a plain SELECT which can be linted in parallel.
+        Tokens are enough to find it out, so the statement is not parsed here and also in a worker process.
+        When partitioned by schema, the schema of statement is found in abstract syntax tree,
+        so such statements are parsed here.
+        :return: True/False
+        """
+
+        if self.parallel_linter is None or self.args_data.partition_by_schema:
+            return False
+
+        try:
+            tokens = Tokenizer().tokenize(self.statement)
+        except (Exception, ):
+            return False
+
+        if not self._check_if_plain_select(tokens=tokens):
+            return False
+
+        return not self._get_persistent_rules(expect_set={exp.Select.key})
+
+    def _check_if_parallel_statement(self) -> bool:
+        """
+        Determines whether the statement now being processed can be processed in parallel.
+        The statement must not be linted by a persistent rule, because persistent rules keep data between statements.
+        When partitioned by schema, the statement must reference only one schema,
+        otherwise the statement must not modify the memory representation.
+        :return: True/False
+        """
+
+        if self.parallel_linter is None or self._get_statement_persistent_rules():
+            return False
+
+        if self.args_data.partition_by_schema:
+            return self._get_statement_schema() is not None
+
+        return not self._check_if_modifying_statement()
+
+    def _get_statement_persistent_rules(self) -> list:
+        """
+        Return persistent rules which lint the statement now being processed.
+        :return: List of rules
+        """
+
+        return self._get_persistent_rules(expect_set=self._create_restriction_set_from_statement())
+
+    def _get_persistent_rules(self, expect_set: set) -> list:
+        """
+        Return persistent rules which lint statements with the restriction set
+        :param expect_set: Restriction set of a statement
+        :return: List of rules
+        """
+
+        rules = []
+        for rule in self.rules_visitor.persistent_rules:
+            restrictions = self.rules_visitor.restrict_rules[type(rule)]
+            if not restrictions or restrictions.intersection(expect_set):
+                rules.append(rule)
+
+        return rules
+
+    def _get_statement_schema(self) -> str | None:
+        """
+        Determines the only schema referenced by the statement now being processed.
+        Statements working with schemas themselves, statements referencing more schemas or no schema
+        and statements referencing not existing schema have no partition.
+        :return: Schema name or None
+        """
+
+        if hasattr(self.ast, "key") and \
+                "kind" in self.ast.args and \
+                isinstance(self.ast.args["kind"], str) and \
+                self.ast.args["kind"].lower() == "schema":
+            return None
+
+        schemas = {table.db or self.mem_rep.default_schema for table in self.ast.find_all(exp.Table)}
+
+        if len(schemas) != 1:
+            return None
+
+        schema_name = schemas.pop()
+        if not self.mem_rep.check_if_schema_exists_bool(schema_name):
+            return None
+
+        return schema_name
+
+    def _process_parallel_batch(self, batch: list) -> None:
+        """
+        Process a batch of statements in parallel.
+        Small batches are not worth sending to worker processes, they are processed here.
+        Reports are added in input order.
+        :param batch: List of (statement, position, ast, tokens, schema name of partition, key of lint cache)
+        :return: None
+        """
+
+        if len(batch) == 0:
+            return
+
+        if len(batch) >= self.parallel_min_batch_size * self.parallel_linter.jobs:
+            if self.args_data.partition_by_schema:
+                result = self.parallel_linter.process(statements=[(statement, position, schema_name)
+                                                                  for statement, position, _, _, schema_name, _ in batch],
+                                                      mem_rep=self.mem_rep)
+            else:
+                result = self.parallel_linter.lint(statements=[(statement, position)
+                                                               for statement, position, _, _, _, _ in batch],
+                                                   mem_rep=self.mem_rep)
+
+            if result is not None:
+                reports, parse_error_occurred = result
+                self.rule_reporter.reports += reports
+
+                # Workers do not modify memory representation when they only lint
+                if self.lint_cache is not None and not self.args_data.partition_by_schema:
+                    self._store_parallel_cache_entries(batch=batch, reports=reports)
+
+                self._parse_error_occurred = self._parse_error_occurred or parse_error_occurred
+                self._record_journal_changes()
+                self.mem_rep.release_tables()
+                return
+
+        # Batch is processed before the statement now being processed, which has to be kept
+        current_statement = (self.statement, self.ast, self.tokens)
+
+        for self.statement, position, self.ast, self.tokens, _, cache_key in batch:
+            # Queries recognized by their tokens are parsed now
+            if self.ast is None and not self._parse_statement():
+                self._show_skipped_statement_warning()
+                continue
+
+            self._process_statement(position=position, cache_key=cache_key)
+
+        self.statement, self.ast, self.tokens = current_statement
+
+    def _store_parallel_cache_entries(self, batch: list, reports: list) -> None:
+        """
+        Stores results of statements linted in parallel to the lint cache
+        Program messages are shown by worker processes, they are not stored
+        :param batch: List of (statement, position, ast, tokens, schema name of partition, key of lint cache)
+        :param reports: Reports of the batch, list of (statement, report)
+        :return: None
+        """
+
+        statement_reports = {}
+        for statement, report in reports:
+            statement_reports.setdefault(statement, []).append(report)
+
+        for statement, position, _, _, _, cache_key in batch:
+            if cache_key is not None:
+                self.lint_cache.put(key=cache_key,
+                                    position=position,
+                                    modifies=False,
+                                    reports=statement_reports.get((statement, position), []),
+                                    messages=[],
+                                    changes=None)
 
     def _include_code_locations(self, position_const: int) -> None:
         """
@@ -443,6 +1204,8 @@ class Linter:
             for rule in self.rules_visitor.persistent_rules:
                 if hasattr(rule, method_name) and \
                         callable(getattr(rule, method_name)):
+                    rule.mem_rep = self.mem_rep
+
                     # Get the method
                     rule_method = getattr(rule, method_name)
 
@@ -663,6 +1426,8 @@ class Linter:
                     user_answer = input()
 
                 if user_answer.lower() == "n" or user_answer.lower() == "no":
+                    if self.journal is not None:
+                        self.journal.discard()
                     Terminator.exit(enums.ExitWith.Success)
 
                 elif user_answer.lower() == "y" or user_answer.lower() == "yes":
@@ -674,17 +1439,30 @@ class Linter:
         # Provide serialization memory representation and store to a serialization path
         path = self.args_data.serialization_path / self.args_data.serialization_file
 
+        if self.journal is not None:
+            self.journal.close()
+
+            # Changes are already saved in the journal
+            if self.journal.get_size() <= self.journal_compaction_ratio * path.stat().st_size:
+                return
+
         try:
-            with open(path, 'wb') as f:
-                pickle.dump(self.mem_rep, f)
+            # The file is replaced at once, so a crash does not leave it half written
+            temporary_path = path.with_name(path.name + ".tmp")
+            with open(temporary_path, 'wb') as f:
+                serialization.dump(self.mem_rep, f)
+            os.replace(temporary_path, path)
+
+            # The journal belongs to the previous content of the file
+            get_journal_path(path=path).unlink(missing_ok=True)
 
         except FileNotFoundError:
             ProgramReporter.show_warning_message(
                 message=f"Serialization failed, file not found!\nPath: {path}"
             )
-        except pickle.PicklingError:
+        except (CatalogFormatError, TypeError) as e:
             ProgramReporter.show_warning_message(
-                message=f"Serialization failed, can not unpickle file!\nPath: {path}"
+                message=f"Serialization failed, {e}\nPath: {path}"
             )
 
         except (Exception,):
@@ -692,5 +1470,36 @@ class Linter:
                 message=f"Serialization failed!\nPath: {path}"
             )
 
+    def _make_catalog_diff(self) -> None:
+        """
+        Compares memory representation with the catalog of the diff file
+        and writes the changes to the output file or standard output
+        :return: None
+        """
+
+        path = self.args_data.catalog_diff_path / self.args_data.catalog_diff_file
+
+        try:
+            catalog = load_catalog(path=path)
+
+        except (OSError, CatalogFormatError, pickle.UnpicklingError) as e:
+            ProgramReporter.show_warning_message(
+                message=f"Catalog diff failed, the catalog can not be loaded, {e}\nPath: {path}"
+            )
+            return
+
+        changes = diff_catalogs(old=catalog, new=self.mem_rep)
+        if catalog.storage is not None:
+            catalog.storage.close()
+
+        if self.args_data.catalog_diff_output is None:
+            write_changes(changes=changes, file=sys.stdout)
+        else:
+            with open(self.args_data.catalog_diff_output, "w", encoding="utf-8") as f:
+                write_changes(changes=changes, file=f)
+
+        ProgramReporter.show_verbose_messages(message=f"Changes: {len(changes)}",
+                                              origin="Catalog diff")
+
     def _show_reports(self):
         self.rule_reporter.print()
@@ -0,0 +1,520 @@
+#######################################
+# File name: parallel.py
+# Purpose: Parallel linting of statements which do not modify memory representation
+#
+# Key features:
+#     ParallelLinter:
+#        Owns a process pool where each worker has its own rules and attaches a shared read-only
+#        snapshot of memory representation (see SharedCatalog), so workers do not hold their own copies.
+#        Lints a batch of statements in the pool and returns reports in input order.
+#
+#     SchemaPartitionLinter:
+#        Processes statements partitioned by the schema they reference.
+#        Each partition is processed (linted and applied to memory representation) by a worker
+#        which owns the schemas of its partition in its own database.
+#        Schemas connected by foreign keys are in the same partition, so a worker owns both sides of its foreign keys.
+#
+#     Statements which do not modify memory representation (SELECT, ...) can be linted independently,
+#     so a run of them between two modifying statements (barriers) can be split between workers.
+#     Statements which reference only one schema are independent of statements referencing another schema,
+#     statements referencing more schemas are synchronization points.
+#
+#######################################
+from __future__ import annotations
+
+import io
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+from sql_code_analyzer.adapter.adapt_ast import adapt_ast
+from sql_code_analyzer.in_memory_representation.struct.database import Database
+from sql_code_analyzer.in_memory_representation.tools.shared_catalog import SharedCatalog, attach
+from sql_code_analyzer.linter.linter import Linter
+from sql_code_analyzer.output.reporter.base import Reporter
+from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
+from sql_code_analyzer.visitor.rules_visitor import RulesVisitor
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import List
+    from sql_code_analyzer.checker.tools.rules_handler import CRules
+    from sql_code_analyzer.in_memory_representation.struct.schema import Schema
+
+
+class _LintWorker(Linter):
+    """
+    Linter living in a worker process.
+    It does not run the whole program pipeline like Linter, it only lints statements
+    it gets against the memory representation snapshot it gets.
+    """
+
+    def __init__(self, rules_args_data: CRules, dialect: str | None):
+        """
+        :param rules_args_data: Data about rules
+        :param dialect: SQL dialect
+        """
+
+        self._init_state()
+
+        self.args_data = SimpleNamespace(dialect=dialect)
+        self.rules_args_data = rules_args_data
+
+        self.snapshot_version = None
+        self.rules_visitor = RulesVisitor(rules_args_data=self.rules_args_data,
+                                          mem_rep=None)
+
+        self._get_modify_representation_statements()
+
+    def set_snapshot(self, version: int, path: Path) -> None:
+        """
+        Attaches memory representation snapshot if the worker does not have this version yet
+        :param version: Version of the snapshot
+        :param path: Path of the shared snapshot
+        :return: None
+        """
+
+        if self.snapshot_version == version:
+            return
+
+        if self.mem_rep is not None and self.mem_rep.storage is not None:
+            self.mem_rep.storage.close()
+
+        self.mem_rep = attach(path=path)
+        self.rules_visitor.mem_rep = self.mem_rep
+        self.snapshot_version = version
+
+    def lint_statements(self, statements: list) -> tuple:
+        """
+        Lints statements, the same way as Linter does it for statements which do not modify
+        memory representation.
+        :param statements: List of (statement, position)
+        :return: Reports in input order (detached from abstract syntax tree) and parse error flag
+        """
+
+        self._parse_error_occurred = False
+
+        for self.statement, position in statements:
+
+            if not self._parse_statement():
+                ProgramReporter.show_warning_message(
+                    message="An error occurred while processing an SQL statement that starts at line "
+                            f"{position}. \n"
+                            "This statement will be skipped.\n"
+                )
+                continue
+
+            ProgramReporter.show_verbose_messages(message=self.statement,
+                                                  origin="===========================================================\n"
+                                                         "Statement")
+
+            ProgramReporter.show_verbose_messages(message=repr(self.ast),
+                                                  origin="Abstract syntax tree")
+
+            library_initial_count_number = 1
+            self._include_code_locations(position_const=position - library_initial_count_number)
+
+            self.ast = adapt_ast(self.ast)
+
+            self.rule_reporter.statement = (self.statement, position)
+            self.rules_visitor.statement = (self.statement, position)
+
+            self._lint_statement()
+            self.mem_rep.release_tables()
+
+        return self._pop_reports(), self._parse_error_occurred
+
+    def process_partition(self, partition: bytes, database_name: str, default_schema: str,
+                          statements: list) -> tuple:
+        """
+        Processes statements of one schema partition, statements are linted and applied
+        to the memory representation of the partition.
+        :param partition: Pickled schemas of the partition
+        :param database_name: Name of the database
+        :param default_schema: Name of the default schema
+        :param statements: List of (sequence number, statement, position)
+        :return: Pickled schemas, reports of statements as list of (sequence number, reports) and parse error flag
+        """
+
+        self._parse_error_occurred = False
+
+        self.mem_rep = Database(database_name)
+        self.mem_rep.default_schema = default_schema
+        load_partition(data=partition, database=self.mem_rep)
+        self.rules_visitor.mem_rep = self.mem_rep
+
+        # Partition changes memory representation, so the snapshot is not valid anymore
+        self.snapshot_version = None
+
+        statements_reports = []
+        for sequence, self.statement, position in statements:
+
+            if not self._parse_statement():
+                ProgramReporter.show_warning_message(
+                    message="An error occurred while processing an SQL statement that starts at line "
+                            f"{position}. \n"
+                            "This statement will be skipped.\n"
+                )
+                continue
+
+            self._process_statement(position=position)
+            statements_reports.append((sequence, self._pop_reports()))
+
+        schemas = list(self.mem_rep.schemas.values())
+        return dump_partition(schemas=schemas, database=self.mem_rep), statements_reports, self._parse_error_occurred
+
+    def _pop_reports(self) -> list:
+        """
+        Takes reports collected so far, reports are detached from abstract syntax tree
+        :return: List of (statement, report)
+        """
+
+        reports = []
+        for statement, report in self.rule_reporter.reports:
+            # Memory representation reports are strings
+            if not isinstance(report, str):
+                report.detach()
+            reports.append((statement, report))
+
+        self.rule_reporter.reports = []
+        return reports
+
+
+#########################
+#      PARTITIONS
+#########################
+
+class _PartitionPickler(pickle.Pickler):
+    """
+    Pickles schemas without the database they belong to.
+    The database is replaced by a reference which is resolved by the database of the receiving side.
+    """
+
+    def __init__(self, file, database: Database):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.database = database
+
+    def persistent_id(self, obj):
+        if obj is self.database:
+            return "database"
+        return None
+
+
+class _PartitionUnpickler(pickle.Unpickler):
+    """
+    Unpickles schemas pickled by _PartitionPickler into the provided database.
+    """
+
+    def __init__(self, file, database: Database):
+        super().__init__(file)
+        self.database = database
+
+    def persistent_load(self, pid):
+        if pid == "database":
+            return self.database
+        raise pickle.UnpicklingError(f"Unsupported persistent object {pid}.")
+
+
+def dump_partition(schemas: List[Schema], database: Database) -> bytes:
+    """
+    Pickles schemas so that they can be moved to another database
+    Tables of the schemas may reference each other by foreign keys,
+    tables of other schemas must not be referenced, they would be pickled as copies
+    :param schemas: The schemas
+    :param database: The database to which the schemas belong
+    :return: Pickled schemas
+    """
+
+    buffer = io.BytesIO()
+    _PartitionPickler(buffer, database=database).dump(schemas)
+    return buffer.getvalue()
+
+
+def load_partition(data: bytes, database: Database) -> List[Schema]:
+    """
+    Unpickles schemas into the database, replaces the schemas with the same names if any
+    and registers all schema objects to the database index.
+    :param data: Pickled schemas
+    :param database: Target database
+    :return: The schemas
+    """
+
+    schemas: List[Schema] = _PartitionUnpickler(io.BytesIO(data), database=database).load()
+
+    for schema in schemas:
+        if schema.name in database.schemas:
+            for table in database.schemas[schema.name].tables.values():
+                table.cancel_index_owner_registration()
+                database.dependencies.remove_table(table=table)
+            database.query.cancel_schema(schema=database.schemas[schema.name])
+
+            # All tables and columns of the schema are unregistered too
+            database.index_cancel_registration(key=schema.name)
+
+    database.notify_change(changed_object=database)
+    for schema in schemas:
+        database.schemas[schema.name] = schema
+
+    # Foreign keys between the schemas are registered when all of them are in the database
+    for schema in schemas:
+        database.register_schema(schema=schema)
+
+    return schemas
+
+
+# Worker of the current process, created by pool initializer
+_worker: _LintWorker | None = None
+
+
+def _init_worker(rules_args_data: CRules, dialect: str | None, verbose: int, report_output, report_output_file):
+    """
+    Initializer of a worker process.
+    Process may be spawned, so program output settings are passed explicitly.
+    """
+
+    global _worker
+
+    ProgramReporter.verbose = verbose
+    Reporter.report_output = report_output
+    Reporter.report_output_file = report_output_file
+
+    _worker = _LintWorker(rules_args_data=rules_args_data,
+                          dialect=dialect)
+
+
+def _process_partition(partition: bytes, database_name: str, default_schema: str, statements: list) -> tuple:
+    """
+    Task executed in a worker process
+    :param partition: Pickled schemas of the partition
+    :param database_name: Name of the database
+    :param default_schema: Name of the default schema
+    :param statements: List of (sequence number, statement, position)
+    :return: Pickled schemas, reports of statements and parse error flag
+    """
+
+    return _worker.process_partition(partition=partition,
+                                     database_name=database_name,
+                                     default_schema=default_schema,
+                                     statements=statements)
+
+
+def _lint_chunk(version: int, path: Path, statements: list) -> tuple:
+    """
+    Task executed in a worker process
+    :param version: Version of memory representation snapshot
+    :param path: Path of the shared snapshot
+    :param statements: List of (statement, position)
+    :return: Reports and parse error flag
+    """
+
+    _worker.set_snapshot(version=version, path=path)
+    return _worker.lint_statements(statements=statements)
+
+
+class ParallelLinter:
+    """
+    Provides linting of statements in a pool of processes.
+    Every worker attaches a shared snapshot of memory representation made before the batch of statements,
+    workers get only the path of snapshot, a new snapshot is exported only when the memory representation
+    could be changed.
+    """
+
+    def __init__(self, jobs: int, rules_args_data: CRules, dialect: str | None):
+        """
+        :param jobs: Number of worker processes
+        :param rules_args_data: Data about rules
+        :param dialect: SQL dialect
+        """
+
+        self.jobs = jobs
+        self.rules_args_data = rules_args_data
+        self.dialect = dialect
+        self._pool: ProcessPoolExecutor | None = None
+        self._shared_catalog: SharedCatalog | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Creates the pool of processes when needed for the first time
+        :return: The pool
+        """
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.jobs,
+                                             initializer=_init_worker,
+                                             initargs=(self.rules_args_data,
+                                                       self.dialect,
+                                                       ProgramReporter.verbose,
+                                                       Reporter.report_output,
+                                                       Reporter.report_output_file))
+        return self._pool
+
+    def lint(self, statements: list, mem_rep: Database) -> tuple | None:
+        """
+        Lints statements in the pool of processes.
+        :param statements: List of (statement, position)
+        :param mem_rep: Memory representation which is not changed by the statements
+        :return: Reports in input order and parse error flag or None if memory representation
+                 can not be sent to workers
+        """
+
+        try:
+            if self._shared_catalog is None:
+                self._shared_catalog = SharedCatalog()
+            path = self._shared_catalog.export(database=mem_rep)
+
+        except (Exception, ) as e:
+            ProgramReporter.show_warning_message(
+                message="Memory representation can not be sent to worker processes, "
+                        "statements will be linted sequentially.\n"
+                        f"Python interpreter report: {e}"
+            )
+            return None
+
+        # Contiguous chunks keep the order of statements inside chunk
+        chunk_size = -(-len(statements) // self.jobs)
+        chunks = [statements[i:i + chunk_size] for i in range(0, len(statements), chunk_size)]
+
+        pool = self._get_pool()
+        futures = [pool.submit(_lint_chunk, self._shared_catalog.version, path, chunk) for chunk in chunks]
+
+        reports: List = []
+        parse_error_occurred = False
+        try:
+            for future in futures:
+                chunk_reports, chunk_parse_error_occurred = future.result()
+                reports += chunk_reports
+                parse_error_occurred = parse_error_occurred or chunk_parse_error_occurred
+
+        except BrokenProcessPool as e:
+            ProgramReporter.show_error_message(
+                message="A worker process of parallel linting terminated unexpectedly.\n"
+                        f"Python interpreter report: {e}"
+            )
+
+        return reports, parse_error_occurred
+
+    def shutdown(self) -> None:
+        """
+        Terminates the pool of processes and removes shared snapshots
+        :return: None
+        """
+
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+        if self._shared_catalog is not None:
+            self._shared_catalog.close()
+            self._shared_catalog = None
+
+
+class SchemaPartitionLinter(ParallelLinter):
+    """
+    Provides processing of statements partitioned by schema in a pool of processes.
+    Statements of one partition are processed in input order by one worker which gets
+    the schemas of the partition in its own database. Partitions are processed in parallel,
+    then schemas are moved back to memory representation and reports are merged in input order.
+    """
+
+    @staticmethod
+    def _get_partition_schemas(schema_names: list, mem_rep: Database) -> List[List[str]]:
+        """
+        Groups schemas connected by foreign keys, directly or through other schemas.
+        A worker changes objects on both sides of a foreign key, so the schemas of a group
+        are moved to one worker together. A group can include schemas without statements.
+        :param schema_names: Names of schemas referenced by statements
+        :param mem_rep: Memory representation
+        :return: List of groups of schema names
+        """
+
+        groups = []
+        grouped = set()
+        for schema_name in schema_names:
+            if schema_name in grouped:
+                continue
+
+            group = []
+            pending = [schema_name]
+            grouped.add(schema_name)
+            while pending:
+                name = pending.pop()
+                group.append(name)
+
+                mem_rep.load_schema_tables(schema_name=name)
+                for table in list(mem_rep.schemas[name].tables.values()):
+                    mem_rep.load_referencing_tables(table=table)
+                    for other in mem_rep.dependencies.get_referenced_tables(table=table) + \
+                            mem_rep.dependencies.get_referencing_tables(table=table):
+                        if other.schema.name not in grouped:
+                            grouped.add(other.schema.name)
+                            pending.append(other.schema.name)
+
+            groups.append(group)
+
+        return groups
+
+    def process(self, statements: list, mem_rep: Database) -> tuple | None:
+        """
+        Processes partitioned statements in the pool of processes.
+        :param statements: List of (statement, position, schema name)
+        :param mem_rep: Memory representation
+        :return: Reports in input order and parse error flag or None if a partition
+                 can not be sent to workers
+        """
+
+        schema_statements = {}
+        for sequence, (statement, position, schema_name) in enumerate(statements):
+            schema_statements.setdefault(schema_name, []).append((sequence, statement, position))
+
+        # Statements of schemas connected by foreign keys are one partition, still in input order
+        partitions = []
+        for schema_names in self._get_partition_schemas(schema_names=list(schema_statements), mem_rep=mem_rep):
+            partition_statements = sorted((statement for schema_name in schema_names
+                                           for statement in schema_statements.get(schema_name, [])),
+                                          key=lambda x: x[0])
+            partitions.append((schema_names, partition_statements))
+
+        try:
+            pickled_partitions = [dump_partition(schemas=[mem_rep.schemas[schema_name] for schema_name in schema_names],
+                                                 database=mem_rep)
+                                  for schema_names, _ in partitions]
+
+        except (Exception, ) as e:
+            ProgramReporter.show_warning_message(
+                message="Memory representation can not be sent to worker processes, "
+                        "statements will be processed sequentially.\n"
+                        f"Python interpreter report: {e}"
+            )
+            return None
+
+        pool = self._get_pool()
+        futures = [pool.submit(_process_partition,
+                               pickled_partition,
+                               mem_rep.name,
+                               mem_rep.default_schema,
+                               partition_statements)
+                   for pickled_partition, (_, partition_statements) in zip(pickled_partitions, partitions)]
+
+        statements_reports = []
+        parse_error_occurred = False
+        try:
+            for future in futures:
+                partition, partition_reports, partition_parse_error_occurred = future.result()
+                load_partition(data=partition, database=mem_rep)
+                statements_reports += partition_reports
+                parse_error_occurred = parse_error_occurred or partition_parse_error_occurred
+
+        except BrokenProcessPool as e:
+            ProgramReporter.show_error_message(
+                message="A worker process of schema partitioned processing terminated unexpectedly.\n"
+                        f"Python interpreter report: {e}"
+            )
+
+        # Merge reports into one stream in input order
+        reports = []
+        for _, statement_reports in sorted(statements_reports, key=lambda x: x[0]):
+            reports += statement_reports
+
+        return reports, parse_error_occurred
@@ -30,6 +30,9 @@ class _ProgramMessage(_Message):
         :return: None
         """
 
+        if ProgramReporter.recorded_messages is not None and self.color is not MessageType.Info:
+            ProgramReporter.recorded_messages.append((self.color.name, self.text))
+
         self.text = self.color.value + self.text + self._reset + "\n"
         super().print()
 
@@ -39,6 +42,41 @@ class ProgramReporter(Reporter):
     Provides a way to create reports about the program events.
     """
 
+    # Messages which are shown while recording, except verbose messages
+    # Format: (message type name, text)
+    recorded_messages: list | None = None
+
+    @staticmethod
+    def start_recording() -> None:
+        """
+        Starts recording of shown messages, e.g. to replay messages of a statement from the lint cache
+        :return: None
+        """
+
+        ProgramReporter.recorded_messages = []
+
+    @staticmethod
+    def stop_recording() -> list:
+        """
+        Stops recording of shown messages
+        :return: Recorded messages, list of (message type name, text)
+        """
+
+        messages, ProgramReporter.recorded_messages = ProgramReporter.recorded_messages or [], None
+        return messages
+
+    @staticmethod
+    def show_recorded_messages(messages: list) -> None:
+        """
+        Shows recorded messages again
+        :param messages: List of (message type name, text)
+        :return: None
+        """
+
+        for message_type, text in messages:
+            ProgramReporter._create_message(message_type=MessageType[message_type],
+                                            message_text=text).print()
+
     @staticmethod
     def _create_message(message_type: MessageType, message_text: str):
         """
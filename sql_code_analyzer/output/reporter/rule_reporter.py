@@ -2,6 +2,7 @@ from typing import List
 import textwrap
 
 from sql_code_analyzer.adapter.freature_class.base_cast import BaseCast
+from sql_code_analyzer.adapter.freature_class.detached_node import DetachedNode
 from sql_code_analyzer.in_memory_representation.struct.base import Base
 from sql_code_analyzer.output.reporter.base import Reporter, _Message
 from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
@@ -44,6 +45,16 @@ class RuleReport(_Message):
     def set_statement(self, statement):
         self.statement = statement
 
+    def detach(self):
+        """
+        Replaces the node of abstract syntax tree by a node which keeps only the code location.
+        Detached report does not hold a reference to the abstract syntax tree and can be pickled.
+        :return: Self
+        """
+
+        self.node = DetachedNode(code_location=getattr(self.node, "code_location", None))
+        return self
+
     def _create_message(self, message: str, color: str = "\033[0m"):
         return color + message + self._color["reset"] + " "
 
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import enum
+import importlib
 import importlib.util
 from queue import LifoQueue
 
@@ -10,6 +11,7 @@ from sql_code_analyzer.in_memory_representation.struct.database import Database
 from sql_code_analyzer.output.enums import ExitWith
 from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
 from sql_code_analyzer.tools.path import get_path_object
+from sql_code_analyzer.visitor.scope import ScopeResolver
 from sql_code_analyzer.visitor.visitor import Visitor
 
 from typing import TYPE_CHECKING
@@ -88,6 +90,7 @@ class RulesVisitor(Visitor):
         self.visit_leave_queue = LifoQueue()
         self.reports = []
         self.statement = ""
+        self.scope_resolver = None
 
         # Rules
         self.rules = []
@@ -103,6 +106,7 @@ class RulesVisitor(Visitor):
         self.node_to_lint = None
         self.visit_leave_queue = LifoQueue()
         self.reports = []
+        self.scope_resolver = None
         self._reset_normal_rules()
 
     def _reset_normal_rules(self):
@@ -212,6 +216,22 @@ class RulesVisitor(Visitor):
     def statement(self, value):
         self._statement = value
 
+    @property
+    def scope_resolver(self) -> ScopeResolver:
+        """
+        Scope resolver of the actual statement.
+        It is created when it is used first time in a statement,
+        so all rules share the scopes resolved for the statement.
+        :return: The scope resolver
+        """
+        if self._scope_resolver is None:
+            self._scope_resolver = ScopeResolver(mem_rep=self.mem_rep)
+        return self._scope_resolver
+
+    @scope_resolver.setter
+    def scope_resolver(self, value):
+        self._scope_resolver = value
+
     @staticmethod
     def _get_node_type(node) -> str:
         """
@@ -256,6 +276,8 @@ class RulesVisitor(Visitor):
             for rule in self.persistent_rules:
                 if hasattr(rule, method_name) and \
                         callable(getattr(rule, method_name)):
+                    rule.mem_rep = self.mem_rep
+
                     # Get the method
                     rule_method = getattr(rule, method_name)
 
@@ -290,6 +312,9 @@ class RulesVisitor(Visitor):
 
                 if hasattr(rule_instance, method_name) and \
                    callable(getattr(rule_instance, method_name)):
+                    rule_instance.mem_rep = self.mem_rep
+                    rule_instance.scope_resolver = self.scope_resolver
+
                     # Get the method
                     rule_method = getattr(rule_instance, method_name)
 
@@ -483,6 +508,7 @@ class RulesVisitor(Visitor):
                 rule_instance.node = self.node_to_lint
                 rule_instance.mem_rep = self.mem_rep
                 rule_instance.statement = self.statement
+                rule_instance.scope_resolver = self.scope_resolver
 
                 # Get the method
                 rule_method = getattr(rule_instance, self._get_node_type(node=self.node_to_lint) + visit_or_leave.value)
@@ -493,6 +519,8 @@ class RulesVisitor(Visitor):
     def get_rules(self) -> None:
         """
         Extracts a list of rule files from the data obtained by processing program arguments.
+        Rules from the rules folder are loaded from their paths,
+        rules from installed rule packages are imported as regular modules.
 
         :return: None
         """
@@ -509,32 +537,59 @@ class RulesVisitor(Visitor):
                 module = importlib.util.module_from_spec(spec)
                 spec.loader.exec_module(module)
 
-                # Check if the file has register method
-                if "register" in dir(module):
-
-                    try:
-                        # Get method
-                        register_method = getattr(module, "register")
+            except (Exception, ) as e:
+                ProgramReporter.show_warning_message(
+                    message=f"Unable to load a module with rule in {path_object.name}.\n"
+                            f"Python interpreter report: {e}"
+                )
+                continue
 
-                        # Apply registration to this visitor
-                        register_method(self)
+            self._register_module_rules(module=module, name=path_object.name)
 
-                    except TypeError as e:
-                        ProgramReporter.show_warning_message(
-                            message=f"Unable to register rule in {path_object.name},"
-                                    "probably missing parameter for checker.\n"
-                                    f"Python interpreter report: {e}"
-                        )
+        # Go through all modules from rule packages
+        for module_name in self.rules_args_data.modules:
 
-                    except Exception as e:
-                        ProgramReporter.show_warning_message(
-                            message=f"Unable to register rule in {path_object.name}.\n"
-                                    f"Python interpreter report: {e}"
-                        )
+            try:
+                module = importlib.import_module(module_name)
 
             except (Exception, ) as e:
                 ProgramReporter.show_warning_message(
-                    message=f"Unable to load a module with rule in {path_object.name}.\n"
+                    message=f"Unable to load a module with rule {module_name}.\n"
+                            f"Python interpreter report: {e}"
+                )
+                continue
+
+            self._register_module_rules(module=module, name=module_name)
+
+    def _register_module_rules(self, module, name: str) -> None:
+        """
+        Calls register function of a module with rules if the module has one.
+
+        :param module: Loaded module
+        :param name: Name of the module used in messages
+        :return: None
+        """
+
+        # Check if the file has register method
+        if "register" in dir(module):
+
+            try:
+                # Get method
+                register_method = getattr(module, "register")
+
+                # Apply registration to this visitor
+                register_method(self)
+
+            except TypeError as e:
+                ProgramReporter.show_warning_message(
+                    message=f"Unable to register rule in {name},"
+                            "probably missing parameter for checker.\n"
+                            f"Python interpreter report: {e}"
+                )
+
+            except Exception as e:
+                ProgramReporter.show_warning_message(
+                    message=f"Unable to register rule in {name}.\n"
                             f"Python interpreter report: {e}"
                 )
 
@@ -0,0 +1,498 @@
+#######################################
+# File name: scope.py
+# Purpose: Resolution of tables, aliases and subqueries visible inside SELECT statements
+#
+# Key features:
+#     Source:
+#        Stores: table, subquery or common table expression visible in a scope
+#                names of columns the source provides
+#
+#     Scope:
+#        Stores: sources visible inside one SELECT by their alias or name
+#                connection to the scope of enclosing SELECT
+#
+#     ScopeResolver:
+#        Builds scopes of a statement lazily and only once
+#        Caches lookups of tables in memory representation
+#
+#######################################
+
+from __future__ import annotations
+
+import enum
+
+from sqlglot import expressions as exp
+
+from sql_code_analyzer.in_memory_representation.exceptions import MissingTableException, MissingSchemaException
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from typing import Dict, List
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+    from sql_code_analyzer.in_memory_representation.struct.table import Table
+
+
+class SourceKind(enum.Enum):
+    """
+    Enumerator of source kinds which can be visible in a scope.
+    """
+
+    Table = "table"
+    Subquery = "subquery"
+    CTE = "cte"
+    Other = "other"
+
+
+class Source:
+    """
+    Represents a table, subquery or common table expression visible in a scope
+    """
+
+    def __init__(self, name: str, node, kind: SourceKind, table: Table | None = None, columns=None):
+        """
+        :param name: The alias or name under which the source is visible
+        :param node: The node of abstract syntax tree which defines the source in FROM or JOIN clause
+        :param kind: The kind of source
+        :param table: The table from memory representation if the source is an existing table
+        :param columns: Names of columns the source provides, None if they can not be determined
+        """
+
+        self.name = name
+        self.node = node
+        self.kind = kind
+        self.table = table
+        self.columns = columns
+
+    def __repr__(self):
+        return self.name
+
+    @property
+    def is_missing_table(self) -> bool:
+        """
+        Verify if the source refers to a table which does not exist in memory representation
+        :return: True/False
+        """
+
+        return self.kind is SourceKind.Table and self.table is None
+
+    def has_column(self, column_name: str) -> bool:
+        """
+        Verify if the source provides a column with that name.
+        Source with unknown columns accepts every column.
+        :param column_name: The column name
+        :return: True/False
+        """
+
+        if self.columns is None:
+            return True
+
+        return column_name in self.columns
+
+
+class Scope:
+    """
+    Represents sources visible inside one SELECT.
+    According to SQL, the aliased table is visible only by its alias.
+    """
+
+    def __init__(self, select, parent: Scope | None, correlated: bool):
+        """
+        :param select: The SELECT node
+        :param parent: The scope of enclosing SELECT
+        :param correlated: True if the SELECT can reference sources of enclosing SELECT
+        """
+
+        self.select = select
+        self.parent = parent
+        self.correlated = correlated
+
+        # Alias or name -> Source
+        self.sources: Dict[str, Source] = {}
+
+        # Node identity -> Source
+        self.source_nodes: Dict[int, Source] = {}
+
+        # Name of common table expression -> CTE node
+        self.ctes: Dict[str, exp.CTE] = {}
+
+        # Aliases of selected expressions, usable e.g. in ORDER BY
+        self.projections: set = set()
+
+        # Column name -> sources which provide the column, created on first use
+        self._column_sources: Dict[str, List[Source]] | None = None
+
+        # Sources with unknown columns which can provide every column
+        self._open_sources: List[Source] = []
+
+    def __repr__(self):
+        return f"Scope({', '.join(self.sources)})"
+
+    def add_source(self, source: Source) -> None:
+        """
+        Makes the source visible in the scope
+        :param source: The source
+        :return: None
+        """
+
+        self.sources[source.name] = source
+        self.source_nodes[id(source.node)] = source
+        self._column_sources = None
+
+    def get_source(self, name: str) -> Source | None:
+        """
+        Return source visible by the alias or name.
+        Correlated SELECT can see the sources of enclosing SELECT.
+        :param name: Alias or name of the source
+        :return: Source or None
+        """
+
+        scope = self
+        while scope is not None:
+            if name in scope.sources:
+                return scope.sources[name]
+
+            if not scope.correlated:
+                return None
+
+            scope = scope.parent
+
+        return None
+
+    def get_cte(self, name: str) -> exp.CTE | None:
+        """
+        Return common table expression visible by the name
+        :param name: Name of the common table expression
+        :return: CTE node or None
+        """
+
+        scope = self
+        while scope is not None:
+            if name in scope.ctes:
+                return scope.ctes[name]
+            scope = scope.parent
+
+        return None
+
+    def _create_column_sources(self) -> None:
+        """
+        Creates the map of column names to the sources which provide them.
+        Each source is iterated only once, so resolving columns of the scope
+        is linear in number of columns and not in columns x sources.
+        :return: None
+        """
+
+        self._column_sources = {}
+        self._open_sources = []
+
+        for source in self.sources.values():
+            if source.columns is None:
+                self._open_sources.append(source)
+                continue
+
+            for column_name in source.columns:
+                self._column_sources.setdefault(column_name, []).append(source)
+
+    def find_column_sources(self, column_name: str) -> List[Source]:
+        """
+        Return sources of this scope which provide the column
+        :param column_name: The column name
+        :return: List of sources
+        """
+
+        if self._column_sources is None:
+            self._create_column_sources()
+
+        return self._column_sources.get(column_name, []) + self._open_sources
+
+
+class ScopeResolver:
+    """
+    Resolves scopes of SELECTs in one statement.
+    The scope of each SELECT is built only once, when a rule asks for it first,
+    and the tables are looked up in memory representation only once per statement.
+    So the cost of resolution does not grow with number of rules which use it.
+    """
+
+    def __init__(self, mem_rep: Database | None):
+        """
+        :param mem_rep: Memory representation used to resolve the tables
+        """
+
+        self.mem_rep = mem_rep
+
+        # SELECT node identity -> Scope
+        self.scopes: Dict[int, Scope] = {}
+
+        # (schema name, table name) -> Table or None
+        self.tables: Dict[tuple, Table | None] = {}
+
+    ##################################################
+    #                  PRIVATE METHODS
+    ##################################################
+
+    @staticmethod
+    def _get_parent_select(node):
+        """
+        Return the nearest SELECT which encloses the node
+        :param node: The node of abstract syntax tree
+        :return: SELECT node or None
+        """
+
+        node = node.parent
+        while node is not None and not isinstance(node, exp.Select):
+            node = node.parent
+        return node
+
+    @staticmethod
+    def _is_correlated(select) -> bool:
+        """
+        Verify if the SELECT can reference sources of enclosing SELECT.
+        Subqueries in FROM and JOIN clause and common table expressions can not.
+        :param select: SELECT node
+        :return: True/False
+        """
+
+        node = select.parent
+        while isinstance(node, (exp.Subquery, exp.Union)):
+            node = node.parent
+
+        return not isinstance(node, (exp.From, exp.Join, exp.CTE))
+
+    @staticmethod
+    def _get_source_nodes(select) -> List:
+        """
+        Return nodes which define sources of SELECT in FROM and JOIN clauses
+        :param select: SELECT node
+        :return: List of nodes
+        """
+
+        nodes = []
+
+        from_ = select.args.get("from")
+        if from_ is not None:
+            nodes.extend(from_.expressions or [from_.this])
+
+        for join in select.args.get("joins") or []:
+            nodes.append(join.this)
+
+        return [node for node in nodes if node is not None]
+
+    @staticmethod
+    def _get_query_columns(node, alias=None) -> set | None:
+        """
+        Return names of columns provided by a query
+        :param node: Query node
+        :param alias: Alias node of the query which can rename the columns
+        :return: Set of column names or None if they can not be determined
+        """
+
+        if alias is not None and alias.columns:
+            return {column.name for column in alias.columns}
+
+        while isinstance(node, (exp.Subquery, exp.Union)):
+            node = node.this
+
+        if not isinstance(node, exp.Select):
+            return None
+
+        columns = set()
+        for expression in node.expressions:
+            if isinstance(expression, exp.Star) or \
+                    isinstance(expression, exp.Column) and isinstance(expression.this, exp.Star):
+                return None
+            columns.add(expression.alias_or_name)
+
+        return columns
+
+    def _build_scope(self, select) -> Scope:
+        """
+        Creates the scope of SELECT
+        :param select: SELECT node
+        :return: The scope
+        """
+
+        parent_select = self._get_parent_select(select)
+        parent = self.get_select_scope(parent_select) if parent_select is not None else None
+
+        scope = Scope(select=select,
+                      parent=parent,
+                      correlated=self._is_correlated(select))
+
+        with_ = select.args.get("with")
+        if with_ is not None:
+            for cte in with_.expressions:
+                scope.ctes[cte.alias] = cte
+
+        for expression in select.expressions:
+            if isinstance(expression, exp.Alias):
+                scope.projections.add(expression.alias)
+
+        for node in self._get_source_nodes(select):
+            scope.add_source(self._create_source(scope=scope, node=node))
+
+        return scope
+
+    def _create_source(self, scope: Scope, node) -> Source:
+        """
+        Creates the source from the node of FROM or JOIN clause
+        :param scope: The scope where the source is visible
+        :param node: The node
+        :return: The source
+        """
+
+        name = node.alias_or_name
+        alias = node.args.get("alias")
+
+        if isinstance(node, exp.Table):
+            cte = None
+            if not node.db:
+                cte = scope.get_cte(node.name)
+
+            if cte is not None:
+                return Source(name=name,
+                              node=node,
+                              kind=SourceKind.CTE,
+                              columns=self._get_query_columns(node=cte.this, alias=cte.args.get("alias")))
+
+            table = self.get_table(schema_name=node.db, table_name=node.name)
+            return Source(name=name,
+                          node=node,
+                          kind=SourceKind.Table,
+                          table=table,
+                          columns=table.columns if table is not None else frozenset())
+
+        if isinstance(node, exp.Subquery):
+            return Source(name=name,
+                          node=node,
+                          kind=SourceKind.Subquery,
+                          columns=self._get_query_columns(node=node.this, alias=alias))
+
+        return Source(name=name,
+                      node=node,
+                      kind=SourceKind.Other)
+
+    ##################################################
+    #                  PUBLIC METHODS
+    ##################################################
+
+    def get_table(self, schema_name: str, table_name: str) -> Table | None:
+        """
+        Return table from memory representation, each table is looked up once per statement
+        :param schema_name: Schema name, empty for the default schema
+        :param table_name: Table name
+        :return: Table or None if not exists
+        """
+
+        key = (schema_name, table_name)
+        if key in self.tables:
+            return self.tables[key]
+
+        try:
+            table = self.mem_rep.get_table_by_name_or_error(schema_name=schema_name,
+                                                            table_name=table_name)
+        except (MissingTableException, MissingSchemaException):
+            table = None
+
+        self.tables[key] = table
+        return table
+
+    def get_select_scope(self, select) -> Scope:
+        """
+        Return the scope of SELECT
+        :param select: SELECT node
+        :return: The scope
+        """
+
+        key = id(select)
+        if key not in self.scopes:
+            self.scopes[key] = self._build_scope(select)
+
+        return self.scopes[key]
+
+    def get_scope(self, node) -> Scope | None:
+        """
+        Return the scope where the node is located
+        :param node: The node of abstract syntax tree
+        :return: The scope or None if the node is not inside SELECT
+        """
+
+        if not isinstance(node, exp.Select):
+            node = self._get_parent_select(node)
+
+        if node is None:
+            return None
+
+        return self.get_select_scope(node)
+
+    def get_source(self, node) -> Source | None:
+        """
+        Return source defined by the node of FROM or JOIN clause
+        :param node: The node of abstract syntax tree
+        :return: The source or None if the node does not define any source
+        """
+
+        scope = self.get_scope(node)
+        if scope is None:
+            return None
+
+        return scope.source_nodes.get(id(node))
+
+    def get_column_alias_source(self, column) -> Source | None:
+        """
+        Return source which is referenced by the table alias of the column
+        :param column: Column node
+        :return: The source or None
+        """
+
+        scope = self.get_scope(column)
+        if scope is None:
+            return None
+
+        return scope.get_source(column.table)
+
+    def is_column_alias_visible(self, column) -> bool:
+        """
+        Verify if the table alias of the column refers to a visible source
+        :param column: Column node
+        :return: True/False, True also for column without the table alias
+        """
+
+        if column.table == "" or self.get_scope(column) is None:
+            return True
+
+        return self.get_column_alias_source(column) is not None
+
+    def is_column_visible(self, column) -> bool:
+        """
+        Verify if the column is provided by a source visible in its scope
+        :param column: Column node
+        :return: True/False, True also for column outside SELECT
+        """
+
+        scope = self.get_scope(column)
+        if scope is None:
+            return True
+
+        column_name = column.name
+
+        if column.table != "":
+            source = scope.get_source(column.table)
+            if source is None:
+                return False
+
+            # Column like alias.*
+            return isinstance(column.this, exp.Star) or source.has_column(column_name)
+
+        if column_name in scope.projections:
+            return True
+
+        while scope is not None:
+            if scope.find_column_sources(column_name):
+                return True
+
+            if not scope.correlated:
+                return False
+
+            scope = scope.parent
+
+        return False
@@ -0,0 +1,798 @@
+#######################################
+# File name: benchmark.py
+# Purpose: Benchmarks of the program performance
+#
+# Usage:
+#     python -m tests.benchmark                 runs all benchmarks
+#     python -m tests.benchmark name [name ...] runs selected benchmarks
+#
+#######################################
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# The program expects its root folder to be the first item of the path
+PROGRAM_ROOT = Path(__file__).resolve().parents[1] / "sql_code_analyzer"
+sys.path.insert(0, str(PROGRAM_ROOT))
+
+BENCHMARKS = {}
+
+
+def benchmark(function):
+    """
+    Registers benchmark function under its name
+    """
+
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+def measure(function, *args, repeat: int = 1, **kwargs) -> float:
+    """
+    Measures the best time of function call
+    Garbage of previous calls is collected before each call, so it is not collected during the measured call
+    :return: Time in seconds
+    """
+
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def report(name: str, **values) -> None:
+    """
+    Prints benchmark results
+    """
+
+    results = ", ".join(f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}"
+                        for key, value in values.items())
+    print(f"{name}: {results}")
+
+
+def run_linter(sql: str, *args) -> None:
+    """
+    Runs the whole program over SQL code with silent output
+    :param sql: SQL code
+    :param args: Additional program arguments
+    """
+
+    from sql_code_analyzer.linter.linter import Linter
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "input.sql")
+        with open(path, "w") as f:
+            f.write(sql)
+
+        argv = sys.argv
+        sys.argv = ["main.py", "-f", path, "-ros", *args]
+        try:
+            Linter()
+        finally:
+            sys.argv = argv
+
+
+def create_catalog(tables: int, columns: int, schemas: int = 1, database=None):
+    """
+    Creates a synthetic memory representation without parsing SQL code
+    :param tables: Count of tables in each schema
+    :param columns: Count of columns in each table
+    :param schemas: Count of schemas
+    :param database: Empty database to fill, e.g. backed by a catalog storage, a new one if not provided
+    :return: The database
+    """
+
+    from sqlglot import expressions as exp
+
+    from sql_code_analyzer.in_memory_representation.struct.column import Column
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+    from sql_code_analyzer.in_memory_representation.struct.schema import Schema
+    from sql_code_analyzer.in_memory_representation.tools.interning import get_datatype, get_literal
+
+    datatype_nodes = [exp.DataType.build(datatype) for datatype in ("VARCHAR(255)", "DECIMAL(10, 2)", "INT")]
+
+    if database is None:
+        database = Database("MemoryDB").set_default_scheme()
+
+    for s in range(schemas):
+        schema = database.schemas["dbo"] if s == 0 else Schema(database=database, schema_name=f"s{s}")
+        for t in range(tables):
+            table = database.create_table(database=database, schema_name=schema.name, table_name=f"Table{t}")
+            for c in range(columns):
+                # Every column has its own parsed datatype like in CREATE TABLE statements
+                datatype_node = datatype_nodes[c % len(datatype_nodes)].copy()
+                datatype = get_datatype(node=datatype_node,
+                                        literals=[get_literal(node=literal) for literal in datatype_node.expressions])
+                Column(identifier=exp.to_identifier(f"column{c}"),
+                       datatype=datatype,
+                       constrains=[],
+                       table=table)
+
+            # Like after every CREATE TABLE statement
+            database.release_tables()
+
+    return database
+
+
+def measure_memory(function, *args, **kwargs) -> tuple:
+    """
+    Measures memory allocated by the result of function call
+    :return: The result and allocated memory in MB
+    """
+
+    tracemalloc.start()
+    result = function(*args, **kwargs)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, allocated / 1024 / 1024
+
+
+def get_memory_usage() -> dict:
+    """
+    Return resident memory of the current process in MB
+    Private memory (RssAnon) and shared memory (RssShmem) are reported separately, only on Linux
+    :return: Dictionary of memory values
+    """
+
+    values = {"RssAnon": 0.0, "RssShmem": 0.0}
+    with contextlib.suppress(OSError):
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in values:
+                    values[key] = int(value.split()[0]) / 1024
+
+    return values
+
+
+# State of a worker process of shared_catalog benchmark
+_catalog_worker = {}
+
+
+def _init_catalog_worker(barrier) -> None:
+    # Modules of memory representation are not part of the measured memory
+    import sql_code_analyzer.in_memory_representation.tools.shared_catalog  # noqa: F401
+
+    _catalog_worker["barrier"] = barrier
+    _catalog_worker["baseline"] = get_memory_usage()
+
+
+def _load_catalog_worker(load, data, lookups: list) -> None:
+    """
+    Loads memory representation in a worker process and looks up its tables
+    Waits for other workers, so each worker gets one task
+    """
+
+    database = load(data)
+    for schema_name, table_name in lookups:
+        database.get_table_by_name_or_error(schema_name=schema_name, table_name=table_name)
+
+    _catalog_worker["database"] = database
+    _catalog_worker["barrier"].wait()
+
+
+def _measure_catalog_worker() -> tuple:
+    """
+    Return memory of a worker process allocated since its start
+    """
+
+    usage = get_memory_usage()
+    _catalog_worker["barrier"].wait()
+    return usage["RssAnon"] - _catalog_worker["baseline"]["RssAnon"], usage["RssShmem"]
+
+
+#########################
+#      BENCHMARKS
+#########################
+
+@benchmark
+def parallel_linting(selects: int = 2000, jobs: int = 4) -> None:
+    """
+    SELECT-heavy workload linted by one and by more processes
+    """
+
+    sql = "CREATE TABLE Table1 (id INTEGER PRIMARY KEY, name VARCHAR(35), value NUMBER(10, 2));\n"
+    sql += "CREATE TABLE Table2 (id INTEGER PRIMARY KEY, t1 INTEGER, note VARCHAR(20));\n"
+    for i in range(selects):
+        sql += f"SELECT a.name, b.note, value, missing_{i} FROM Table1 a JOIN Table2 b ON a.id = b.t1 " \
+               f"WHERE a.id > {i};\n"
+
+    sequential = measure(run_linter, sql, "-j", "1")
+    parallel = measure(run_linter, sql, "-j", str(jobs))
+
+    report("parallel_linting",
+           selects=selects, jobs=jobs,
+           sequential_s=sequential, parallel_s=parallel,
+           speedup=sequential / parallel)
+
+
+@benchmark
+def wide_join(tables: int = 15, columns: int = 20, selects: int = 20) -> None:
+    """
+    Reporting views selecting hundreds of unqualified columns from many joined tables
+    """
+
+    sql = ""
+    for t in range(tables):
+        definitions = ", ".join(f"c{t}_{c} INTEGER" for c in range(columns))
+        sql += f"CREATE TABLE Table{t} (id INTEGER PRIMARY KEY, {definitions});\n"
+
+    selected = ", ".join(f"c{t}_{c}" for t in range(tables) for c in range(columns))
+    joins = " ".join(f"JOIN Table{t} t{t} ON t{t}.id = t0.id" for t in range(1, tables))
+    for i in range(selects):
+        sql += f"SELECT {selected}, missing_{i} FROM Table0 t0 {joins};\n"
+
+    elapsed = measure(run_linter, sql)
+
+    report("wide_join",
+           tables=tables, columns=tables * columns, selects=selects,
+           total_s=elapsed, per_select_s=elapsed / selects)
+
+
+@benchmark
+def catalog_drops(tables: int = 2000, columns: int = 100, drops: int = 100) -> None:
+    """
+    Dropping tables and a schema from the database index of a large catalog
+    """
+
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+
+    def create_index() -> Database:
+        database = Database("MemoryDB")
+        for schema_name in ("dbo", "s1"):
+            database.index_registration(key=schema_name, reg_object=schema_name)
+            for t in range(tables // 2):
+                database.index_registration(key=(schema_name, f"Table{t}"), reg_object=t)
+                for c in range(columns):
+                    database.index_registration(key=(schema_name, f"Table{t}", f"c{c}"), reg_object=c)
+        return database
+
+    def flat_drop(flat_index: dict, key: tuple) -> None:
+        # Previous flat index had to scan every key
+        for o in [o for o in flat_index if not isinstance(o, str) and o[:len(key)] == key]:
+            flat_index.pop(o)
+
+    database = create_index()
+    flat = dict(database.object_index.items())
+    size = len(database.object_index)
+
+    start = time.perf_counter()
+    for t in range(drops):
+        database.index_cancel_registration(key=("dbo", f"Table{t}"))
+    drop_tables = time.perf_counter() - start
+
+    start = time.perf_counter()
+    database.index_cancel_registration(key="s1")
+    drop_schema = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for t in range(drops):
+        flat_drop(flat, ("dbo", f"Table{t}"))
+    flat_drop_tables = time.perf_counter() - start
+
+    report("catalog_drops",
+           objects=size, drops=drops,
+           drop_tables_s=drop_tables, drop_schema_s=drop_schema,
+           flat_drop_tables_s=flat_drop_tables)
+
+
+@benchmark
+def catalog_memory(tables: int = 1000, columns: int = 100, lookups: int = 200000) -> None:
+    """
+    Memory of synthetic 100k column catalog and speed of lookups made by rules
+    """
+
+    database, allocated = measure_memory(create_catalog, tables, columns)
+    keys = [(f"Table{i % tables}", f"column{i % columns}") for i in range(lookups)]
+
+    def lookup():
+        for table_name, column_name in keys:
+            table = database.get_table_by_name_or_error(schema_name="dbo", table_name=table_name)
+            table.columns[column_name].datatype.column_datatype
+
+    report("catalog_memory",
+           columns=tables * columns, memory_mb=allocated,
+           lookups=lookups, lookup_s=measure(lookup, repeat=3))
+
+
+
+@benchmark
+def bulk_loading(tables: int = 10000, columns: int = 20, statements: int = 2000) -> None:
+    """
+    Bootstrap of a large catalog with per-object index maintenance and in bulk load mode
+    """
+
+    import sqlglot
+    from sqlglot import expressions as exp
+
+    from sql_code_analyzer.adapter.adapt_ast import adapt_ast
+    from sql_code_analyzer.in_memory_representation.actions.modify_representation.table.create_table import \
+        create_table
+    from sql_code_analyzer.in_memory_representation.struct.column import Column
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+    from sql_code_analyzer.in_memory_representation.tools.interning import get_datatype
+
+    # Only catalog objects are created, identifiers and datatypes are prepared in advance
+    datatype = get_datatype(node=exp.DataType.build("INT"), literals=[])
+    identifiers = [exp.to_identifier(f"column{c}") for c in range(columns)]
+
+    def create_objects(bulk_load: bool) -> None:
+        database = Database("MemoryDB").set_default_scheme()
+        with database.bulk_load() if bulk_load else contextlib.nullcontext():
+            for t in range(tables):
+                table = database.create_table(database=database, schema_name="dbo", table_name=f"Table{t}")
+                for identifier in identifiers:
+                    Column(identifier=identifier, datatype=datatype, constrains=[], table=table)
+
+    # Reflected CREATE TABLE statements, the referenced table is created before the referencing one
+    definitions = ", ".join(f"c{c} VARCHAR(20) NOT NULL" for c in range(columns))
+    asts = [adapt_ast(sqlglot.parse_one(f"CREATE TABLE Table{t} (id INTEGER PRIMARY KEY, {definitions}"
+                                        f"{f', FOREIGN KEY (c0) REFERENCES Table{t - 1} (id)' if t else ''})"))
+            for t in range(statements)]
+
+    def apply_statements(bulk_load: bool) -> None:
+        database = Database("MemoryDB").set_default_scheme()
+        with database.bulk_load() if bulk_load else contextlib.nullcontext():
+            for ast in asts:
+                create_table(ast=ast, mem_rep=database)
+
+    per_object = measure(create_objects, False, repeat=3)
+    bulk = measure(create_objects, True, repeat=3)
+    statements_per_object = measure(apply_statements, False)
+    statements_bulk = measure(apply_statements, True)
+
+    report("bulk_loading",
+           columns=tables * columns, per_object_s=per_object, bulk_s=bulk, speedup=per_object / bulk,
+           statements=statements, statements_per_object_s=statements_per_object, statements_bulk_s=statements_bulk)
+
+
+
+@benchmark
+def catalog_snapshots(tables: int = 1000, columns: int = 100, changes: int = 100) -> None:
+    """
+    Copy-on-write snapshot of a large catalog compared to a pickle copy
+    """
+
+    import pickle
+
+    database = create_catalog(tables, columns)
+
+    start = time.perf_counter()
+    snapshot = database.snapshot()
+    snapshot_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pickle.loads(pickle.dumps(database, protocol=pickle.HIGHEST_PROTOCOL))
+    pickle_time = time.perf_counter() - start
+
+    # Each change copies only the changed table and its schema
+    start = time.perf_counter()
+    for t in range(changes):
+        database.schemas["dbo"].tables[f"Table{t}"].delete_table()
+    changes_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    snapshot.materialize()
+    materialize_time = time.perf_counter() - start
+
+    report("catalog_snapshots",
+           columns=tables * columns, snapshot_s=snapshot_time, pickle_copy_s=pickle_time,
+           changes=changes, saved_states=len(snapshot.states), changes_s=changes_time,
+           materialize_s=materialize_time)
+
+
+@benchmark
+def catalog_serialization(tables: int = 1000, columns: int = 100) -> None:
+    """
+    Save and load of a large catalog in the catalog file format compared to pickle used by previous versions
+    """
+
+    import io
+    import pickle
+
+    from sql_code_analyzer.in_memory_representation.tools import serialization
+
+    database = create_catalog(tables, columns)
+
+    results = {}
+    for name, dump, load in (("pickle", pickle.dump, pickle.load),
+                             ("catalog", serialization.dump, lambda file: serialization.load(file, lazy=False))):
+        results[f"{name}_save_s"] = measure(lambda: dump(database, io.BytesIO()))
+
+        file = io.BytesIO()
+        dump(database, file)
+        results[f"{name}_mb"] = len(file.getvalue()) / 1024 / 1024
+        results[f"{name}_load_s"] = measure(lambda: load(io.BytesIO(file.getvalue())))
+
+    report("catalog_serialization", columns=tables * columns, **results)
+
+
+@benchmark
+def catalog_lazy_loading(schemas: int = 400, tables: int = 25, columns: int = 10, used: int = 3) -> None:
+    """
+    Startup of a catalog with many schemas when only few schemas are used
+    """
+
+    import io
+
+    from sql_code_analyzer.in_memory_representation.tools import serialization
+
+    file = io.BytesIO()
+    serialization.dump(create_catalog(tables, columns, schemas), file)
+
+    def load(lazy: bool) -> None:
+        database = serialization.load(io.BytesIO(file.getvalue()), lazy=lazy)
+        for s in range(1, used + 1):
+            database.get_table_by_name_or_error(schema_name=f"s{s}", table_name="Table0")
+
+    report("catalog_lazy_loading",
+           schemas=schemas, used=used, columns=schemas * tables * columns,
+           eager_s=measure(load, False, repeat=3), lazy_s=measure(load, True, repeat=3))
+
+
+@benchmark
+def catalog_journal(tables: int = 1000, columns: int = 100, changes: int = 10) -> None:
+    """
+    Save of few changes of a large catalog as a journal record compared to a rewrite of the catalog file
+    """
+
+    from sqlglot import expressions as exp
+
+    from sql_code_analyzer.in_memory_representation.struct.column import Column
+    from sql_code_analyzer.in_memory_representation.tools import serialization
+    from sql_code_analyzer.in_memory_representation.tools.journal import CatalogJournal, get_journal_path
+
+    database = create_catalog(tables, columns)
+    datatype = database.schemas["dbo"].tables["Table0"].columns["column0"].datatype
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "catalog.bin"
+        with open(path, "wb") as f:
+            serialization.dump(database, f)
+
+        journal = CatalogJournal(database=database, path=path)
+        for t in range(changes):
+            table = database.create_table(database=database, schema_name="dbo", table_name=f"New{t}")
+            Column(identifier=exp.to_identifier("id"), datatype=datatype, constrains=[], table=table)
+
+        journal_time = measure(journal.close)
+        journal_size = get_journal_path(path=path).stat().st_size
+
+        def rewrite() -> None:
+            with open(path, "wb") as file:
+                serialization.dump(database, file)
+                file.flush()
+                os.fsync(file.fileno())
+
+        rewrite_time = measure(rewrite)
+
+    report("catalog_journal",
+           columns=tables * columns, changes=changes, journal_s=journal_time, journal_bytes=journal_size,
+           rewrite_s=rewrite_time)
+
+
+@benchmark
+def shared_catalog(workers: int = 8, schemas: int = 100, tables: int = 25, columns: int = 20, used: int = 2) -> None:
+    """
+    Startup and memory of worker processes which get a pickled copy of memory representation
+    compared to workers which attach the shared read-only catalog
+    """
+
+    import multiprocessing
+    import pickle
+    from concurrent.futures import ProcessPoolExecutor
+
+    from sql_code_analyzer.in_memory_representation.tools.shared_catalog import SharedCatalog, attach
+
+    database = create_catalog(tables, columns, schemas)
+    schema_names = ["dbo", *(f"s{s}" for s in range(1, schemas))]
+
+    # Spawned workers do not inherit memory of this process, so their memory can be compared
+    context = multiprocessing.get_context("spawn")
+
+    def run(load, export) -> tuple:
+        barrier = context.Barrier(workers)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_catalog_worker, initargs=(barrier,)) as pool:
+            # Workers are started before measurement
+            for future in [pool.submit(_measure_catalog_worker) for _ in range(workers)]:
+                future.result()
+
+            start = time.perf_counter()
+            data = export()
+            futures = [pool.submit(_load_catalog_worker, load, data,
+                                   [(schema_names[(w * used + u) % schemas], "Table0") for u in range(used)])
+                       for w in range(workers)]
+            for future in futures:
+                future.result()
+            startup = time.perf_counter() - start
+
+            memory = [pool.submit(_measure_catalog_worker) for _ in range(workers)]
+            private, shared = zip(*(future.result() for future in memory))
+
+        return startup, sum(private), max(shared)
+
+    pickle_startup, pickle_private, _ = run(pickle.loads,
+                                            lambda: pickle.dumps(database, protocol=pickle.HIGHEST_PROTOCOL))
+
+    catalog = SharedCatalog()
+    try:
+        shared_startup, shared_private, shared_resident = run(attach, lambda: catalog.export(database=database))
+        shared_file = catalog.path.stat().st_size / 1024 / 1024
+    finally:
+        catalog.close()
+
+    # Only the pages of used segments of the shared file are resident
+    report("shared_catalog",
+           workers=workers, columns=schemas * tables * columns, used_schemas=used,
+           pickle_startup_s=pickle_startup, pickle_private_mb=pickle_private,
+           shared_startup_s=shared_startup, shared_private_mb=shared_private,
+           shared_file_mb=shared_file, shared_resident_mb=shared_resident)
+
+
+
+@benchmark
+def catalog_storage(tables: int = 10000, columns: int = 20, cache_size: int = 500, hot: int = 200,
+                    lookups: int = 100000, cold: int = 1000) -> None:
+    """
+    Memory of a catalog kept in an SQLite catalog storage compared to the whole catalog in memory,
+    speed of lookups of loaded (hot) tables and of loading of released (cold) tables
+    """
+
+    from sql_code_analyzer.in_memory_representation.tools.sqlite_storage import open_database
+
+    memory_start = time.perf_counter()
+    database, memory_mb = measure_memory(create_catalog, tables, columns)
+    memory_build = time.perf_counter() - memory_start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "catalog.db"
+
+        storage_start = time.perf_counter()
+        stored, storage_mb = measure_memory(create_catalog, tables, columns,
+                                            database=open_database(path=path, cache_size=cache_size))
+        stored.storage.flush()
+        storage_build = time.perf_counter() - storage_start
+
+        keys = [(f"Table{i % hot}", f"column{i % columns}") for i in range(lookups)]
+
+        def lookup(lookup_database) -> None:
+            for table_name, column_name in keys:
+                table = lookup_database.get_table_by_name_or_error(schema_name="dbo", table_name=table_name)
+                table.columns[column_name].datatype.column_datatype
+
+        # Hot tables are loaded by the first run
+        memory_lookup = measure(lookup, database, repeat=3)
+        storage_lookup = measure(lookup, stored, repeat=3)
+
+        def load_cold() -> None:
+            for t in range(cold):
+                stored.get_table_by_name_or_error(schema_name="dbo", table_name=f"Table{tables // 2 + t}")
+                stored.release_tables()
+
+        cold_load = measure(load_cold)
+        file_mb = path.stat().st_size / 1024 / 1024
+        stored.storage.close()
+
+    report("catalog_storage",
+           columns=tables * columns, cache_size=cache_size,
+           memory_mb=memory_mb, memory_build_s=memory_build, memory_lookup_s=memory_lookup,
+           storage_mb=storage_mb, storage_build_s=storage_build, storage_lookup_s=storage_lookup,
+           storage_file_mb=file_mb, cold_load_ms=cold_load / cold * 1000)
+
+
+
+@benchmark
+def catalog_checkpoint(tables: int = 1000, columns: int = 100) -> None:
+    """
+    Cost of one checkpoint of a lint run with a large catalog, paid once per checkpoint interval
+    """
+
+    import io
+
+    from sql_code_analyzer.in_memory_representation.tools import serialization
+    from sql_code_analyzer.linter.checkpoint import Checkpoint, Checkpointer, load_checkpoint
+
+    database = create_catalog(tables, columns)
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpointer = Checkpointer(path=Path(directory) / "run.ckp", interval=1, interval_time=None)
+
+        def write() -> None:
+            buffer = io.BytesIO()
+            serialization.dump(database, buffer)
+            checkpointer.write(checkpoint=Checkpoint(next_statement=1, input_checksum=0, catalog=buffer.getvalue(),
+                                                     rules={}, reports=[], parse_error_occurred=False))
+
+        write_time = measure(write, repeat=3)
+        load_time = measure(load_checkpoint, checkpointer.path, repeat=3)
+        size = checkpointer.path.stat().st_size / 1024 / 1024
+
+    report("catalog_checkpoint",
+           columns=tables * columns, write_s=write_time, load_s=load_time, size_mb=size)
+
+
+@benchmark
+def lint_cache(tables: int = 200, selects: int = 2000) -> None:
+    """
+    Run without the lint cache, the first run which fills it and the next run of unchanged code
+    """
+
+    sql = ""
+    for i in range(tables):
+        sql += f"CREATE TABLE Table{i} (id INTEGER PRIMARY KEY, name VARCHAR(35), value NUMBER(10, 2));\n"
+    for i in range(selects):
+        sql += f"SELECT a.name, b.value, missing_{i} FROM Table{i % tables} a " \
+               f"JOIN Table{(i + 1) % tables} b ON a.id = b.id WHERE a.id > {i};\n"
+
+    with tempfile.TemporaryDirectory() as directory:
+        arguments = ("-lcf", "lint.cache", "-lcp", directory)
+        uncached = measure(run_linter, sql)
+        cold = measure(run_linter, sql, *arguments)
+        warm = measure(run_linter, sql, *arguments, repeat=3)
+        size = (Path(directory) / "lint.cache").stat().st_size / 1024 / 1024
+
+    report("lint_cache",
+           statements=tables + selects,
+           uncached_s=uncached, cold_s=cold, warm_s=warm, speedup=uncached / warm, size_mb=size)
+
+
+@benchmark
+def catalog_structural_hash(tables: int = 1000, columns: int = 100, changes: int = 100) -> None:
+    """
+    Structural hash of the whole catalog, of the unchanged catalog and after a change of one table
+    """
+
+    import sqlglot
+
+    from sql_code_analyzer.in_memory_representation.actions.modify_representation.table.create_table import \
+        create_table
+
+    database = create_catalog(tables, columns)
+    full = measure(database.get_structural_hash)
+    unchanged = measure(database.get_structural_hash)
+
+    def change() -> None:
+        for i in range(changes):
+            create_table(ast=sqlglot.parse_one(f"CREATE TABLE Changed{i} (id INTEGER)"), mem_rep=database)
+            database.get_structural_hash()
+
+    changed = measure(change) / changes
+
+    report("catalog_structural_hash",
+           columns=tables * columns, full_s=full, unchanged_s=unchanged, after_change_s=changed,
+           speedup=full / changed)
+
+
+@benchmark
+def catalog_diff(tables: int = 1000, columns: int = 100, changes: int = 10) -> None:
+    """
+    Diff of a production catalog and the catalog after a migration which changed a few tables,
+    compared with comparison of definitions of all tables
+    """
+
+    import io
+
+    import sqlglot
+
+    from sql_code_analyzer.in_memory_representation.actions.modify_representation.table.create_table import \
+        create_table
+    from sql_code_analyzer.in_memory_representation.struct.constrain import Index
+    from sql_code_analyzer.in_memory_representation.tools import serialization
+    from sql_code_analyzer.in_memory_representation.tools.catalog_diff import diff_catalogs, get_table_definition
+
+    buffer = io.BytesIO()
+    serialization.dump(create_catalog(tables, columns), buffer)
+    old = serialization.loads(data=buffer.getvalue(), lazy=False)
+    new = serialization.loads(data=buffer.getvalue(), lazy=False)
+
+    # Hashes of the loaded catalogs are computed once, later runs keep them up to date
+    hashing = measure(lambda: (old.get_structural_hash(), new.get_structural_hash()))
+
+    schema = new.schemas["dbo"]
+    for i in range(changes):
+        table = schema.tables[f"Table{i}"]
+        table.add_index(Index(name=f"index{i}", columns=[table.columns["column0"]]))
+        create_table(ast=sqlglot.parse_one(f"CREATE TABLE Added{i} (id INTEGER)"), mem_rep=new)
+
+    found = []
+    diff = measure(lambda: found.append(diff_catalogs(old=old, new=new)), repeat=3)
+
+    def compare_all() -> None:
+        old_tables = old.schemas["dbo"].tables
+        for name, table in schema.tables.items():
+            if name not in old_tables or get_table_definition(table) != get_table_definition(old_tables[name]):
+                pass
+
+    full = measure(compare_all)
+
+    report("catalog_diff",
+           columns=tables * columns, changes=len(found[0]), first_hash_s=hashing, diff_s=diff,
+           full_comparison_s=full, speedup=full / diff)
+
+
+@benchmark
+def schema_import(tables: int = 2000, columns: int = 20) -> None:
+    """
+    Bootstrap of a catalog from a schema description file (information_schema rows as JSON)
+    compared with generating CREATE TABLE statements and applying them in bulk load mode
+    """
+
+    import json
+
+    import sqlglot
+
+    from sql_code_analyzer.adapter.adapt_ast import adapt_ast
+    from sql_code_analyzer.in_memory_representation.actions.modify_representation.table.create_table import \
+        create_table
+    from sql_code_analyzer.in_memory_representation.struct.database import Database
+    from sql_code_analyzer.in_memory_representation.tools.catalog_diff import diff_catalogs
+    from sql_code_analyzer.in_memory_representation.tools.schema_import import import_schema_description, \
+        read_schema_description
+
+    # The referenced table is created before the referencing one
+    definitions = ", ".join(f"c{c} VARCHAR(20) NOT NULL" for c in range(columns))
+    statements = [f"CREATE TABLE Table{t} (id INTEGER PRIMARY KEY, {definitions}"
+                  f"{f', FOREIGN KEY (c0) REFERENCES Table{t - 1} (id)' if t else ''})" for t in range(tables)]
+
+    description = {"columns": [], "constraints": []}
+    for t in range(tables):
+        description["columns"].append({"table_name": f"Table{t}", "column_name": "id", "ordinal_position": 1,
+                                       "data_type": "INTEGER", "is_nullable": "YES"})
+        description["columns"] += [{"table_name": f"Table{t}", "column_name": f"c{c}", "ordinal_position": c + 2,
+                                     "data_type": "VARCHAR", "character_maximum_length": 20, "is_nullable": "NO"}
+                                    for c in range(columns)]
+        description["constraints"].append({"table_name": f"Table{t}", "constraint_type": "PRIMARY KEY",
+                                           "column_name": "id"})
+        if t:
+            description["constraints"].append({"table_name": f"Table{t}", "constraint_type": "FOREIGN KEY",
+                                               "constraint_name": f"fk{t}", "column_name": "c0",
+                                               "referenced_table_name": f"Table{t - 1}",
+                                               "referenced_column_name": "id"})
+
+    databases = {}
+
+    def apply_statements() -> None:
+        database = databases["ddl"] = Database("MemoryDB").set_default_scheme()
+        with database.bulk_load():
+            for statement in statements:
+                create_table(ast=adapt_ast(sqlglot.parse_one(statement)), mem_rep=database)
+
+    def import_description(path: Path) -> None:
+        database = databases["import"] = Database("MemoryDB").set_default_scheme()
+        import_schema_description(database=database, description=read_schema_description(paths=[path]))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "schema.json"
+        path.write_text(json.dumps(description))
+
+        ddl = measure(apply_statements)
+        imported = measure(import_description, path)
+
+    # Both catalogs differ only in arguments of CREATE statement of tables and in names of foreign keys
+    differences = {change["object"] for change in diff_catalogs(old=databases["ddl"], new=databases["import"])}
+
+    report("schema_import",
+           columns=tables * (columns + 1), ddl_s=ddl, import_s=imported, speedup=ddl / imported,
+           differences=",".join(sorted(differences)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*", help="Benchmarks to run. Available: " + ", ".join(BENCHMARKS))
+    names = parser.parse_args().names or list(BENCHMARKS)
+
+    for name in names:
+        BENCHMARKS[name]()
@@ -1,14 +1,99 @@
+import gc
+import io
+import json
+import os
+import pickle
+import re
+import subprocess
+import sys
+import tempfile
 import unittest
+import weakref
 from pathlib import Path
 
 import sqlglot
+from sqlglot import Tokenizer
 
+from sql_code_analyzer.adapter.adapt_ast import adapt_ast
+from sql_code_analyzer.checker.rules.index.MissingIndex_If_ForeignKey import MissingFKIndex
+from sql_code_analyzer.checker.tools.rules_handler import CRules
+from sql_code_analyzer.in_memory_representation.actions.modify_representation.index.create_index import create_index
+from sql_code_analyzer.in_memory_representation.actions.modify_representation.index.drop_index import drop_index
+from sql_code_analyzer.in_memory_representation.actions.modify_representation.schema.create_schema import \
+    create_schema
+from sql_code_analyzer.in_memory_representation.actions.modify_representation.table.create_table import create_table
 from sql_code_analyzer.in_memory_representation.struct.column import Column
-from sql_code_analyzer.in_memory_representation.struct.constrain import PrimaryKey, Constrain
+from sql_code_analyzer.in_memory_representation.struct.constrain import PrimaryKey, Constrain, PreventNotNull, Index, \
+    ForeignKey
 from sql_code_analyzer.in_memory_representation.struct.database import Database
 from sql_code_analyzer.in_memory_representation.struct.datatype import Datatype
 from sql_code_analyzer.in_memory_representation.struct.schema import Schema
+from sql_code_analyzer.in_memory_representation.struct.table import Table
+from sql_code_analyzer.in_memory_representation.exceptions import CatalogFormatError
+from sql_code_analyzer.in_memory_representation.tools import interning, serialization
+from sql_code_analyzer.in_memory_representation.tools.catalog_diff import diff_catalogs
+from sql_code_analyzer.in_memory_representation.tools.interning import get_datatype, get_literal
+from sql_code_analyzer.in_memory_representation.tools.journal import CatalogJournal, LiveReplayer, get_changes, \
+    get_journal_path
+from sql_code_analyzer.in_memory_representation.tools.schema_import import import_schema_description, \
+    read_schema_description
+from sql_code_analyzer.in_memory_representation.tools.shared_catalog import SharedCatalog, attach
+from sql_code_analyzer.in_memory_representation.tools.sqlite_storage import open_database
+from sql_code_analyzer.linter.checkpoint import Checkpoint, Checkpointer, get_input_checksum, get_rule_key, \
+    load_checkpoint
+from sql_code_analyzer.linter.lint_cache import LintCache
+from sql_code_analyzer.linter.linter import Linter
+from sql_code_analyzer.linter.parallel import ParallelLinter, SchemaPartitionLinter, dump_partition, load_partition
+from sql_code_analyzer.output.reporter.program_reporter import ProgramReporter
+from sql_code_analyzer.output.reporter.rule_reporter import RuleReporter
 from sql_code_analyzer.tools.path import get_absolute_path, get_path_object
+from sql_code_analyzer.visitor.rules_visitor import RulesVisitor
+from sql_code_analyzer.visitor.scope import ScopeResolver, Source, SourceKind
+
+# Files made from LEGACY_STATEMENTS by previous versions of program
+TEST_DATA_PATH = Path(__file__).resolve().parent / "data"
+LEGACY_STATEMENTS = ((create_schema, "CREATE SCHEMA sales"),
+                     (create_table, "CREATE TABLE A (id INTEGER PRIMARY KEY, "
+                                    "name VARCHAR(35) NOT NULL DEFAULT 'x', code NUMBER(10, 2), UNIQUE (code))"),
+                     (create_table, "CREATE TABLE sales.B (id INTEGER, a_id INTEGER, CHECK (id > 0))"),
+                     (create_table, "CREATE TABLE C (id INTEGER, a_id INTEGER, FOREIGN KEY (a_id) REFERENCES A (id))"),
+                     (create_index, "CREATE INDEX ix ON C (a_id, id)"))
+
+
+# The program is run as a script from the project root
+PROJECT_PATH = Path(__file__).resolve().parent.parent
+PROGRAM_PATH = PROJECT_PATH / "sql_code_analyzer" / "main.py"
+RULES_PATH = PROJECT_PATH / "sql_code_analyzer" / "checker" / "rules"
+
+
+def run_program(*args) -> str:
+    """
+    Return output of the program run with the arguments, without colors
+    """
+
+    result = subprocess.run([sys.executable, str(PROGRAM_PATH), *args],
+                            stdin=subprocess.DEVNULL, capture_output=True, text=True, cwd=PROJECT_PATH,
+                            env={**os.environ, "PYTHONPATH": str(PROJECT_PATH)})
+    return re.sub(r"\x1b\[[0-9;]*m", "", result.stdout)
+
+
+def get_report_lines(output: str) -> list:
+    """
+    Return (line, report name) of rule reports in the program output
+    """
+
+    return [(int(line), name) for line, name in re.findall(r"L: (\d+) C: \d+ +--> +\[([\w-]+)\]", output)]
+
+
+def create_legacy_database() -> Database:
+    """
+    Return memory representation created from LEGACY_STATEMENTS by the current version of program
+    """
+
+    database = Database("MemoryDB").set_default_scheme()
+    for modify_representation, statement in LEGACY_STATEMENTS:
+        modify_representation(ast=adapt_ast(sqlglot.parse_one(statement)), mem_rep=database)
+    return database
 
 
 class TestPath(unittest.TestCase):
@@ -35,6 +120,69 @@ class TestPath(unittest.TestCase):
         self.assertEqual(cm.exception.code, -1)
 
 
+class TestRulesHandler(unittest.TestCase):
+
+    RULE = ("from sql_code_analyzer.checker.rules.base import BaseRule\n\n\n"
+            "class {name}(BaseRule):\n"
+            "    messages = {{}}\n\n\n"
+            "def register(checker) -> None:\n"
+            "    checker.register_rule({name})\n")
+
+    def _write_rule(self, path: Path, name: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.RULE.format(name=name))
+
+    def test_rule_sources(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+
+            # Rules folder
+            rules_path = directory / "rules"
+            self._write_rule(path=rules_path / "naming" / "folder_naming.py", name="FolderNaming")
+            self._write_rule(path=rules_path / "index" / "folder_index.py", name="FolderIndex")
+
+            # Installed rule package registered by an entry point of its distribution
+            site_path = directory / "site"
+            package_path = site_path / "test_rule_package"
+            for folder in ("naming", "index"):
+                (package_path / folder).mkdir(parents=True)
+                (package_path / folder / "__init__.py").write_text("")
+            (package_path / "__init__.py").write_text("")
+            self._write_rule(path=package_path / "naming" / "package_naming.py", name="PackageNaming")
+            self._write_rule(path=package_path / "index" / "package_index.py", name="PackageIndex")
+
+            metadata_path = site_path / "test_rule_package-1.0.dist-info"
+            metadata_path.mkdir()
+            (metadata_path / "METADATA").write_text("Metadata-Version: 2.1\nName: test-rule-package\nVersion: 1.0\n")
+            (metadata_path / "entry_points.txt").write_text(f"[{CRules.entry_point_group}]\n"
+                                                            "test_rules = test_rule_package\n")
+
+            sys.path.insert(0, str(site_path))
+            try:
+                def get_rule_names(**kwargs) -> list:
+                    rules_args_data = CRules(path_to_rules_folder=str(rules_path), **kwargs)
+                    rules_visitor = RulesVisitor(rules_args_data=rules_args_data, mem_rep=None)
+                    return sorted(type(rule).__name__ for rule in rules_visitor.normal_rules)
+
+                self.assertEqual(get_rule_names(include_folders=[], exclude_folders=[]),
+                                 ["FolderIndex", "FolderNaming", "PackageIndex", "PackageNaming"])
+                self.assertEqual(get_rule_names(include_folders=["naming"], exclude_folders=[]),
+                                 ["FolderNaming", "PackageNaming"])
+                self.assertEqual(get_rule_names(include_folders=[], exclude_folders=["naming"]),
+                                 ["FolderIndex", "PackageIndex"])
+                self.assertEqual(get_rule_names(include_folders=[], exclude_folders=[], use_rule_packages=False),
+                                 ["FolderIndex", "FolderNaming"])
+
+                rules_args_data = CRules(include_folders=["index"], exclude_folders=[],
+                                         path_to_rules_folder=str(rules_path))
+                self.assertEqual(rules_args_data.modules, ["test_rule_package.index.package_index"])
+
+            finally:
+                sys.path.remove(str(site_path))
+                for name in [name for name in sys.modules if name.startswith("test_rule_package")]:
+                    del sys.modules[name]
+
+
 class DatabaseObject(unittest.TestCase):
 
     def test_database_initialisation(self):
@@ -194,3 +342,941 @@ class DatabaseObject(unittest.TestCase):
 
         self.assertEqual(len(col1.constrains), 0)
 
+
+class TestPlainArgs(unittest.TestCase):
+
+    class ExpressionFinder(pickle.Pickler):
+        """
+        Collects nodes of abstract syntax tree reachable from the pickled object
+        """
+
+        def __init__(self, file):
+            super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.expressions = []
+
+        def persistent_id(self, obj):
+            if isinstance(obj, sqlglot.Expression):
+                self.expressions.append(obj)
+            return None
+
+    def test_no_expressions_in_catalog(self):
+        database = Database("MemoryDB").set_default_scheme()
+        for statement in ("CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35) NOT NULL DEFAULT 'x', "
+                          "code NUMBER(10, 2), UNIQUE (code))",
+                          "CREATE TABLE B (id INTEGER, a_id INTEGER, CHECK (id > 0), "
+                          "FOREIGN KEY (a_id) REFERENCES A (id))"):
+            create_table(ast=adapt_ast(sqlglot.parse_one(statement)), mem_rep=database)
+        create_index(ast=adapt_ast(sqlglot.parse_one("CREATE INDEX ix ON B (a_id, id)")), mem_rep=database)
+
+        finder = self.ExpressionFinder(io.BytesIO())
+        finder.dump(database)
+        self.assertEqual(finder.expressions, [])
+
+        table_a = database.get_table_by_name_or_error(schema_name="", table_name="A")
+        self.assertEqual(table_a.columns["code"].datatype.literals[0].value, "10")
+
+        # Abstract syntax tree of the statement is not referenced after memory representation is changed
+        ast = adapt_ast(sqlglot.parse_one("CREATE TABLE D (id INTEGER NOT NULL DEFAULT 1, name VARCHAR(35))"))
+        ast_ref = weakref.ref(ast)
+        create_table(ast=ast, mem_rep=database)
+        del ast
+        gc.collect()
+        self.assertIsNone(ast_ref())
+
+
+class TestInterning(unittest.TestCase):
+
+    def test_shared_datatypes(self):
+        ast = sqlglot.parse_one("CREATE TABLE Table1 (a VARCHAR(255), b VARCHAR(255), c VARCHAR(20))")
+        datatypes = [get_datatype(node=node, literals=[get_literal(node=literal) for literal in node.expressions])
+                     for node in ast.find_all(sqlglot.exp.DataType)]
+
+        self.assertIs(datatypes[0], datatypes[1])
+        self.assertIsNot(datatypes[0], datatypes[2])
+        self.assertEqual(datatypes[2].literals[0].value, "20")
+
+    def test_released_datatypes(self):
+        # Datatypes and literals are forgotten with the last memory representation which uses them
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id NUMBER(31, 7))"), mem_rep=database)
+        datatype = database.schemas["dbo"].tables["A"].columns["id"].datatype
+        key = datatype.get_key()
+        self.assertIs(interning._datatypes.get(key), datatype)
+
+        del database, datatype
+        gc.collect()
+        self.assertEqual(key in interning._datatypes, False)
+        self.assertEqual(any(literal_key[0] == "31" for literal_key in interning._literals.keys()), False)
+
+
+class TestScopeResolver(unittest.TestCase):
+
+    def test_scope_resolution(self):
+        database = Database("MemoryDB").set_default_scheme()
+        table1 = database.create_table(database=database, schema_name="dbo", table_name="Table1")
+        table2 = database.create_table(database=database, schema_name="dbo", table_name="Table2")
+        table1.columns = {"id": None, "name": None}
+        table2.columns = {"id": None, "t1": None}
+
+        ast = sqlglot.parse_one("SELECT a.name, b.t1, x.name, b.name, note FROM Table1 a "
+                                "JOIN Table2 b ON a.id = b.t1 "
+                                "JOIN (SELECT name FROM Table1) x ON 1 = 1, Missing")
+        resolver = ScopeResolver(mem_rep=database)
+
+        visible = {column.sql(): resolver.is_column_visible(column) for column in ast.expressions}
+        self.assertEqual(visible, {"a.name": True, "b.t1": True, "x.name": True, "b.name": False, "note": False})
+
+        # Aliased table is visible only by its alias
+        column = sqlglot.parse_one("SELECT Table1.id FROM Table1 a").expressions[0]
+        self.assertEqual(resolver.is_column_alias_visible(column), False)
+
+        missing = [source.name for source in resolver.get_scope(ast).sources.values() if source.is_missing_table]
+        self.assertEqual(missing, ["Missing"])
+
+    def test_column_sources(self):
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE Table1 (id INTEGER, name VARCHAR(35))"), mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE Table2 (id INTEGER, t1 INTEGER)"), mem_rep=database)
+
+        ast = sqlglot.parse_one("SELECT id, name, t1, note FROM Table1 a JOIN Table2 b ON a.id = b.t1 "
+                                "JOIN (SELECT * FROM Table1) x ON 1 = 1 JOIN Table1 c ON c.id = a.id")
+        resolver = ScopeResolver(mem_rep=database)
+        scope = resolver.get_scope(ast)
+
+        # Sources with unknown columns provide every column and they are the last candidates
+        self.assertEqual([source.name for source in scope.find_column_sources("id")], ["a", "b", "c", "x"])
+        self.assertEqual([source.name for source in scope.find_column_sources("name")], ["a", "c", "x"])
+        self.assertEqual([source.name for source in scope.find_column_sources("note")], ["x"])
+
+        # Each table is looked up once per statement
+        self.assertEqual(sorted(resolver.tables), [("", "Table1"), ("", "Table2")])
+
+        # A new source is included in the map
+        scope.add_source(Source(name="y", node=None, kind=SourceKind.Subquery, columns={"note"}))
+        self.assertEqual([source.name for source in scope.find_column_sources("note")], ["y", "x"])
+
+
+class TestDropIndex(unittest.TestCase):
+
+    def test_schema_scoped_drop(self):
+        reporter = RuleReporter()
+        database = Database("MemoryDB").set_default_scheme()
+        Schema(database=database, schema_name="s1")
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE s1.A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+        create_index(ast=sqlglot.parse_one("CREATE INDEX ix ON A (id)"), mem_rep=database)
+        table_a = database.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_s1 = database.get_table_by_name_or_error(schema_name="s1", table_name="A")
+        table_s1.add_index(index=Index(name="ix", columns=[table_s1.columns["id"]]))
+
+        # The index with the same name in another schema is kept
+        drop_index(ast=sqlglot.parse_one("DROP INDEX s1.ix"), mem_rep=database)
+        self.assertEqual(list(table_s1.indexes), [])
+        self.assertEqual(table_s1.verify_columns_indexed(["id"]), False)
+        self.assertEqual(database.get_index_owners(schema_name="s1", index_name="ix"), [])
+        self.assertEqual(database.get_index_owners(schema_name="dbo", index_name="ix"), [table_a])
+        self.assertEqual(reporter.reports, [])
+
+        drop_index(ast=sqlglot.parse_one("DROP INDEX IF EXISTS s1.ix"), mem_rep=database)
+        self.assertEqual(reporter.reports, [])
+
+        drop_index(ast=sqlglot.parse_one("DROP INDEX s1.ix"), mem_rep=database)
+        self.assertEqual(len(reporter.reports), 1)
+        self.assertIn("The index does not exists in the schema s1.", reporter.reports[0][1])
+
+        # Index name without schema is looked up in the default schema
+        drop_index(ast=sqlglot.parse_one("DROP INDEX ix"), mem_rep=database)
+        self.assertEqual(list(table_a.indexes), [])
+        self.assertEqual(database.get_index_owners(schema_name="dbo", index_name="ix"), [])
+        self.assertEqual(len(reporter.reports), 1)
+
+
+class TestCatalogQuery(unittest.TestCase):
+
+    def test_secondary_indexes(self):
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35))"),
+                     mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE B (a_id INTEGER NOT NULL, name VARCHAR(20), "
+                                           "FOREIGN KEY (a_id) REFERENCES A (id))"),
+                     mem_rep=database)
+        table_a = database.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_b = database.get_table_by_name_or_error(schema_name="", table_name="B")
+        query = database.query
+
+        self.assertEqual(len(query.get_columns_by_datatype(sqlglot.exp.DataType.Type.VARCHAR)), 2)
+        self.assertEqual([column.table for column in query.get_columns_by_name("name")], [table_a, table_b])
+        self.assertEqual(query.get_tables_without_primary_key(), [table_b])
+        self.assertEqual(len(query.get_constrains(PreventNotNull)), 1)
+        self.assertEqual(query.get_referencing_tables(table_a), [table_b])
+        self.assertEqual(query.get_referenced_tables(table_b), [table_a])
+
+        # Deleted objects disappear from all indexes
+        table_b.delete_cascade().delete_table()
+        self.assertEqual(query.get_referencing_tables(table_a), [])
+        self.assertEqual(query.get_tables_without_primary_key(), [])
+        self.assertEqual(query.get_constrains(PreventNotNull), [])
+        self.assertEqual(len(query.get_columns_by_name("name")), 1)
+
+    def test_bulk_load(self):
+        database = Database("MemoryDB").set_default_scheme()
+        with database.bulk_load():
+            create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+            create_table(ast=sqlglot.parse_one("CREATE TABLE B (a_id INTEGER, FOREIGN KEY (a_id) REFERENCES A (id))"),
+                         mem_rep=database)
+            self.assertEqual(len(database.object_index), 1)
+
+            # A duplicate table is refused like outside the bulk load
+            table_b = database.schemas["dbo"].tables["B"]
+            Table(name="B", schema=database.schemas["dbo"], database=database)
+            self.assertIs(database.schemas["dbo"].tables["B"], table_b)
+
+        # Indexes are built when the bulk load ends
+        table_a = database.object_index[("dbo", "A")]
+        self.assertEqual(len(database.object_index), 5)
+        self.assertEqual(database.dependencies.get_referencing_tables(table_a), [table_b])
+        self.assertEqual(database.query.get_referencing_tables(table_a)[0].name, "B")
+        self.assertEqual([table.name for table in database.query.get_tables_without_primary_key()], ["B"])
+
+    def test_lazy_catalog(self):
+        database = create_legacy_database()
+        file = io.BytesIO()
+        serialization.dump(database, file)
+
+        # Queries materialize the schemas which were not loaded yet
+        loaded = serialization.loads(data=file.getvalue())
+        self.assertEqual(sorted((table.schema.name, table.name)
+                                for table in loaded.query.get_tables_without_primary_key()),
+                         [("dbo", "C"), ("sales", "B")])
+        self.assertEqual(loaded.lazy_schemas, {})
+
+        loaded = serialization.loads(data=file.getvalue())
+        self.assertEqual(sorted(column.table.name for column in loaded.query.get_columns_by_name("a_id")), ["B", "C"])
+
+        loaded = serialization.loads(data=file.getvalue())
+        self.assertEqual(("sales", "B", "a_id") in loaded.object_index, True)
+        self.assertEqual(list(loaded.lazy_schemas), ["dbo"])
+        self.assertEqual(len(loaded.object_index), len(database.object_index))
+        self.assertEqual(set(loaded.object_index), set(database.object_index))
+
+
+class TestDependencyGraph(unittest.TestCase):
+
+    def test_dependencies(self):
+        database = Database("MemoryDB").set_default_scheme()
+        for statement in ("CREATE TABLE A (id INTEGER PRIMARY KEY, parent INTEGER, "
+                          "FOREIGN KEY (parent) REFERENCES A (id))",
+                          "CREATE TABLE B (id INTEGER PRIMARY KEY, a_id INTEGER, FOREIGN KEY (a_id) REFERENCES A (id))",
+                          "CREATE TABLE C (id INTEGER PRIMARY KEY, b_id INTEGER, FOREIGN KEY (b_id) REFERENCES B (id))"):
+            create_table(ast=sqlglot.parse_one(statement), mem_rep=database)
+
+        schema = database.get_schema_by_name_or_error("")
+        table_a, table_b, table_c = schema.tables["A"], schema.tables["B"], schema.tables["C"]
+        dependencies = database.dependencies
+
+        self.assertEqual(dependencies.get_referencing_tables(table_a), [table_a, table_b])
+        self.assertEqual(dependencies.get_topological_order([table_c, table_b, table_a]), [table_a, table_b, table_c])
+        self.assertEqual(table_c.verify_can_be_deleted(), True)
+        self.assertEqual(table_b.verify_can_be_deleted(), False)
+
+        # Cascade deletes the foreign keys which reference the table
+        table_b.delete_cascade().delete_table()
+        self.assertEqual("B" in schema.tables, False)
+        self.assertEqual(dependencies.get_referencing_tables(table_a), [table_a])
+        self.assertEqual(dependencies.get_foreign_keys(table_c), [])
+        self.assertEqual(table_c.constrains, {})
+
+    def test_delete_table(self):
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE B (id INTEGER, a_id INTEGER, "
+                                           "FOREIGN KEY (a_id) REFERENCES A (id))"),
+                     mem_rep=database)
+        table_a = database.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_b = database.get_table_by_name_or_error(schema_name="", table_name="B")
+
+        # Deleting table removes also its columns from index and its foreign keys from dependency graph
+        table_b.delete_table()
+        self.assertEqual(("dbo", "B") in database.object_index, False)
+        self.assertEqual(("dbo", "B", "a_id") in database.object_index, False)
+        self.assertEqual(("dbo", "A", "id") in database.object_index, True)
+        self.assertEqual(len(database.object_index), 3)
+        self.assertEqual(database.dependencies.get_referencing_tables(table_a), [])
+        self.assertEqual(table_a.constrains, {})
+        self.assertEqual(table_a.verify_can_be_deleted(), True)
+
+
+class TestParallelLinter(unittest.TestCase):
+
+    def test_lint(self):
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35))"),
+                     mem_rep=database)
+        statements = [(f"SELECT name, bad{i} FROM A", i + 1) for i in range(7)]
+
+        # Worker processes get output settings of the program, they are set by its arguments
+        ProgramReporter.verbose = 0
+        rules_args_data = CRules(include_folders=[], exclude_folders=[], path_to_rules_folder=str(RULES_PATH),
+                                 use_rule_packages=False)
+        linter = ParallelLinter(jobs=3, rules_args_data=rules_args_data, dialect=None)
+        try:
+            reports, parse_error_occurred = linter.lint(statements=statements, mem_rep=database)
+        finally:
+            linter.shutdown()
+
+        # Chunks of workers are joined in input order
+        self.assertEqual(parse_error_occurred, False)
+        self.assertEqual([(statement[1], report.rule_name) for statement, report in reports],
+                         [(i + 1, "column-not-exists") for i in range(7)])
+        self.assertEqual([report.message for _, report in reports],
+                         [f"Column \"bad{i}\" not exists." for i in range(7)])
+
+    def test_same_reports_as_sequential(self):
+        statements = ["CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35));"]
+        statements += [f"SELECT name, bad{i} FROM A;" for i in range(70)]
+
+        # Modifying statements and statements linted by persistent rules are processed sequentially
+        statements.append("CREATE TABLE B (id INTEGER PRIMARY KEY, a_id INTEGER, FOREIGN KEY (a_id) REFERENCES A (id));")
+        statements += [f"SELECT a_id, bad{i} FROM B;" for i in range(70)]
+        statements.append("CREATE INDEX ix ON A (name);")
+        statements += [f"SELECT id, bad{i} FROM A JOIN B ON A.id = B.a_id;" for i in range(3)]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "input.sql"
+            path.write_text("\n".join(statements))
+            sequential = run_program("-f", str(path))
+            parallel = run_program("-f", str(path), "-j", "2")
+
+        report_lines = get_report_lines(sequential)
+        self.assertEqual(len(report_lines), 144)
+        self.assertEqual((72, "fk-index-not-exists") in report_lines, True)
+        self.assertEqual(parallel, sequential)
+
+    def test_plain_select_tokens(self):
+        # Plain queries are sent to workers without parsing, their root has to be SELECT
+        def check(statement):
+            return Linter._check_if_plain_select(tokens=Tokenizer().tokenize(statement))
+
+        self.assertEqual(check("SELECT id FROM A WHERE id IN (SELECT id FROM B UNION SELECT id FROM C)"), True)
+        self.assertEqual(check("SELECT id FROM A UNION SELECT id FROM B"), False)
+        self.assertEqual(check("(SELECT id FROM A)"), False)
+        self.assertEqual(check("CREATE TABLE A (id INTEGER)"), False)
+        self.assertEqual(check(""), False)
+
+
+class TestSchemaPartitionLinter(unittest.TestCase):
+
+    def test_process(self):
+        database = Database("MemoryDB").set_default_scheme()
+        Schema(database=database, schema_name="s2")
+        for name in ("dbo", "s2"):
+            create_table(ast=sqlglot.parse_one(f"CREATE TABLE {name}.A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+
+        statements = [("CREATE TABLE B (id INTEGER, a_id INTEGER, FOREIGN KEY (a_id) REFERENCES A (id))", 1, "dbo"),
+                      ("SELECT bad1 FROM s2.A", 2, "s2"),
+                      ("SELECT bad2 FROM B", 3, "dbo"),
+                      ("CREATE TABLE s2.C (id INTEGER)", 4, "s2"),
+                      ("SELECT id, bad3 FROM s2.C", 5, "s2"),
+                      ("SELECT a_id, bad4 FROM B", 6, "dbo")]
+
+        # Workers find statements modifying memory representation in the program root like the program started
+        # as a script, they get output settings which are set by program arguments
+        sys.path.insert(0, str(PROGRAM_PATH.parent))
+        ProgramReporter.verbose = 0
+        rules_args_data = CRules(include_folders=[], exclude_folders=[], path_to_rules_folder=str(RULES_PATH),
+                                 use_rule_packages=False)
+        linter = SchemaPartitionLinter(jobs=2, rules_args_data=rules_args_data, dialect=None)
+        try:
+            reports, parse_error_occurred = linter.process(statements=statements, mem_rep=database)
+        finally:
+            linter.shutdown()
+            sys.path.remove(str(PROGRAM_PATH.parent))
+
+        # Reports of both partitions are merged in input order
+        self.assertEqual(parse_error_occurred, False)
+        self.assertEqual([(statement[1], report.rule_name) for statement, report in reports],
+                         [(2, "column-not-exists"), (3, "column-not-exists"),
+                          (5, "column-not-exists"), (6, "column-not-exists")])
+
+        # Schemas processed by workers replace the schemas of memory representation
+        table_a = database.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_b = database.object_index[("dbo", "B")]
+        self.assertIs(table_b.database, database)
+        self.assertIs(database.object_index[("dbo", "B", "a_id")], table_b.columns["a_id"])
+        self.assertEqual(("s2", "C", "id") in database.object_index, True)
+        self.assertEqual(database.query.get_referencing_tables(table_a), [table_b])
+        self.assertEqual(sorted(table.name for table in database.query.get_tables_without_primary_key()),
+                         ["B", "C"])
+
+    def test_dump_and_load_partition(self):
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE B (id INTEGER, a_id INTEGER, "
+                                           "FOREIGN KEY (a_id) REFERENCES A (id))"),
+                     mem_rep=database)
+        data = dump_partition(schemas=[database.schemas["dbo"]], database=database)
+
+        # The partition is loaded into another database without the database it was pickled from
+        other = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE Old (id INTEGER)"), mem_rep=other)
+        schema, = load_partition(data=data, database=other)
+
+        self.assertIs(other.schemas["dbo"], schema)
+        self.assertIs(schema.database, other)
+        self.assertEqual(("dbo", "Old") in other.object_index, False)
+        self.assertEqual(other.query.get_columns_by_name("a_id"), [schema.tables["B"].columns["a_id"]])
+        self.assertEqual(other.dependencies.get_referencing_tables(schema.tables["A"]), [schema.tables["B"]])
+        self.assertEqual(schema.get_structural_hash(), database.schemas["dbo"].get_structural_hash())
+
+    def test_cross_schema_foreign_key(self):
+        database = Database("MemoryDB").set_default_scheme()
+        for name in ("s2", "s3"):
+            Schema(database=database, schema_name=name)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE s2.B (id INTEGER, a_id INTEGER)"), mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE s3.C (id INTEGER)"), mem_rep=database)
+
+        # Foreign key of the table s2.B references the table dbo.A
+        table_a = database.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_b = database.get_table_by_name_or_error(schema_name="s2", table_name="B")
+        table_b.add_constrain(ForeignKey(fk_columns=[table_b.columns["a_id"]], reference_columns=[table_a.columns["id"]],
+                                         table_fk=table_b, table_ref=table_a))
+
+        statements = [("SELECT bad1 FROM A", 1, "dbo"),
+                      ("CREATE TABLE s2.E (id INTEGER)", 2, "s2"),
+                      ("SELECT bad2 FROM s3.C", 3, "s3"),
+                      ("CREATE TABLE D (id INTEGER)", 4, "dbo"),
+                      ("SELECT bad3 FROM s2.B", 5, "s2")]
+
+        sys.path.insert(0, str(PROGRAM_PATH.parent))
+        ProgramReporter.verbose = 0
+        rules_args_data = CRules(include_folders=[], exclude_folders=[], path_to_rules_folder=str(RULES_PATH),
+                                 use_rule_packages=False)
+        linter = SchemaPartitionLinter(jobs=2, rules_args_data=rules_args_data, dialect=None)
+        try:
+            reports, parse_error_occurred = linter.process(statements=statements, mem_rep=database)
+        finally:
+            linter.shutdown()
+            sys.path.remove(str(PROGRAM_PATH.parent))
+
+        self.assertEqual(parse_error_occurred, False)
+        self.assertEqual([(statement[1], report.rule_name) for statement, report in reports],
+                         [(1, "column-not-exists"), (3, "column-not-exists"), (5, "column-not-exists")])
+
+        # Both sides of the foreign key were processed by one worker, they are not copies
+        table_a = database.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_b = database.get_table_by_name_or_error(schema_name="s2", table_name="B")
+        foreign_key, = table_b.constrains[(table_b, table_b)]
+        self.assertIs(foreign_key.table_ref, table_a)
+        self.assertIs(foreign_key.reference_columns[0], table_a.columns["id"])
+        self.assertEqual(table_a.constrains[(table_a, table_b)], [foreign_key])
+        self.assertEqual(database.dependencies.get_referencing_tables(table_a), [table_b])
+        self.assertEqual(("dbo", "D") in database.object_index, True)
+        self.assertEqual(("s2", "E") in database.object_index, True)
+
+    def test_same_reports_as_sequential(self):
+        statements = ["CREATE SCHEMA s1;", "CREATE SCHEMA s2;"]
+        for i in range(40):
+            schema_name = f"s{i % 2 + 1}"
+            statements.append(f"CREATE TABLE {schema_name}.T{i} (id INTEGER PRIMARY KEY, v{i} VARCHAR(10));")
+            statements.append(f"SELECT id, v{i}, bad FROM {schema_name}.T{i};")
+        statements.append("SELECT id, bad FROM s1.T0 JOIN s2.T1 ON 1 = 1;")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "input.sql"
+            path.write_text("\n".join(statements))
+            sequential = run_program("-f", str(path))
+            partitioned = run_program("-f", str(path), "-j", "2", "-pbs")
+
+        self.assertEqual(len(get_report_lines(sequential)), 41)
+        self.assertEqual(partitioned, sequential)
+
+
+class TestMissingFKIndex(unittest.TestCase):
+
+    def test_resolution_by_catalog(self):
+        database = Database("MemoryDB").set_default_scheme()
+        rule = MissingFKIndex()
+        rule.mem_rep = database
+
+        def lint(modify_representation, statement: str) -> None:
+            ast = adapt_ast(sqlglot.parse_one(statement))
+            rule.statement = (statement, 1)
+            for node, *_ in ast.walk():
+                visit = getattr(rule, f"{node.key}_visit", None)
+                if visit is not None:
+                    rule.node = node
+                    visit()
+            modify_representation(ast=ast, mem_rep=database)
+
+        lint(create_table, "CREATE TABLE A (id INTEGER, x INTEGER, PRIMARY KEY (id, x))")
+        lint(create_table, "CREATE TABLE B (id INTEGER, a_id INTEGER, a_x INTEGER, "
+                           "FOREIGN KEY (a_id, a_x) REFERENCES A (id, x))")
+        self.assertEqual([fk[0] for fk in rule.pending_fks[("dbo", "B")]], [["a_id", "a_x"]])
+
+        # Index which does not start with the foreign key columns does not cover it
+        lint(create_index, "CREATE INDEX i1 ON B (a_x, id, a_id)")
+        rule._resolve_tables()
+        self.assertEqual(("dbo", "B") in rule.pending_fks, True)
+
+        # The prefix covers the foreign key in any order, but only while the index exists
+        lint(create_index, "CREATE INDEX i2 ON B (a_x, a_id, id)")
+        lint(drop_index, "DROP INDEX i2")
+        rule._resolve_tables()
+        self.assertEqual(("dbo", "B") in rule.pending_fks, True)
+
+        lint(create_index, "CREATE INDEX i3 ON B (a_x, a_id, id)")
+        rule._resolve_tables()
+        self.assertEqual(rule.pending_fks, {})
+
+        table_b = database.get_table_by_name_or_error(schema_name="", table_name="B")
+        self.assertEqual(table_b.verify_columns_indexed(["a_id", "a_x"]), True)
+        self.assertEqual(table_b.verify_columns_indexed(["a_x", "a_id", "id"]), True)
+        self.assertEqual(table_b.verify_columns_indexed(["a_id"]), False)
+        self.assertEqual(table_b.verify_columns_indexed(["id", "a_id"]), False)
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+
+    def test_copy_on_write(self):
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35))"),
+                     mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE B (id INTEGER, a_id INTEGER, "
+                                           "FOREIGN KEY (a_id) REFERENCES A (id))"),
+                     mem_rep=database)
+        snapshot = database.snapshot()
+        self.assertEqual(snapshot.states, {})
+
+        schema = database.schemas["dbo"]
+        table_a, table_b = schema.tables["A"], schema.tables["B"]
+        table_b.delete_cascade().delete_table()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE C (id INTEGER)"), mem_rep=database)
+
+        # Only the changed schema and tables were copied, not their columns
+        self.assertEqual({schema, table_a, table_b} <= set(snapshot.states), True)
+        self.assertEqual(any(isinstance(saved, Column) for saved in snapshot.states), False)
+        self.assertEqual(list(snapshot.get_tables(schema)), ["A", "B"])
+        self.assertEqual(list(snapshot.get_table_constrains(table_a)), [(table_a, table_b)])
+        self.assertIs(snapshot.get_table("", "B"), table_b)
+
+        materialized = snapshot.materialize()
+        new_b = materialized.get_table_by_name_or_error(schema_name="", table_name="B")
+        new_a = materialized.get_table_by_name_or_error(schema_name="", table_name="A")
+        self.assertIsNot(new_b, table_b)
+        self.assertEqual(list(new_b.columns), ["id", "a_id"])
+        self.assertIs(new_b.columns["id"].table, new_b)
+        self.assertEqual(materialized.dependencies.get_referencing_tables(new_a), [new_b])
+        self.assertEqual(materialized.dependencies.get_referencing_tables(table_a), [])
+        self.assertEqual(("dbo", "C") in materialized.object_index, False)
+
+        snapshot.release()
+        self.assertEqual(len(database.snapshots), 0)
+
+
+class TestSerialization(unittest.TestCase):
+
+    def test_round_trip(self):
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35) NOT NULL)"),
+                     mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE B (id INTEGER, a_id INTEGER, "
+                                           "FOREIGN KEY (a_id) REFERENCES A (id))"),
+                     mem_rep=database)
+
+        file = io.BytesIO()
+        serialization.dump(database, file)
+
+        # Segments are streamed, table of contents is at the end of file and the header points to it
+        _, _, toc_offset, length, _ = serialization.HEADER.unpack(file.getvalue()[:serialization.HEADER.size])
+        self.assertEqual(file.tell(), serialization.HEADER.size + toc_offset + length)
+
+        file.seek(0)
+        loaded = serialization.load(file)
+
+        # Schemas are materialized on the first access
+        self.assertEqual(loaded.schemas, {})
+        self.assertEqual(list(loaded.lazy_schemas), ["dbo"])
+
+        table_a = loaded.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_b = loaded.get_table_by_name_or_error(schema_name="", table_name="B")
+        self.assertEqual(list(table_a.columns), ["id", "name"])
+        self.assertIs(table_a.primary_key.columns[0], table_a.columns["id"])
+        self.assertIs(table_a.columns["name"].datatype,
+                      database.schemas["dbo"].tables["A"].columns["name"].datatype)
+        self.assertEqual(isinstance(table_a.columns["name"].constrains[0], PreventNotNull), True)
+        self.assertEqual(loaded.dependencies.get_referencing_tables(table_a), [table_b])
+        self.assertIs(table_a.constrains[(table_a, table_b)][0], table_b.constrains[(table_b, table_b)][0])
+        self.assertEqual(("dbo", "B", "a_id") in loaded.object_index, True)
+
+        # Damaged file is refused
+        data = bytearray(file.getvalue())
+        data[-2] ^= 1
+        with self.assertRaises(CatalogFormatError):
+            serialization.load(io.BytesIO(bytes(data)), lazy=False)
+
+    def test_legacy_pickle(self):
+        # Pickle of the first version of program, its classes had properties instead of slots
+        with open(TEST_DATA_PATH / "legacy_catalog.pkl", "rb") as f:
+            loaded = serialization.load(f)
+
+        self.assertEqual(diff_catalogs(old=create_legacy_database(), new=loaded), [])
+
+        table_a = loaded.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_c = loaded.get_table_by_name_or_error(schema_name="", table_name="C")
+        self.assertEqual(loaded.dependencies.get_referencing_tables(table_a), [table_c])
+        self.assertIs(table_c.constrains[(table_c, table_c)][0].reference_columns[0], table_a.columns["id"])
+        self.assertEqual(table_c.verify_columns_indexed(["a_id"]), True)
+        self.assertEqual(loaded.get_index_owners(schema_name="dbo", index_name="ix"), [table_c])
+
+        with self.assertRaises(CatalogFormatError):
+            serialization.loads(data=b"not a catalog")
+
+    def test_pickle_round_trip(self):
+        # Parallel partitions and checkpoints pickle memory representation of slotted classes,
+        # pickles of the first version are converted (see test_legacy_pickle)
+        database = create_legacy_database()
+        loaded = pickle.loads(pickle.dumps(database, protocol=pickle.HIGHEST_PROTOCOL))
+
+        self.assertEqual(loaded.get_structural_hash(), database.get_structural_hash())
+        self.assertEqual(diff_catalogs(old=database, new=loaded), [])
+
+        table_a = loaded.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_c = loaded.get_table_by_name_or_error(schema_name="", table_name="C")
+        self.assertEqual(hasattr(table_c, "__dict__"), False)
+        self.assertIs(loaded.object_index[("dbo", "C")], table_c)
+        self.assertEqual(loaded.query.get_referencing_tables(table_a), [table_c])
+        self.assertEqual(table_c.verify_columns_indexed(["a_id"]), True)
+
+        # A table is pickled with the database it belongs to
+        table = pickle.loads(pickle.dumps(database.schemas["dbo"].tables["C"], protocol=pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(table.get_structural_hash(), table_c.get_structural_hash())
+        self.assertEqual(table.database.get_structural_hash(), database.get_structural_hash())
+
+    def test_unsupported_version(self):
+        # Files of other format versions are refused before their content is read
+        header = serialization.HEADER.pack(serialization.MAGIC, 1, 0, 0, 0)
+        with self.assertRaises(CatalogFormatError):
+            serialization.loads(data=header)
+
+
+class TestCatalogJournal(unittest.TestCase):
+
+    def test_replay(self):
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "catalog.bin"
+            with open(path, "wb") as f:
+                serialization.dump(database, f)
+
+            journal = CatalogJournal(database=database, path=path)
+            create_table(ast=sqlglot.parse_one("CREATE TABLE B (id INTEGER, a_id INTEGER, "
+                                               "FOREIGN KEY (a_id) REFERENCES A (id))"),
+                         mem_rep=database)
+            journal.close()
+
+            # Torn record of an interrupted run is ignored
+            with open(get_journal_path(path=path), "ab") as f:
+                f.write(b"\x10\x00")
+
+            with open(path, "rb") as f:
+                loaded = serialization.load(f)
+            self.assertEqual(CatalogJournal.replay(database=loaded, path=path), 1)
+
+        table_a = loaded.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_b = loaded.get_table_by_name_or_error(schema_name="", table_name="B")
+        self.assertEqual(list(table_b.columns), ["id", "a_id"])
+        self.assertEqual(loaded.dependencies.get_referencing_tables(table_a), [table_b])
+        self.assertIs(table_a.constrains[(table_a, table_b)][0], table_b.constrains[(table_b, table_b)][0])
+
+
+class TestSharedCatalog(unittest.TestCase):
+
+    def test_attach(self):
+        database = Database("MemoryDB").set_default_scheme()
+        Schema(database=database, schema_name="s1")
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+        create_table(ast=sqlglot.parse_one("CREATE TABLE s1.B (id INTEGER PRIMARY KEY)"), mem_rep=database)
+
+        shared_catalog = SharedCatalog()
+        path = shared_catalog.export(database=database)
+        attached = attach(path=path)
+
+        # Only the used schema is materialized
+        table_b = attached.get_table_by_name_or_error(schema_name="s1", table_name="B")
+        self.assertEqual(list(table_b.columns), ["id"])
+        self.assertEqual(list(attached.schemas), ["s1"])
+        self.assertEqual(list(attached.lazy_schemas), ["dbo"])
+
+        # A new version replaces the previous one
+        new_path = shared_catalog.export(database=database)
+        self.assertEqual(shared_catalog.version, 2)
+        self.assertEqual(path.exists(), False)
+
+        shared_catalog.close()
+        self.assertEqual(new_path.exists(), False)
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def test_release_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "catalog.db"
+            database = open_database(path=path, cache_size=1)
+            create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+            create_table(ast=sqlglot.parse_one("CREATE TABLE B (id INTEGER, a_id INTEGER, "
+                                               "FOREIGN KEY (a_id) REFERENCES A (id))"),
+                         mem_rep=database)
+
+            # A is referenced by loaded B, so B is released
+            database.release_tables()
+            self.assertEqual(list(database.schemas["dbo"].tables), ["A"])
+            table_a = database.schemas["dbo"].tables["A"]
+            self.assertEqual(table_a.constrains, {})
+
+            table_b = database.get_table_by_name_or_error(schema_name="", table_name="B")
+            self.assertEqual(database.dependencies.get_referencing_tables(table_a), [table_b])
+            self.assertIs(table_a.constrains[(table_a, table_b)][0], table_b.constrains[(table_b, table_b)][0])
+
+            # The table can not be deleted while a stored table references it
+            database.release_tables()
+            self.assertEqual(table_a.verify_can_be_deleted(), False)
+            self.assertEqual(sorted(database.schemas["dbo"].tables), ["A", "B"])
+            database.storage.close()
+
+            loaded = open_database(path=path)
+            table_b = loaded.get_table_by_name_or_error(schema_name="", table_name="B")
+            self.assertEqual(list(table_b.columns), ["id", "a_id"])
+            self.assertEqual(sorted(loaded.schemas["dbo"].tables), ["A", "B"])
+            loaded.storage.close()
+
+    def test_queries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            database = open_database(path=Path(directory) / "catalog.db", cache_size=1)
+            create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35))"),
+                         mem_rep=database)
+            create_table(ast=sqlglot.parse_one("CREATE TABLE B (id INTEGER, a_id INTEGER, "
+                                               "FOREIGN KEY (a_id) REFERENCES A (id))"),
+                         mem_rep=database)
+            create_table(ast=sqlglot.parse_one("CREATE TABLE C (name VARCHAR(35))"), mem_rep=database)
+
+            # Released tables are loaded again, queries do not return partial results
+            database.release_tables()
+            self.assertEqual(list(database.schemas["dbo"].tables), ["A"])
+            self.assertEqual(sorted(column.table.name for column in database.query.get_columns_by_name("name")),
+                             ["A", "C"])
+
+            database.release_tables()
+            self.assertEqual(sorted(table.name for table in database.query.get_tables_without_primary_key()),
+                             ["B", "C"])
+
+            database.release_tables()
+            table_a = database.get_table_by_name_or_error(schema_name="", table_name="A")
+            self.assertEqual(list(database.schemas["dbo"].tables), ["A"])
+            self.assertEqual([table.name for table in database.query.get_referencing_tables(table_a)], ["B"])
+
+            database.release_tables()
+            self.assertEqual(("dbo", "C", "name") in database.object_index, True)
+            self.assertEqual(sorted(database.object_index.get_children("dbo")), ["A", "B", "C"])
+
+            database.release_tables()
+            self.assertEqual(len(database.object_index), 9)
+            database.storage.close()
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def test_write_and_load(self):
+        from sql_code_analyzer.checker.rules.index.MissingIndex_If_ForeignKey import MissingFKIndex
+
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+        buffer = io.BytesIO()
+        serialization.dump(database, buffer)
+
+        rule = MissingFKIndex()
+        rule.pending_fks[("dbo", "B")] = [(["a_id"], None, ("CREATE TABLE B ...", 2))]
+        statements = [("CREATE TABLE A (id INTEGER PRIMARY KEY);", 1), ("SELECT 1;", 2)]
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpointer = Checkpointer(path=Path(directory) / "run.ckp", interval=2, interval_time=None)
+            self.assertEqual(checkpointer.is_due(statement=1), False)
+            self.assertEqual(checkpointer.is_due(statement=2), True)
+
+            checkpointer.write(checkpoint=Checkpoint(next_statement=2,
+                                                     input_checksum=get_input_checksum(statements=statements),
+                                                     catalog=buffer.getvalue(),
+                                                     rules={get_rule_key(rule=rule): rule.get_state()},
+                                                     reports=[],
+                                                     parse_error_occurred=False))
+            self.assertEqual(checkpointer.is_due(statement=3), False)
+            checkpoint = load_checkpoint(path=checkpointer.path)
+
+        self.assertEqual(checkpoint.next_statement, 2)
+        self.assertEqual(checkpoint.input_checksum, get_input_checksum(statements=statements))
+        loaded = serialization.loads(data=checkpoint.catalog)
+        self.assertEqual(list(loaded.get_table_by_name_or_error(schema_name="", table_name="A").columns), ["id"])
+
+        resumed = MissingFKIndex()
+        resumed.set_state(state=checkpoint.rules[get_rule_key(rule=rule)])
+        self.assertEqual(resumed.pending_fks, rule.pending_fks)
+        self.assertEqual("_mem_rep" in checkpoint.rules[get_rule_key(rule=rule)], False)
+
+
+class TestLintCache(unittest.TestCase):
+
+    def test_replay_moved_statement(self):
+        database = Database("MemoryDB").set_default_scheme()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE A (id INTEGER PRIMARY KEY)"), mem_rep=database)
+        buffer = io.BytesIO()
+        serialization.dump(database, buffer)
+        replica = serialization.loads(data=buffer.getvalue())
+
+        snapshot = database.snapshot()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE B (id INTEGER, a_id INTEGER, "
+                                           "FOREIGN KEY (a_id) REFERENCES A (id))"),
+                     mem_rep=database)
+        changes = get_changes(database=database, snapshot=snapshot)
+        snapshot.release()
+
+        statement = "CREATE TABLE B (id INTEGER, -- 3\n a_id INTEGER); -- 4"
+        moved = "CREATE TABLE B (id INTEGER, -- 7\n a_id INTEGER); -- 8"
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "lint.cache"
+            cache = LintCache(path=path, max_size=1024, program_fingerprint=b"program", dialect=None,
+                              catalog_fingerprint=b"catalog")
+            key = cache.get_key(statement=statement, position=3)
+            cache.put(key=key, position=3, modifies=True, reports=["B already exists"], messages=[],
+                      changes=changes)
+            cache.close()
+
+            # The moved statement is found in the next run, a different catalog is not
+            cache = LintCache(path=path, max_size=1, program_fingerprint=b"program", dialect=None,
+                              catalog_fingerprint=b"catalog")
+            self.assertEqual(cache.get_key(statement=moved, position=7), key)
+            entry = cache.get(key=key, position=7)
+            cache.advance(key=key)
+            self.assertEqual(cache.get(key=cache.get_key(statement=moved, position=7), position=7), None)
+            self.assertEqual(cache.get_hit_rate(), 0.5)
+
+            # Entries above the maximum size are evicted
+            cache.close()
+            cache = LintCache(path=path, max_size=1, program_fingerprint=b"program", dialect=None,
+                              catalog_fingerprint=b"catalog")
+            self.assertEqual(cache.get(key=key, position=7), None)
+            cache.close()
+
+        self.assertEqual(entry.reports, ["B already exists"])
+        LiveReplayer(database=replica).apply(record=entry.changes)
+        table_a = replica.get_table_by_name_or_error(schema_name="", table_name="A")
+        table_b = replica.get_table_by_name_or_error(schema_name="", table_name="B")
+        self.assertEqual(list(table_b.columns), ["id", "a_id"])
+        self.assertEqual(replica.dependencies.get_referencing_tables(table_a), [table_b])
+
+
+class TestStructuralHash(unittest.TestCase):
+
+    def test_incremental_hash(self):
+        statements = ["CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35) NOT NULL)",
+                      "CREATE TABLE B (id INTEGER, a_id INTEGER, FOREIGN KEY (a_id) REFERENCES A (id))",
+                      "CREATE TABLE C (id INTEGER UNIQUE)"]
+        databases = []
+        for order in (statements, statements[2:] + statements[:2]):
+            database = Database("MemoryDB").set_default_scheme()
+            for statement in order:
+                create_table(ast=sqlglot.parse_one(statement), mem_rep=database)
+            databases.append(database)
+
+        database, other = databases
+        structural_hash = database.get_structural_hash()
+        self.assertEqual(other.get_structural_hash(), structural_hash)
+
+        # Only the changed table and the objects above it are hashed again
+        table_a, table_c = database.schemas["dbo"].tables["A"], database.schemas["dbo"].tables["C"]
+        table_c.columns["id"].add_constrain(PreventNotNull(column=table_c.columns["id"]))
+        self.assertEqual((database.structural_hash, table_c.structural_hash, table_a.structural_hash is None),
+                         (None, None, False))
+        self.assertNotEqual(database.get_structural_hash(), structural_hash)
+
+        table_c.columns["id"].delete_constrain(constrain=table_c.columns["id"].constrains[-1])
+        self.assertEqual(database.get_structural_hash(), structural_hash)
+
+
+class TestCatalogDiff(unittest.TestCase):
+
+    def test_diff(self):
+        old = Database("Production").set_default_scheme()
+        for statement in ("CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35))",
+                          "CREATE TABLE B (id INTEGER, a_id INTEGER, FOREIGN KEY (a_id) REFERENCES A (id))",
+                          "CREATE TABLE C (id INTEGER)"):
+            create_table(ast=sqlglot.parse_one(statement), mem_rep=old)
+        buffer = io.BytesIO()
+        serialization.dump(old, buffer)
+        new = serialization.loads(data=buffer.getvalue())
+        self.assertEqual(diff_catalogs(old=old, new=new), [])
+
+        new.get_table_by_name_or_error(schema_name="", table_name="B").delete_cascade().delete_table()
+        create_table(ast=sqlglot.parse_one("CREATE TABLE D (id INTEGER)"), mem_rep=new)
+        table_c = new.get_table_by_name_or_error(schema_name="", table_name="C")
+        table_c.columns["id"].change_datatype(new_datatype=new.schemas["dbo"].tables["A"].columns["name"].datatype)
+        table_c.add_index(Index(name="ix", columns=[table_c.columns["id"]]))
+
+        changes = diff_catalogs(old=old, new=new)
+        self.assertEqual([(change["change"], change["object"], change.get("table"), change.get("name"))
+                          for change in changes],
+                         [("removed", "table", "B", None),
+                          ("changed", "column", "C", "id"),
+                          ("added", "index", "C", "ix"),
+                          ("added", "table", "D", None)])
+        self.assertEqual((changes[1]["old"]["datatype"], changes[1]["new"]["datatype"]), ("INT", "VARCHAR(35)"))
+
+
+class TestSchemaImport(unittest.TestCase):
+
+    def test_import_like_ddl(self):
+        statements = ("CREATE TABLE A (id INTEGER PRIMARY KEY, name VARCHAR(35) NOT NULL DEFAULT 'x')",
+                      "CREATE TABLE B (id INTEGER, a_id INTEGER, price NUMBER(10, 2), "
+                      "FOREIGN KEY (a_id) REFERENCES A (id))")
+        ddl = Database("MemoryDB").set_default_scheme()
+        for statement in statements:
+            create_table(ast=sqlglot.parse_one(statement), mem_rep=ddl)
+        table_b = ddl.get_table_by_name_or_error(schema_name="", table_name="B")
+        table_b.add_index(Index(name="ix", columns=[table_b.columns["price"], table_b.columns["a_id"]]))
+
+        columns = [{"TABLE_NAME": "B", "COLUMN_NAME": "price", "ORDINAL_POSITION": 3, "DATA_TYPE": "numeric",
+                    "NUMERIC_PRECISION": 10, "NUMERIC_SCALE": 2},
+                   {"TABLE_NAME": "B", "COLUMN_NAME": "id", "ORDINAL_POSITION": 1, "DATA_TYPE": "integer"},
+                   {"TABLE_NAME": "B", "COLUMN_NAME": "a_id", "ORDINAL_POSITION": 2, "DATA_TYPE": "integer"},
+                   {"TABLE_NAME": "A", "COLUMN_NAME": "id", "ORDINAL_POSITION": 1, "DATA_TYPE": "integer"},
+                   {"TABLE_NAME": "A", "COLUMN_NAME": "name", "ORDINAL_POSITION": 2, "DATA_TYPE": "varchar",
+                    "CHARACTER_MAXIMUM_LENGTH": 35, "IS_NULLABLE": "NO", "COLUMN_DEFAULT": "x"}]
+        constraints = [{"TABLE_NAME": "B", "CONSTRAINT_TYPE": "FOREIGN KEY", "COLUMN_NAME": "a_id",
+                        "REFERENCED_TABLE_NAME": "A", "REFERENCED_COLUMN_NAME": "id"},
+                       {"TABLE_NAME": "A", "CONSTRAINT_TYPE": "PRIMARY KEY", "COLUMN_NAME": "id"}]
+
+        with tempfile.TemporaryDirectory() as directory:
+            json_path, csv_path = Path(directory) / "schema.json", Path(directory) / "indexes.csv"
+            json_path.write_text(json.dumps({"columns": columns, "constraints": constraints}))
+            csv_path.write_text("table_name,index_name,column_name,ordinal_position\n"
+                                "B,ix,a_id,2\n"
+                                "B,ix,price,1\n")
+            description = read_schema_description(paths=[json_path, csv_path])
+
+        imported = Database("MemoryDB").set_default_scheme()
+        self.assertEqual(import_schema_description(database=imported, description=description), 2)
+
+        # Tables created without a statement have no arguments of statement
+        changes = diff_catalogs(old=ddl, new=imported)
+        self.assertEqual({(change["object"], change["table"], tuple(change["new"])) for change in changes},
+                         {("table", "A", ("args",)), ("table", "B", ("args",))})
+
+        table_a = imported.get_table_by_name_or_error(schema_name="", table_name="A")
+        self.assertEqual(list(imported.get_table_by_name_or_error(schema_name="", table_name="B").columns),
+                         ["id", "a_id", "price"])
+        self.assertEqual(imported.get_indexed_object(index_key=("dbo", "A", "name")).datatype,
+                         ddl.get_indexed_object(index_key=("dbo", "A", "name")).datatype)
+        self.assertEqual([table.name for table in imported.dependencies.get_referencing_tables(table=table_a)],
+                         ["B"])